@@ -24,6 +24,8 @@ from src.core.database import Base
 # Import all models to ensure they are attached to Base.metadata
 from src.workflow import models as workflow_models
 from src.billing import models as billing_models
+from src.notifications import models as notification_models
+from src.outbox import models as outbox_models
 
 # Set the database URL from settings
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
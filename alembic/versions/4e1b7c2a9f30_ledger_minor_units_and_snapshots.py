@@ -0,0 +1,81 @@
+"""Store credit amounts in integer minor units and add monthly balance snapshots
+
+Revision ID: 4e1b7c2a9f30
+Revises: c3f883d7bdd6
+Create Date: 2026-10-17 04:12:08.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e1b7c2a9f30'
+down_revision: Union[str, Sequence[str], None] = 'c3f883d7bdd6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Credits -> hundredths of a credit; transaction amounts become signed deltas
+    op.add_column('credit_ledger', sa.Column('balance_minor', sa.BigInteger(), server_default=sa.text('0'), nullable=False))
+    op.add_column('credit_ledger', sa.Column('held_minor', sa.BigInteger(), server_default=sa.text('0'), nullable=False))
+    op.execute("UPDATE credit_ledger SET balance_minor = ROUND(COALESCE(balance, 0) * 100), held_minor = ROUND(held * 100)")
+    op.drop_column('credit_ledger', 'balance')
+    op.drop_column('credit_ledger', 'held')
+
+    op.add_column('transactions', sa.Column('amount_minor', sa.BigInteger(), nullable=True))
+    op.execute(
+        "UPDATE transactions SET amount_minor = ROUND(amount * 100) * "
+        "CASE WHEN transaction_type = 'CONSUMPTION' THEN -1 ELSE 1 END"
+    )
+    op.alter_column('transactions', 'amount_minor', nullable=False)
+    op.drop_column('transactions', 'amount')
+    op.create_index('ix_transactions_org_type_created', 'transactions', ['organization_id', 'credit_type', 'created_at'], unique=False)
+
+    op.add_column('credit_reservations', sa.Column('amount_minor', sa.BigInteger(), nullable=True))
+    op.execute("UPDATE credit_reservations SET amount_minor = ROUND(amount * 100)")
+    op.alter_column('credit_reservations', 'amount_minor', nullable=False)
+    op.drop_column('credit_reservations', 'amount')
+
+    op.create_table('balance_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.String(), nullable=False),
+    sa.Column('credit_type', postgresql.ENUM('RESPONDENT_CREDIT', 'EVIDENCE_CREDIT', name='credittype', create_type=False), nullable=False),
+    sa.Column('period_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('period_end', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('balance_minor', sa.BigInteger(), nullable=False),
+    sa.Column('delta_minor', sa.BigInteger(), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('organization_id', 'credit_type', 'period_start', name='uq_balance_snapshots_period')
+    )
+    op.create_index(op.f('ix_balance_snapshots_id'), 'balance_snapshots', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_balance_snapshots_id'), table_name='balance_snapshots')
+    op.drop_table('balance_snapshots')
+
+    op.add_column('credit_reservations', sa.Column('amount', sa.Float(), nullable=True))
+    op.execute("UPDATE credit_reservations SET amount = amount_minor / 100.0")
+    op.alter_column('credit_reservations', 'amount', nullable=False)
+    op.drop_column('credit_reservations', 'amount_minor')
+
+    op.drop_index('ix_transactions_org_type_created', table_name='transactions')
+    op.add_column('transactions', sa.Column('amount', sa.Float(), nullable=True))
+    op.execute("UPDATE transactions SET amount = ABS(amount_minor) / 100.0")
+    op.alter_column('transactions', 'amount', nullable=False)
+    op.drop_column('transactions', 'amount_minor')
+
+    op.add_column('credit_ledger', sa.Column('balance', sa.Float(), nullable=True))
+    op.add_column('credit_ledger', sa.Column('held', sa.Float(), server_default=sa.text('0'), nullable=False))
+    op.execute("UPDATE credit_ledger SET balance = balance_minor / 100.0, held = held_minor / 100.0")
+    op.drop_column('credit_ledger', 'held_minor')
+    op.drop_column('credit_ledger', 'balance_minor')
@@ -0,0 +1,56 @@
+"""Add the outbound email queue
+
+Revision ID: 6a2d9f14c8e3
+Revises: e27a9d4b6c18
+Create Date: 2026-10-17 07:12:08.214507
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a2d9f14c8e3'
+down_revision: Union[str, Sequence[str], None] = 'e27a9d4b6c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbound_emails',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('template', sa.String(), nullable=False),
+    sa.Column('locale', sa.String(), nullable=True),
+    sa.Column('to_email', sa.String(), nullable=False),
+    sa.Column('recipient_domain', sa.String(), nullable=False),
+    sa.Column('context', sa.JSON(), nullable=False),
+    sa.Column('invitation_id', sa.Integer(), nullable=True),
+    sa.Column('assessment_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.Enum('QUEUED', 'SENDING', 'SENT', 'RETRYING', 'DEAD', name='emaildeliverystatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.ForeignKeyConstraint(['invitation_id'], ['invitations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbound_emails_id'), 'outbound_emails', ['id'], unique=False)
+    op.create_index(op.f('ix_outbound_emails_invitation_id'), 'outbound_emails', ['invitation_id'], unique=False)
+    op.create_index(op.f('ix_outbound_emails_assessment_id'), 'outbound_emails', ['assessment_id'], unique=False)
+    op.create_index('ix_outbound_emails_due', 'outbound_emails', ['next_attempt_at'], unique=False,
+                    postgresql_where=sa.text("status IN ('QUEUED', 'SENDING', 'RETRYING')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbound_emails_due', table_name='outbound_emails')
+    op.drop_index(op.f('ix_outbound_emails_assessment_id'), table_name='outbound_emails')
+    op.drop_index(op.f('ix_outbound_emails_invitation_id'), table_name='outbound_emails')
+    op.drop_index(op.f('ix_outbound_emails_id'), table_name='outbound_emails')
+    op.drop_table('outbound_emails')
+    sa.Enum(name='emaildeliverystatus').drop(op.get_bind(), checkfirst=True)
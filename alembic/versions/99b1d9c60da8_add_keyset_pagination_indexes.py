@@ -0,0 +1,41 @@
+"""Add (created_at, id) composite indexes for keyset pagination
+
+Revision ID: 99b1d9c60da8
+Revises: 45fffc4fb965
+Create Date: 2026-10-17 09:12:41.205118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '99b1d9c60da8'
+down_revision: Union[str, Sequence[str], None] = '45fffc4fb965'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_projects_org_created_id', 'projects', ['organization_id', 'created_at', 'id']),
+    ('ix_assessments_org_created_id', 'assessments', ['organization_id', 'created_at', 'id']),
+    ('ix_assessments_project_created_id', 'assessments', ['project_id', 'created_at', 'id']),
+    ('ix_assessments_created_id', 'assessments', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction and doesn't block writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
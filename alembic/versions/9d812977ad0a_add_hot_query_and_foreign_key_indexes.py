@@ -0,0 +1,78 @@
+"""Add composite, foreign-key and partial indexes for workflow hot queries
+
+Revision ID: 9d812977ad0a
+Revises: 99b1d9c60da8
+Create Date: 2026-10-17 10:03:27.514902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d812977ad0a'
+down_revision: Union[str, Sequence[str], None] = '99b1d9c60da8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_ASSESSMENT_STATUSES = "status IN ('DRAFT', 'IN_PROGRESS', 'SUBMITTED', 'SCORING', 'ANALYST_REVIEW')"
+
+# name, table, columns, partial index predicate
+INDEXES = [
+    ('ix_respondents_assessment_id', 'respondents', ['assessment_id'], None),
+    ('ix_evidence_response_id', 'evidence', ['response_id'], None),
+    ('ix_invitations_assessment_id', 'invitations', ['assessment_id'], None),
+    ('ix_assessments_org_status_created', 'assessments', ['organization_id', 'status', 'created_at'], None),
+    ('ix_assessments_org_active', 'assessments', ['organization_id', 'created_at', 'id'], ACTIVE_ASSESSMENT_STATUSES),
+    ('ix_invitations_assessment_pending', 'invitations', ['assessment_id'], "status = 'PENDING'"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicate answers from the old select-then-insert race would block the
+    # unique index: keep the newest row per (respondent, question) and move
+    # any evidence attached to the others onto it
+    op.execute("""
+        WITH ranked AS (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY respondent_id, question_id ORDER BY id DESC
+            ) AS keep_id
+            FROM responses
+        )
+        UPDATE evidence SET response_id = ranked.keep_id
+        FROM ranked
+        WHERE evidence.response_id = ranked.id AND ranked.id <> ranked.keep_id
+    """)
+    op.execute("""
+        DELETE FROM responses r
+        USING responses newer
+        WHERE r.respondent_id = newer.respondent_id
+          AND r.question_id = newer.question_id
+          AND r.id < newer.id
+    """)
+
+    # CONCURRENTLY can't run inside a transaction and doesn't block writes
+    with op.get_context().autocommit_block():
+        op.create_index('uq_responses_respondent_question', 'responses', ['respondent_id', 'question_id'],
+                        unique=True, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, columns, where in INDEXES:
+            op.create_index(name, table, columns, unique=False,
+                            postgresql_where=sa.text(where) if where else None,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+    # Promoting the prebuilt index to a constraint only takes a brief lock
+    op.execute(
+        "ALTER TABLE responses ADD CONSTRAINT uq_responses_respondent_question "
+        "UNIQUE USING INDEX uq_responses_respondent_question"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_responses_respondent_question', 'responses', type_='unique')
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,29 @@
+"""Add a BRIN index on transactions.created_at for month-end invoicing
+
+Revision ID: b85d30e61c4f
+Revises: 4e1b7c2a9f30
+Create Date: 2026-10-17 04:58:31.274116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b85d30e61c4f'
+down_revision: Union[str, Sequence[str], None] = '4e1b7c2a9f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_created_at_brin', 'transactions', ['created_at'], unique=False,
+                    postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_created_at_brin', table_name='transactions')
@@ -0,0 +1,50 @@
+"""Add credit reservations and the ledger held balance
+
+Revision ID: c3f883d7bdd6
+Revises: dc7b0f27d660
+Create Date: 2026-10-17 02:43:43.918305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f883d7bdd6'
+down_revision: Union[str, Sequence[str], None] = 'dc7b0f27d660'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('credit_ledger', sa.Column('held', sa.Float(), server_default=sa.text('0'), nullable=False))
+    op.create_table('credit_reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.String(), nullable=False),
+    sa.Column('credit_type', postgresql.ENUM('RESPONDENT_CREDIT', 'EVIDENCE_CREDIT', name='credittype', create_type=False), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('status', sa.Enum('HELD', 'COMMITTED', 'RELEASED', 'EXPIRED', name='reservationstatus'), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_credit_reservations_id'), 'credit_reservations', ['id'], unique=False)
+    op.create_index(op.f('ix_credit_reservations_organization_id'), 'credit_reservations', ['organization_id'], unique=False)
+    op.create_index('ix_credit_reservations_held_expires', 'credit_reservations', ['expires_at'], unique=False,
+                    postgresql_where=sa.text("status = 'HELD'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_credit_reservations_held_expires', table_name='credit_reservations')
+    op.drop_index(op.f('ix_credit_reservations_organization_id'), table_name='credit_reservations')
+    op.drop_index(op.f('ix_credit_reservations_id'), table_name='credit_reservations')
+    op.drop_table('credit_reservations')
+    sa.Enum(name='reservationstatus').drop(op.get_bind(), checkfirst=True)
+    op.drop_column('credit_ledger', 'held')
@@ -0,0 +1,48 @@
+"""Make credit_ledger unique per organization and credit type
+
+Revision ID: dc7b0f27d660
+Revises: 9d812977ad0a
+Create Date: 2026-10-17 02:42:16.384211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dc7b0f27d660'
+down_revision: Union[str, Sequence[str], None] = '9d812977ad0a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate ledger rows (from the old read-then-insert race) into the
+    # oldest one so the atomic debit UPDATE always targets a single row
+    op.execute("""
+        WITH totals AS (
+            SELECT min(id) AS keep_id, sum(balance) AS balance
+            FROM credit_ledger
+            GROUP BY organization_id, credit_type
+            HAVING count(*) > 1
+        )
+        UPDATE credit_ledger SET balance = totals.balance
+        FROM totals
+        WHERE credit_ledger.id = totals.keep_id
+    """)
+    op.execute("""
+        DELETE FROM credit_ledger l
+        USING credit_ledger older
+        WHERE l.organization_id = older.organization_id
+          AND l.credit_type = older.credit_type
+          AND l.id > older.id
+    """)
+    op.create_unique_constraint('uq_credit_ledger_org_type', 'credit_ledger', ['organization_id', 'credit_type'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_credit_ledger_org_type', 'credit_ledger', type_='unique')
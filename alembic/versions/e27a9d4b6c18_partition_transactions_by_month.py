@@ -0,0 +1,105 @@
+"""Range-partition transactions by created_at month
+
+Revision ID: e27a9d4b6c18
+Revises: b85d30e61c4f
+Create Date: 2026-10-17 05:41:52.630914
+
+Rebuilds transactions as a partitioned table and copies the existing rows,
+so it runs for as long as that copy takes. Partitions cover every month from
+the oldest transaction to TRANSACTION_PARTITIONS_AHEAD (3) months out, plus a
+DEFAULT partition as a safety net; afterwards python -m src.billing.partitions
+keeps future months created. Postgres only.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e27a9d4b6c18'
+down_revision: Union[str, Sequence[str], None] = 'b85d30e61c4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, organization_id, credit_type, amount_minor, transaction_type, description, created_at"
+
+
+def create_indexes() -> None:
+    op.create_index(op.f('ix_transactions_id'), 'transactions', ['id'], unique=False)
+    op.create_index(op.f('ix_transactions_organization_id'), 'transactions', ['organization_id'], unique=False)
+    op.create_index('ix_transactions_org_type_created', 'transactions', ['organization_id', 'credit_type', 'created_at'], unique=False)
+    op.create_index('ix_transactions_created_at_brin', 'transactions', ['created_at'], unique=False,
+                    postgresql_using='brin')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.rename_table('transactions', 'transactions_unpartitioned')
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE transactions (
+            id INTEGER NOT NULL DEFAULT nextval('transactions_id_seq'),
+            organization_id VARCHAR,
+            credit_type credittype NOT NULL,
+            amount_minor BIGINT NOT NULL,
+            transaction_type transactiontype NOT NULL,
+            description VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT transactions_partitioned_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("""
+        DO $$
+        DECLARE
+            -- UTC calendar months, whatever the session's TimeZone
+            month TIMESTAMP := date_trunc('month', COALESCE((SELECT MIN(created_at) FROM transactions_unpartitioned), now()) AT TIME ZONE 'UTC');
+            last_month TIMESTAMP := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months';
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                    'transactions_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    to_char(month, 'YYYY-MM-DD') || ' 00:00+00',
+                    to_char(month + interval '1 month', 'YYYY-MM-DD') || ' 00:00+00'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+    op.execute(
+        f"INSERT INTO transactions ({COLUMNS}) "
+        f"SELECT id, organization_id, credit_type, amount_minor, transaction_type, description, "
+        f"COALESCE(created_at, now()) FROM transactions_unpartitioned"
+    )
+    op.drop_table('transactions_unpartitioned')
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+    op.execute("ALTER TABLE transactions RENAME CONSTRAINT transactions_partitioned_pkey TO transactions_pkey")
+    create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table('transactions', 'transactions_partitioned')
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE transactions_partitioned RENAME CONSTRAINT transactions_pkey TO transactions_partitioned_pkey")
+    for name in ('ix_transactions_id', 'ix_transactions_organization_id',
+                 'ix_transactions_org_type_created', 'ix_transactions_created_at_brin'):
+        op.drop_index(name, table_name='transactions_partitioned')
+    op.create_table('transactions',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('transactions_id_seq')"), nullable=False),
+    sa.Column('organization_id', sa.String(), nullable=True),
+    sa.Column('credit_type', postgresql.ENUM('RESPONDENT_CREDIT', 'EVIDENCE_CREDIT', name='credittype', create_type=False), nullable=False),
+    sa.Column('amount_minor', sa.BigInteger(), nullable=False),
+    sa.Column('transaction_type', postgresql.ENUM('PURCHASE', 'CONSUMPTION', 'REFUND', name='transactiontype', create_type=False), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_partitioned")
+    # Dropping the parent drops every attached partition; archived ones are left alone
+    op.drop_table('transactions_partitioned')
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+    create_indexes()
@@ -0,0 +1,96 @@
+"""
+Requests/sec of the workflow API in sync vs async database mode
+
+Seeds one assessment, then starts uvicorn once with DATABASE_ASYNC=false
+and once with DATABASE_ASYNC=true and hammers GET /workflow/assessments/{id}
+with N concurrent clients. Needs the Postgres from DATABASE_URL.
+
+Run from the project root:
+    python benchmarks/bench_async_db.py --concurrency 200 --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from src.core.config import settings
+from src.core.database import SessionLocal
+from src.workflow.service import WorkflowService
+
+def seed_assessment() -> int:
+    db = SessionLocal()
+    try:
+        assessment = WorkflowService().create_assessment(db, "org_bench", "financial")
+        return assessment.id
+    finally:
+        db.close()
+
+def start_server(port: int, async_mode: bool) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_ASYNC": "true" if async_mode else "false"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+
+def wait_for_server(base_url: str):
+    for _ in range(50):
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server failed to start")
+
+async def run_load(url: str, concurrency: int, total: int) -> tuple[float, int]:
+    remaining = total
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(url)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return total / elapsed, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    assessment_id = seed_assessment()
+    base_url = f"http://127.0.0.1:{args.port}"
+    url = f"{base_url}{settings.API_V1_STR}/workflow/assessments/{assessment_id}"
+
+    for async_mode in (False, True):
+        server = start_server(args.port, async_mode)
+        try:
+            wait_for_server(base_url)
+            asyncio.run(run_load(url, args.concurrency, args.concurrency))  # warm up pools
+            rps, errors = asyncio.run(run_load(url, args.concurrency, args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+
+        mode = "async" if async_mode else "sync"
+        print(f"{mode:>5}: {rps:8.1f} req/s  ({args.requests} requests, concurrency {args.concurrency}, {errors} errors)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Render cost per email: inline Template() per call vs the compiled registry
+
+"before" rebuilds a jinja2.Template from the template source for every email,
+as EmailService used to; "after" renders through EmailTemplateRegistry, which
+also produces the subject and the plain-text alternative. No SMTP involved:
+
+    python benchmarks/bench_email_templates.py --emails 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Template
+
+from src.core.email_templates import TEMPLATE_DIR, EmailTemplateRegistry
+
+CONTEXTS = {
+    "partner_invitation": {
+        "partner_org_name": "Acme Holdings",
+        "project_name": "Supplier Due Diligence 2026",
+        "deadline": "2026-11-30",
+        "accept_url": "http://localhost:3000/partner/accept/3f6c1a",
+    },
+    "assessment_submitted": {"partner_org_name": "Acme Holdings", "assessment_id": 4812},
+}
+
+def per_email_us(fn, emails: int) -> float:
+    fn()  # warm up
+    started = time.perf_counter()
+    for _ in range(emails):
+        fn()
+    return (time.perf_counter() - started) / emails * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=2000)
+    args = parser.parse_args()
+
+    registry = EmailTemplateRegistry()
+    started = time.perf_counter()
+    registry.warm()
+    print(f"registry warm-up: {(time.perf_counter() - started) * 1000:.1f} ms\n")
+
+    print(f"{'template':<24} {'before':>12} {'after':>12} {'speedup':>9}")
+    for name, context in CONTEXTS.items():
+        source = (TEMPLATE_DIR / registry.default_locale / f"{name}.html").read_text()
+        before = per_email_us(lambda: Template(source).render(**context), args.emails)
+        after = per_email_us(lambda: registry.render(name, **context), args.emails)
+        print(f"{name:<24} {before:>9.1f} us {after:>9.1f} us {before / after:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Before/after EXPLAIN ANALYZE for the workflow hot-query indexes
+
+Seeds a synthetic dataset with generate_series (tagged bench_org_*), then runs
+each hot query twice: once inside a transaction that drops the indexes added
+by migration 9d812977ad0a (rolled back afterwards) and once with them in
+place. Run against a migrated development database from the project root:
+
+    python benchmarks/bench_index_explain.py --assessments 5000
+    python benchmarks/bench_index_explain.py --cleanup
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from src.core.database import engine
+
+NEW_INDEXES = [
+    "ix_respondents_assessment_id",
+    "ix_evidence_response_id",
+    "ix_invitations_assessment_id",
+    "ix_assessments_org_status_created",
+    "ix_assessments_org_active",
+    "ix_invitations_assessment_pending",
+]
+
+QUERIES = {
+    "response upsert lookup": (
+        "SELECT * FROM responses WHERE respondent_id = :respondent_id AND question_id = 'Q7'"
+    ),
+    "respondents of assessment": (
+        "SELECT * FROM respondents WHERE assessment_id = :assessment_id"
+    ),
+    "evidence of response": (
+        "SELECT * FROM evidence WHERE response_id = :response_id"
+    ),
+    "invitations of assessment": (
+        "SELECT * FROM invitations WHERE assessment_id = :assessment_id"
+    ),
+    "org assessments by status": (
+        "SELECT * FROM assessments WHERE organization_id = 'bench_org_7' AND status = 'SUBMITTED' "
+        "ORDER BY created_at DESC LIMIT 50"
+    ),
+    "org active assessments": (
+        "SELECT * FROM assessments WHERE organization_id = 'bench_org_7' "
+        "AND status IN ('DRAFT', 'IN_PROGRESS', 'SUBMITTED', 'SCORING', 'ANALYST_REVIEW') "
+        "ORDER BY created_at DESC, id DESC LIMIT 50"
+    ),
+}
+
+SEED_SQL = [
+    """
+    INSERT INTO assessments (organization_id, sector, status, created_at)
+    SELECT 'bench_org_' || (g % 100), 'financial',
+           (ARRAY['DRAFT', 'IN_PROGRESS', 'SUBMITTED', 'COMPLETED', 'REJECTED'])[1 + g % 5]::assessmentstatus,
+           now() - (g || ' minutes')::interval
+    FROM generate_series(1, :assessments) g
+    """,
+    """
+    INSERT INTO invitations (assessment_id, partner_email, token, status, expires_at)
+    SELECT a.id, 'partner' || a.id || '@example.com', md5(random()::text || a.id),
+           'PENDING', now() + interval '14 days'
+    FROM assessments a WHERE a.organization_id LIKE 'bench_org_%'
+    """,
+    """
+    INSERT INTO respondents (assessment_id, email, role)
+    SELECT a.id, 'r' || g || '_' || a.id || '@example.com', 'CTO'
+    FROM assessments a, generate_series(1, 5) g
+    WHERE a.organization_id LIKE 'bench_org_%'
+    """,
+    """
+    INSERT INTO responses (respondent_id, question_id, answer_value)
+    SELECT r.id, 'Q' || g, '{"text": "yes"}'::json
+    FROM respondents r
+    JOIN assessments a ON a.id = r.assessment_id, generate_series(1, 20) g
+    WHERE a.organization_id LIKE 'bench_org_%'
+    """,
+    """
+    INSERT INTO evidence (response_id, file_name, s3_key)
+    SELECT resp.id, 'evidence.pdf', 'bench/' || resp.id || '.pdf'
+    FROM responses resp
+    JOIN respondents r ON r.id = resp.respondent_id
+    JOIN assessments a ON a.id = r.assessment_id
+    WHERE a.organization_id LIKE 'bench_org_%' AND resp.question_id IN ('Q1', 'Q7')
+    """,
+]
+
+CLEANUP_SQL = [
+    "DELETE FROM evidence WHERE s3_key LIKE 'bench/%'",
+    """
+    DELETE FROM responses WHERE respondent_id IN (
+        SELECT r.id FROM respondents r JOIN assessments a ON a.id = r.assessment_id
+        WHERE a.organization_id LIKE 'bench_org_%')
+    """,
+    """
+    DELETE FROM respondents WHERE assessment_id IN (
+        SELECT id FROM assessments WHERE organization_id LIKE 'bench_org_%')
+    """,
+    """
+    DELETE FROM invitations WHERE assessment_id IN (
+        SELECT id FROM assessments WHERE organization_id LIKE 'bench_org_%')
+    """,
+    "DELETE FROM assessments WHERE organization_id LIKE 'bench_org_%'",
+]
+
+def sample_params(conn) -> dict:
+    row = conn.execute(text("""
+        SELECT a.id, r.id, resp.id
+        FROM assessments a
+        JOIN respondents r ON r.assessment_id = a.id
+        JOIN responses resp ON resp.respondent_id = r.id AND resp.question_id = 'Q7'
+        WHERE a.organization_id = 'bench_org_7'
+        LIMIT 1
+    """)).one()
+    return {"assessment_id": row[0], "respondent_id": row[1], "response_id": row[2]}
+
+def explain(conn, sql: str, params: dict) -> tuple[float, str]:
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]
+    return root["Execution Time"], root["Plan"]["Node Type"]
+
+def run_queries(conn, params: dict) -> dict:
+    results = {}
+    for name, sql in QUERIES.items():
+        used = {key: value for key, value in params.items() if f":{key}" in sql}
+        explain(conn, sql, used)  # warm the cache
+        results[name] = explain(conn, sql, used)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assessments", type=int, default=5000)
+    parser.add_argument("--cleanup", action="store_true", help="Delete the seeded rows and exit")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        for sql in CLEANUP_SQL:
+            conn.execute(text(sql))
+    if args.cleanup:
+        print("Removed benchmark rows")
+        return
+
+    with engine.begin() as conn:
+        for sql in SEED_SQL:
+            conn.execute(text(sql), {"assessments": args.assessments})
+        conn.execute(text("ANALYZE assessments, invitations, respondents, responses, evidence"))
+
+    with engine.connect() as conn:
+        params = sample_params(conn)
+        conn.rollback()
+
+        # DROP INDEX is transactional, so the "before" plans leave no trace
+        transaction = conn.begin()
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(text(
+            "ALTER TABLE responses DROP CONSTRAINT IF EXISTS uq_responses_respondent_question"
+        ))
+        before = run_queries(conn, params)
+        transaction.rollback()
+
+        after = run_queries(conn, params)
+
+    print(f"{'query':<28} {'before':>29} {'after':>29}")
+    for name in QUERIES:
+        (before_ms, before_node), (after_ms, after_node) = before[name], after[name]
+        print(f"{name:<28} {before_ms:>8.3f} ms {before_node:>17} {after_ms:>8.3f} ms {after_node:>17}")
+
+if __name__ == "__main__":
+    main()
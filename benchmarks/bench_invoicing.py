@@ -0,0 +1,95 @@
+"""
+Month-end invoicing against a synthetic transactions table
+
+Seeds --rows transactions (10M by default, tagged bench_org_*) spread over
+--orgs organizations within one month using generate_series, then times a
+full InvoicingService.run_month_end and reports peak memory. Run against a
+migrated development database from the project root:
+
+    python benchmarks/bench_invoicing.py --rows 10000000 --orgs 5000
+    python benchmarks/bench_invoicing.py --reuse          # skip seeding
+    python benchmarks/bench_invoicing.py --cleanup
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from src.api_core.billing.invoicing import InvoicingService
+from src.core.database import SessionLocal, engine
+
+MONTH = datetime(2026, 9, 1)
+SEED_BATCH = 1_000_000
+
+SEED_SQL = """
+    INSERT INTO transactions (organization_id, credit_type, amount_minor, transaction_type, description, created_at)
+    SELECT 'bench_org_' || (g % :orgs),
+           (ARRAY['RESPONDENT_CREDIT', 'EVIDENCE_CREDIT'])[1 + g % 2]::credittype,
+           CASE WHEN g % 10 = 0 THEN 10000 WHEN g % 97 = 0 THEN 100 ELSE -100 END,
+           (CASE WHEN g % 10 = 0 THEN 'PURCHASE' WHEN g % 97 = 0 THEN 'REFUND' ELSE 'CONSUMPTION' END)::transactiontype,
+           'bench',
+           CAST(:month AS timestamptz) + (g::float / :rows) * interval '30 days'
+    FROM generate_series(:start, :stop) g
+"""
+
+CLEANUP_SQL = "DELETE FROM transactions WHERE organization_id LIKE 'bench_org_%'"
+
+def seed(rows: int, orgs: int):
+    for start in range(1, rows + 1, SEED_BATCH):
+        stop = min(start + SEED_BATCH - 1, rows)
+        with engine.begin() as conn:
+            conn.execute(text(SEED_SQL), {"orgs": orgs, "rows": rows, "month": MONTH, "start": start, "stop": stop})
+        print(f"  seeded {stop:,} / {rows:,}", flush=True)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE transactions"))
+
+def peak_rss_mb(who) -> float:
+    return resource.getrusage(who).ru_maxrss / 1024  # kilobytes on Linux
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--orgs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--reuse", action="store_true", help="Use the rows seeded by a previous run")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the seeded rows and exit")
+    args = parser.parse_args()
+
+    if not args.reuse:
+        with engine.begin() as conn:
+            conn.execute(text(CLEANUP_SQL))
+    if args.cleanup:
+        print("Removed benchmark rows")
+        return
+    if not args.reuse:
+        print(f"Seeding {args.rows:,} transactions for {args.orgs:,} organizations")
+        seed(args.rows, args.orgs)
+
+    db = SessionLocal()
+    service = InvoicingService()
+    try:
+        started = time.perf_counter()
+        organizations = sum(1 for _ in service.stream_invoices(db, MONTH))
+        aggregated = time.perf_counter() - started
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            started = time.perf_counter()
+            result = service.run_month_end(db, MONTH, output_dir=output_dir, workers=args.workers)
+            elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    print(f"{'aggregate only':<24} {aggregated:>8.2f} s  {organizations:,} organizations")
+    print(f"{'aggregate + render':<24} {elapsed:>8.2f} s  {result['invoices']:,} invoices")
+    print(f"{'peak RSS (parent)':<24} {peak_rss_mb(resource.RUSAGE_SELF):>8.1f} MB")
+    print(f"{'peak RSS (workers)':<24} {peak_rss_mb(resource.RUSAGE_CHILDREN):>8.1f} MB")
+
+if __name__ == "__main__":
+    main()
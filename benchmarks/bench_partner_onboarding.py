@@ -0,0 +1,98 @@
+"""
+Partner onboarding: one assessment + invitation call per partner vs the batch API
+
+"before" creates each partner the way clients had to, with
+WorkflowService.create_assessment and InvitationService.create_invitation
+(several commits and statements per partner); "after" is one
+InvitationService.onboard_partners call. Rows are tagged bench_onboarding and
+removed afterwards. Run against a migrated development database from the
+project root:
+
+    python benchmarks/bench_partner_onboarding.py --partners 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from src.core.database import SessionLocal, engine
+from src.notifications.models import OutboundEmail
+from src.outbox.models import OutboxEvent
+from src.workflow.invitation_service import InvitationService
+from src.workflow.models import Assessment, Invitation, Project
+from src.workflow.service import WorkflowService
+
+ORGANIZATION_ID = "bench_onboarding"
+
+def partners(count: int, tag: str) -> list[dict]:
+    return [{"partner_email": f"supplier{i}.{tag}@example.com", "partner_org_name": f"Supplier {i}"} for i in range(count)]
+
+def new_project(db) -> Project:
+    return WorkflowService().create_project(db, "Onboarding benchmark", ORGANIZATION_ID, sector="procurement")
+
+def one_by_one(db, project: Project, batch: list[dict]):
+    workflow, invitations = WorkflowService(), InvitationService()
+    for partner in batch:
+        assessment = workflow.create_assessment(db, ORGANIZATION_ID, "procurement", project_id=project.id,
+                                                partner_org_name=partner["partner_org_name"])
+        invitations.create_invitation(db, assessment.id, partner["partner_email"], partner["partner_org_name"])
+
+def batched(db, project: Project, batch: list[dict]):
+    result = InvitationService().onboard_partners(db, project.id, batch)
+    assert result["created"] == len(batch), result["errors"][:3]
+
+def timed(fn, partner_count: int, tag: str):
+    counter = {"count": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    db = SessionLocal()
+    try:
+        project = new_project(db)
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        started = time.perf_counter()
+        fn(db, project, partners(partner_count, tag))
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        db.close()
+    return elapsed, counter["count"]
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        assessment_ids = db.query(Assessment.id).filter(Assessment.organization_id == ORGANIZATION_ID)
+        invitation_ids = [str(i) for (i,) in db.query(Invitation.id).filter(Invitation.assessment_id.in_(assessment_ids))]
+        db.query(OutboxEvent).filter(OutboxEvent.aggregate_type == "invitation",
+                                     OutboxEvent.aggregate_id.in_(invitation_ids)).delete(synchronize_session=False)
+        db.query(OutboundEmail).filter(OutboundEmail.assessment_id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.query(Invitation).filter(Invitation.assessment_id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.query(Assessment).filter(Assessment.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.query(Project).filter(Project.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--partners", type=int, default=1000)
+    args = parser.parse_args()
+
+    try:
+        before, before_statements = timed(one_by_one, args.partners, "single")
+        after, after_statements = timed(batched, args.partners, "batch")
+    finally:
+        cleanup()
+
+    print(f"{'mode':<28} {'seconds':>9} {'statements':>11}")
+    print(f"{'one call per partner':<28} {before:>9.2f} {before_statements:>11}")
+    print(f"{'onboard_partners':<28} {after:>9.2f} {after_statements:>11}")
+    print(f"speedup: {before / after:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Full ledger reconciliation pass over a synthetic transactions table
+
+Reuses the bench_org_* rows seeded by bench_invoicing.py (seeding them if
+absent), gives each benchmark organization a ledger row that matches its
+transactions, then times reconcile_ledger in report-only mode. Run against a
+migrated development database from the project root:
+
+    python benchmarks/bench_reconcile.py --rows 20000000
+    python benchmarks/bench_invoicing.py --cleanup
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from benchmarks.bench_invoicing import peak_rss_mb, seed
+from src.billing.reconcile import reconcile_ledger
+from src.core.database import SessionLocal, engine
+import resource
+
+LEDGER_SQL = """
+    INSERT INTO credit_ledger (organization_id, credit_type, balance_minor)
+    SELECT organization_id, credit_type, SUM(amount_minor)
+    FROM transactions WHERE organization_id LIKE 'bench_org_%'
+    GROUP BY organization_id, credit_type
+    ON CONFLICT ON CONSTRAINT uq_credit_ledger_org_type DO UPDATE SET balance_minor = excluded.balance_minor
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--orgs", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        seeded = conn.execute(text("SELECT COUNT(*) FROM transactions WHERE organization_id LIKE 'bench_org_%'")).scalar()
+    if seeded < args.rows:
+        print(f"Seeding {args.rows:,} transactions for {args.orgs:,} organizations")
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM transactions WHERE organization_id LIKE 'bench_org_%'"))
+        seed(args.rows, args.orgs)
+    with engine.begin() as conn:
+        conn.execute(text(LEDGER_SQL))
+
+    db = SessionLocal()
+    try:
+        report = reconcile_ledger(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+
+    print(f"{report['ledger_rows']:,} ledger rows checked in {report['elapsed_seconds']:.1f} s, "
+          f"{len(report['discrepancies'])} discrepancies")
+    print(f"peak RSS {peak_rss_mb(resource.RUSAGE_SELF):.1f} MB")
+
+if __name__ == "__main__":
+    main()
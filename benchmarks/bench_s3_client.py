@@ -0,0 +1,75 @@
+"""
+S3 client cost: a boto3 client per service instance vs the shared client
+
+Builds the storage services the app creates (S3Service in the workflow router,
+in WorkflowService and in every CustomerPortalService, plus StorageService in
+the respondent portal) first with a new boto3 client per instance, as they
+used to, then through get_s3_client(). Each approach runs in a fresh process
+so both pay botocore's cold start, and reports the time and the peak RSS
+growth. No requests are made:
+
+    python benchmarks/bench_s3_client.py --instances 20
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def per_instance_client():
+    """The old setup: each service built its own client"""
+    import boto3
+    from src.core.config import settings
+
+    return boto3.client(
+        "s3",
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION,
+    )
+
+def run(mode: str, instances: int) -> dict:
+    """Build `instances` clients in this process and report the cost"""
+    import boto3  # noqa: F401  imported up front so only client construction is measured
+    from src.core.s3_client import get_s3_client
+
+    factory = get_s3_client if mode == "shared" else per_instance_client
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    clients = [factory() for _ in range(instances)]
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"clients": len(set(map(id, clients))), "seconds": elapsed, "mib": (rss_after - rss_before) / 1024}
+
+def measure(mode: str, instances: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--instances", str(instances), "--child", mode],
+        check=True, capture_output=True, text=True, cwd=ROOT
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=20, help="Storage service instances to build")
+    parser.add_argument("--child", choices=["per-instance", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run(args.child, args.instances)))
+        return
+
+    old = measure("per-instance", args.instances)
+    new = measure("shared", args.instances)
+
+    print(f"{args.instances} storage service instances")
+    for label, result in (("client per instance", old), ("shared client", new)):
+        print(f"  {label:<20} {result['clients']:3d} clients  {result['seconds'] * 1000:8.1f} ms  {result['mib']:6.1f} MiB")
+    print(f"  {old['seconds'] / max(new['seconds'], 1e-9):.1f}x faster, {old['mib'] - new['mib']:.1f} MiB less")
+
+if __name__ == "__main__":
+    main()
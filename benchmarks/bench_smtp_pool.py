@@ -0,0 +1,98 @@
+"""
+SMTP throughput: a new connection per message vs the pooled delivery engine
+
+Runs a local aiosmtpd sink and sends the same batch of messages the old way
+(connect, EHLO, send, QUIT per message, as EmailService used to) and through
+SMTPDeliveryEngine at several parallelism levels. Loopback without TLS makes
+connecting far cheaper than against a real relay; --handshake-ms adds a delay
+to every EHLO to stand in for the TLS and AUTH round trips:
+
+    python benchmarks/bench_smtp_pool.py --messages 1000 --handshake-ms 20
+"""
+import argparse
+import asyncio
+import os
+import smtplib
+import socket
+import sys
+import time
+from email.message import EmailMessage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiosmtpd.controller import Controller
+
+from src.core.smtp_pool import SMTPConnectionPool, SMTPDeliveryEngine
+
+class CountingSink:
+    def __init__(self, handshake_ms: float):
+        self.handshake = handshake_ms / 1000
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        if self.handshake:
+            await asyncio.sleep(self.handshake)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+def build_messages(count: int) -> list[EmailMessage]:
+    messages = []
+    for i in range(count):
+        msg = EmailMessage()
+        msg["From"] = "noreply@futureform.africa"
+        msg["To"] = f"partner{i}@example.com"
+        msg["Subject"] = "You're invited to complete an assessment"
+        msg.set_content("Hello,\n\nPlease complete the assessment.\n" * 20)
+        messages.append(msg)
+    return messages
+
+def connection_per_message(port: int, messages: list):
+    for msg in messages:
+        with smtplib.SMTP("127.0.0.1", port, timeout=30) as smtp:
+            smtp.send_message(msg)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--handshake-ms", type=float, default=0.0)
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--max-per-connection", type=int, default=100)
+    args = parser.parse_args()
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    sink = CountingSink(args.handshake_ms)
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    messages = build_messages(args.messages)
+
+    try:
+        print(f"{'mode':<28} {'msgs/s':>9} {'connections':>12} {'delivered':>10}")
+        sink.received = 0
+        started = time.perf_counter()
+        connection_per_message(port, messages)
+        elapsed = time.perf_counter() - started
+        print(f"{'connection per message':<28} {len(messages) / elapsed:>9.0f} {len(messages):>12} {sink.received:>10}")
+
+        for parallelism in args.parallelism:
+            pool = SMTPConnectionPool("127.0.0.1", port, user="", password="", size=parallelism,
+                                      max_messages=args.max_per_connection, starttls=False, timeout=30)
+            engine = SMTPDeliveryEngine(pool, parallelism=parallelism)
+            sink.received = 0
+            started = time.perf_counter()
+            failures = [r for r in engine.send_batch(messages) if r is not None]
+            elapsed = time.perf_counter() - started
+            engine.close()
+            label = f"pool, parallelism {parallelism}"
+            print(f"{label:<28} {len(messages) / elapsed:>9.0f} {pool.connections_opened:>12} "
+                  f"{sink.received:>10}{f'  ({len(failures)} failed)' if failures else ''}")
+    finally:
+        controller.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,236 @@
+"""
+Usage metering in front of the credit ledger
+
+High-frequency consumption (evidence uploads, API calls) shouldn't cost a
+ledger UPDATE and a commit per event. Debits are buffered in process and
+flushed in batches: one conditional UPDATE per organization and credit type
+and one multi-row INSERT into transactions per flush, by whichever comes
+first of METERING_FLUSH_SIZE events or METERING_FLUSH_INTERVAL_SECONDS.
+
+Balance checks are served from a cached view of each ledger row (refreshed
+after METERING_BALANCE_TTL_SECONDS and after every flush) minus the debits
+still buffered. Once a debit would leave less than METERING_STRICT_BELOW_CREDITS
+available, the meter stops buffering for that organization: it flushes and
+debits synchronously through BillingService, so the last credits are never
+oversold.
+"""
+from dataclasses import dataclass
+from sqlalchemy import insert, update
+from src.billing.models import CreditLedger as LedgerRow, CreditType, Transaction, TransactionType, from_minor, to_minor
+from src.billing.service import BillingService
+from src.core.config import settings
+from src.core.database import SessionLocal
+from datetime import datetime, timezone
+import atexit
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK = 1000
+
+@dataclass
+class BalanceView:
+    available_minor: int  # balance - held when last read or flushed
+    fetched_at: float
+    pending_minor: int = 0  # Buffered debits not yet written
+
 class CreditLedger:
-    def check_balance(self, user_id):
-        pass
+    """Buffered credit debits with cached balance checks"""
+
+    def __init__(self, session_factory=SessionLocal, flush_size: int = None, flush_interval: float = None,
+                 balance_ttl: float = None, strict_below: float = None):
+        self.session_factory = session_factory
+        self.flush_size = flush_size or settings.METERING_FLUSH_SIZE
+        self.flush_interval = flush_interval or settings.METERING_FLUSH_INTERVAL_SECONDS
+        self.balance_ttl = settings.METERING_BALANCE_TTL_SECONDS if balance_ttl is None else balance_ttl
+        strict_below = settings.METERING_STRICT_BELOW_CREDITS if strict_below is None else strict_below
+        self.strict_below_minor = to_minor(strict_below)
+        self.billing_service = BillingService()
+
+        self._lock = threading.Lock()  # Buffer and views
+        self._io_lock = threading.Lock()  # Flushes and refreshes, so they never interleave
+        self._buffer: list[dict] = []
+        self._views: dict[tuple, BalanceView] = {}
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def check_balance(self, organization_id: str, credit_type: CreditType = CreditType.RESPONDENT_CREDIT) -> float:
+        """Available credits (balance - held - buffered debits), from the cached view"""
+        view = self._view(organization_id, credit_type)
+        with self._lock:
+            return from_minor(view.available_minor - view.pending_minor)
+
+    def debit_credits(self, organization_id: str, amount: float,
+                      credit_type: CreditType = CreditType.RESPONDENT_CREDIT, description: str = None) -> float:
+        """
+        Record a consumption
+
+        Buffered while the organization has comfortable headroom; otherwise
+        written synchronously with the same guarantee as BillingService.consume_credits.
+
+        Returns:
+            Available credits after the debit
+
+        Raises:
+            InsufficientCreditsError: synchronous path only, when the balance can't cover amount
+        """
+        minor = to_minor(amount)
+        key = (organization_id, credit_type)
+        view = self._view(organization_id, credit_type)
+        with self._lock:
+            remaining = view.available_minor - view.pending_minor - minor
+            buffered = remaining >= self.strict_below_minor
+            if buffered:
+                view.pending_minor += minor
+                self._buffer.append({
+                    "organization_id": organization_id,
+                    "credit_type": credit_type,
+                    "amount_minor": -minor,
+                    "transaction_type": TransactionType.CONSUMPTION,
+                    "description": description,
+                    # Billed to the moment of use, not the moment of the flush
+                    "created_at": datetime.now(timezone.utc),
+                })
+                full = len(self._buffer) >= self.flush_size
+
+        if buffered:
+            self._start_flusher()
+            if full:
+                self.flush()
+            return from_minor(remaining)
+
+        # Low balance: everything goes through the ledger row, in order
+        self.flush()
+        db = self.session_factory()
+        try:
+            self.billing_service.consume_credits(db, organization_id, credit_type, amount, description)
+        finally:
+            db.close()
+        with self._lock:
+            self._views.pop(key, None)
+        return self.check_balance(organization_id, credit_type)
+
+    def flush(self) -> int:
+        """
+        Write buffered debits: one ledger UPDATE per organization and credit type, one multi-row INSERT
+
+        Returns:
+            Number of events written
+        """
+        with self._io_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return 0
+
+            totals = {}
+            for event in events:
+                key = (event["organization_id"], event["credit_type"])
+                totals[key] = totals.get(key, 0) - event["amount_minor"]
+
+            db = self.session_factory()
+            try:
+                available = {}
+                for (organization_id, credit_type), minor in totals.items():
+                    available[(organization_id, credit_type)] = self._apply_debit(db, organization_id, credit_type, minor)
+                for offset in range(0, len(events), INSERT_CHUNK):
+                    db.execute(insert(Transaction).values(events[offset:offset + INSERT_CHUNK]))
+                db.commit()
+            except Exception:
+                db.rollback()
+                # Put the events back in front so the next flush retries them in order
+                with self._lock:
+                    self._buffer[:0] = events
+                raise
+            finally:
+                db.close()
+
+            now = time.monotonic()
+            with self._lock:
+                for key, minor in totals.items():
+                    view = self._views.get(key)
+                    if view:
+                        view.pending_minor -= minor
+                        if available[key] is not None:
+                            view.available_minor, view.fetched_at = available[key], now
+        return len(events)
+
+    def close(self):
+        """Stop the background flusher and write what's left"""
+        self._stop.set()
+        if self._flusher:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def _apply_debit(self, db, organization_id: str, credit_type: CreditType, minor: int):
+        """Debit a flushed batch; returns the available balance after it"""
+        ledger = LedgerRow
+        where = (ledger.organization_id == organization_id, ledger.credit_type == credit_type)
+        available = db.execute(
+            update(ledger)
+            .where(*where, ledger.balance_minor - ledger.held_minor >= minor)
+            .values(balance_minor=ledger.balance_minor - minor)
+            .returning(ledger.balance_minor - ledger.held_minor)
+        ).scalar()
+        if available is None:
+            # Other processes spent the headroom this one was buffering against. The
+            # usage already happened, so record it and let the balance go negative.
+            logger.warning(
+                f"Metered usage of {from_minor(minor):g} credits overdrew {organization_id} ({credit_type.value})"
+            )
+            available = db.execute(
+                update(ledger).where(*where)
+                .values(balance_minor=ledger.balance_minor - minor)
+                .returning(ledger.balance_minor - ledger.held_minor)
+            ).scalar()
+        return available
+
+    def _view(self, organization_id: str, credit_type: CreditType) -> BalanceView:
+        key = (organization_id, credit_type)
+        with self._lock:
+            view = self._views.get(key)
+            if view and time.monotonic() - view.fetched_at < self.balance_ttl:
+                return view
+
+        # Reconcile with the ledger row; serialized with flushes so buffered
+        # debits are counted exactly once
+        with self._io_lock:
+            db = self.session_factory()
+            try:
+                row = db.query(LedgerRow.balance_minor, LedgerRow.held_minor).filter(
+                    LedgerRow.organization_id == organization_id,
+                    LedgerRow.credit_type == credit_type
+                ).first()
+            finally:
+                db.close()
+            available = row.balance_minor - row.held_minor if row else 0
+            with self._lock:
+                view = self._views.get(key)
+                if view:
+                    view.available_minor, view.fetched_at = available, time.monotonic()
+                else:
+                    view = self._views[key] = BalanceView(available, time.monotonic())
+                return view
+
+    def _start_flusher(self):
+        if self._flusher:
+            return
+        with self._lock:
+            if self._flusher:
+                return
+            self._flusher = threading.Thread(target=self._flush_periodically, name="credit-metering", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Credit metering flush failed; retrying next interval")
 
-    def debit_credits(self, user_id, amount, credit_type):
-        pass
+# Shared per process, so every caller's events land in one buffer
+credit_ledger = CreditLedger()
@@ -1,3 +1,199 @@
+"""
+Monthly invoices built from the transactions table
+
+Aggregation is pushed down to the database: one GROUP BY over the month's
+transactions returns a handful of rows per organization, streamed with
+yield_per so a month-end run never holds more than one batch in memory.
+Rendering is CPU-bound, so invoices are rendered in a process pool with a
+bounded number in flight:
+
+    python -m src.api_core.billing.invoicing 2026-09
+"""
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from itertools import groupby
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from src.billing.models import Transaction, TransactionType, from_minor
+from src.billing.rollup import as_utc, month_start, next_month
+from src.billing.service import CREDIT_NAMES
+from src.core.config import settings
+from src.core.database import SessionLocal
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+def invoice_number(organization_id: str, period_start: datetime) -> str:
+    return f"INV-{period_start:%Y%m}-{organization_id}"
+
+def render_invoice(invoice: dict) -> tuple[str, str]:
+    """
+    Render one invoice summary as plain text
+
+    Module-level and pure so it can run in a worker process.
+
+    Returns:
+        (invoice number, rendered document)
+    """
+    lines = [
+        f"Invoice {invoice['invoice_number']}",
+        f"Organization: {invoice['organization_id']}",
+        # period_end is exclusive; show the last day billed
+        f"Period: {invoice['period_start']:%Y-%m-%d} to {invoice['period_end'] - timedelta(days=1):%Y-%m-%d}",
+        "",
+        f"{'Credit type':<22}{'Purchased':>12}{'Consumed':>12}{'Refunded':>12}{'Net':>12}{'Txns':>8}",
+    ]
+    for line in invoice["lines"]:
+        lines.append(
+            f"{line['credit_name']:<22}{line['purchased']:>12.2f}{line['consumed']:>12.2f}"
+            f"{line['refunded']:>12.2f}{line['net']:>12.2f}{line['transaction_count']:>8}"
+        )
+    return invoice["invoice_number"], "\n".join(lines) + "\n"
+
 class InvoicingService:
-    def generate_invoice(self, user_id):
-        pass
+    """Aggregate and render monthly usage invoices"""
+
+    def stream_invoices(self, db: Session, period_start: datetime, organization_id: str = None,
+                        batch_size: int = None):
+        """
+        Yield one invoice summary per organization with activity in the month
+
+        Rows arrive ordered by organization, so each invoice is assembled from
+        consecutive rows and released before the next one starts.
+        """
+        # Aware UTC bounds: compared with the timestamptz column they select the UTC
+        # calendar month whatever the session's TimeZone, and still use the index
+        period_start = month_start(as_utc(period_start))
+        period_end = next_month(period_start)
+        query = db.query(
+            Transaction.organization_id,
+            Transaction.credit_type,
+            Transaction.transaction_type,
+            func.sum(func.abs(Transaction.amount_minor)).label("amount_minor"),
+            func.count(Transaction.id).label("transaction_count")
+        ).filter(
+            Transaction.created_at >= period_start,
+            Transaction.created_at < period_end
+        )
+        if organization_id:
+            query = query.filter(Transaction.organization_id == organization_id)
+        rows = query.group_by(
+            Transaction.organization_id, Transaction.credit_type, Transaction.transaction_type
+        ).order_by(
+            Transaction.organization_id, Transaction.credit_type
+        ).yield_per(batch_size or settings.INVOICE_STREAM_BATCH)
+
+        for org_id, org_rows in groupby(rows, key=lambda row: row.organization_id):
+            yield self._build_invoice(org_id, period_start, period_end, org_rows)
+
+    def generate_invoice(self, db: Session, organization_id: str, period_start: datetime):
+        """
+        Build one organization's invoice for the month containing period_start
+
+        Returns:
+            Invoice summary with rendered text, or None if there was no activity
+        """
+        invoices = list(self.stream_invoices(db, period_start, organization_id))
+        if not invoices:
+            return None
+        invoice = invoices[0]
+        invoice["document"] = render_invoice(invoice)[1]
+        return invoice
+
+    def run_month_end(self, db: Session, period_start: datetime, output_dir: str = None,
+                      workers: int = None, executor: Executor = None) -> dict:
+        """
+        Render every organization's invoice for a month into output_dir
+
+        At most two tasks per worker are in flight, so memory stays flat however
+        many organizations there are.
+
+        Returns:
+            Counts and totals for the run
+        """
+        period_start = month_start(as_utc(period_start))
+        output = Path(output_dir or settings.INVOICE_OUTPUT_DIR) / f"{period_start:%Y-%m}"
+        output.mkdir(parents=True, exist_ok=True)
+        workers = workers or settings.INVOICE_RENDER_WORKERS or os.cpu_count() or 1
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+
+        rendered = 0
+        totals = {}
+        pending = set()
+
+        def drain(block_until):
+            nonlocal pending, rendered
+            done, pending = wait(pending, return_when=block_until)
+            for future in done:
+                number, document = future.result()
+                (output / f"{number}.txt").write_text(document)
+                rendered += 1
+
+        try:
+            for invoice in self.stream_invoices(db, period_start):
+                for line in invoice["lines"]:
+                    totals[line["credit_type"]] = totals.get(line["credit_type"], 0.0) + line["net"]
+                pending.add(pool.submit(render_invoice, invoice))
+                if len(pending) >= workers * 2:
+                    drain(FIRST_COMPLETED)
+            if pending:
+                drain(ALL_COMPLETED)
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+        logger.info(f"Rendered {rendered} invoices for {period_start:%Y-%m} into {output}")
+        return {
+            "period_start": period_start,
+            "invoices": rendered,
+            "output_dir": str(output),
+            "net_by_credit_type": totals,
+        }
+
+    def _build_invoice(self, organization_id: str, period_start: datetime, period_end: datetime, rows) -> dict:
+        lines = []
+        for credit_type, type_rows in groupby(rows, key=lambda row: row.credit_type):
+            amounts = {transaction_type: 0 for transaction_type in TransactionType}
+            count = 0
+            for row in type_rows:
+                amounts[row.transaction_type] += row.amount_minor
+                count += row.transaction_count
+            net = (
+                amounts[TransactionType.PURCHASE] + amounts[TransactionType.REFUND]
+                - amounts[TransactionType.CONSUMPTION]
+            )
+            lines.append({
+                "credit_type": credit_type.value,
+                "credit_name": CREDIT_NAMES.get(credit_type, credit_type.value),
+                "purchased": from_minor(amounts[TransactionType.PURCHASE]),
+                "consumed": from_minor(amounts[TransactionType.CONSUMPTION]),
+                "refunded": from_minor(amounts[TransactionType.REFUND]),
+                "net": from_minor(net),
+                "transaction_count": count,
+            })
+        return {
+            "invoice_number": invoice_number(organization_id, period_start),
+            "organization_id": organization_id,
+            "period_start": period_start,
+            "period_end": period_end,
+            "lines": lines,
+        }
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    period = datetime.strptime(sys.argv[1], "%Y-%m") if len(sys.argv) > 1 else None
+    db = SessionLocal()
+    try:
+        if period is None:
+            # Default to the month that just closed
+            period = month_start(month_start(datetime.now(timezone.utc)) - timedelta(days=1))
+        result = InvoicingService().run_month_end(db, period)
+        print(f"Rendered {result['invoices']} invoices into {result['output_dir']}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
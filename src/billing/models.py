@@ -1,8 +1,19 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Float
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey, DateTime, Enum, Index, UniqueConstraint, text
 from sqlalchemy.sql import func
 import enum
 from src.core.database import Base
 
+# Amounts are stored as integers in hundredths of a credit, so sums are exact
+MINOR_UNITS_PER_CREDIT = 100
+
+def to_minor(credits: float) -> int:
+    """Credits (as accepted by the API) to integer minor units"""
+    return int(round(credits * MINOR_UNITS_PER_CREDIT))
+
+def from_minor(minor: int) -> float:
+    """Integer minor units back to credits"""
+    return (minor or 0) / MINOR_UNITS_PER_CREDIT
+
 class CreditType(str, enum.Enum):
     RESPONDENT_CREDIT = "RC"
     EVIDENCE_CREDIT = "EC"
@@ -12,24 +23,89 @@ class TransactionType(str, enum.Enum):
     CONSUMPTION = "CONSUMPTION"
     REFUND = "REFUND"
 
+class ReservationStatus(str, enum.Enum):
+    HELD = "HELD"
+    COMMITTED = "COMMITTED"
+    RELEASED = "RELEASED"
+    EXPIRED = "EXPIRED"
+
 class CreditLedger(Base):
     __tablename__ = "credit_ledger"
+    __table_args__ = (
+        # One balance row per organization and credit type, so atomic UPDATEs hit exactly one row
+        UniqueConstraint("organization_id", "credit_type", name="uq_credit_ledger_org_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(String, index=True)
     credit_type = Column(Enum(CreditType), nullable=False)
-    balance = Column(Float, default=0.0)
+    # Current-state projection of the transactions, kept for the atomic debit;
+    # snapshots plus deltas (see rollup.py) are the auditable record
+    balance_minor = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    held_minor = Column(BigInteger, nullable=False, default=0, server_default=text("0"))  # Reserved, not yet spent
     
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 class Transaction(Base):
+    """
+    Append-only credit movements
+
+    On Postgres the table is range-partitioned by created_at month, with
+    primary key (id, created_at) as partitioning requires; partitions are
+    created ahead and archived by src/billing/partitions.py. id alone is
+    still unique (one sequence), so it stays the ORM identity.
+    """
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Deltas since the latest snapshot
+        Index("ix_transactions_org_type_created", "organization_id", "credit_type", "created_at"),
+        # Month-end invoicing scans one month across all organizations; rows arrive
+        # in created_at order, so a BRIN index covers the range at a fraction of a btree's size
+        Index("ix_transactions_created_at_brin", "created_at", postgresql_using="brin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(String, index=True)
     credit_type = Column(Enum(CreditType), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount_minor = Column(BigInteger, nullable=False)  # Signed delta: negative for CONSUMPTION
     transaction_type = Column(Enum(TransactionType), nullable=False)
     description = Column(String)
     
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Partition key
+
+class CreditReservation(Base):
+    """Credits held for a multi-step operation until it commits, releases or expires"""
+    __tablename__ = "credit_reservations"
+    __table_args__ = (
+        # TTL sweep only scans live holds
+        Index("ix_credit_reservations_held_expires", "expires_at", postgresql_where=text("status = 'HELD'")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(String, nullable=False, index=True)
+    credit_type = Column(Enum(CreditType), nullable=False)
+    amount_minor = Column(BigInteger, nullable=False)
+    status = Column(Enum(ReservationStatus), nullable=False, default=ReservationStatus.HELD)
+    description = Column(String)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    resolved_at = Column(DateTime(timezone=True))
+
+class BalanceSnapshot(Base):
+    """Closing balance of one organization's credit type at the end of a month"""
+    __tablename__ = "balance_snapshots"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "credit_type", "period_start", name="uq_balance_snapshots_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(String, nullable=False)
+    credit_type = Column(Enum(CreditType), nullable=False)
+    period_start = Column(DateTime(timezone=True), nullable=False)
+    period_end = Column(DateTime(timezone=True), nullable=False)  # Exclusive; deltas after the snapshot start here
+    balance_minor = Column(BigInteger, nullable=False)  # Closing balance at period_end
+    delta_minor = Column(BigInteger, nullable=False)  # Net change within the period
+    transaction_count = Column(Integer, nullable=False)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,146 @@
+"""
+Monthly partitions of the transactions table (Postgres)
+
+transactions is range-partitioned by created_at, one partition per calendar
+month named transactions_yYYYYmMM, so history, rollup and invoice queries
+bounded by created_at prune to the months they touch. Run daily:
+
+    python -m src.billing.partitions
+
+which creates partitions TRANSACTION_PARTITIONS_AHEAD months ahead and
+detaches partitions older than TRANSACTION_PARTITION_RETENTION_MONTHS into
+the TRANSACTION_ARCHIVE_SCHEMA schema. A partition is only archived once the
+monthly balance snapshots cover it, so balances stay derivable from the
+latest snapshot plus the live partitions. Elsewhere (sqlite in tests) these
+functions do nothing.
+"""
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from src.billing.models import BalanceSnapshot
+from src.billing.rollup import as_utc, month_start, next_month, previous_month
+from src.core.config import settings
+from src.core.database import SessionLocal
+from datetime import datetime, timezone
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+PARENT = "transactions"
+PARTITION_NAME = re.compile(r"^transactions_y(\d{4})m(\d{2})$")
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_y{month:%Y}m{month:%m}"
+
+def partition_month(name: str):
+    """Month a partition covers, or None for the default partition and anything else"""
+    match = PARTITION_NAME.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc) if match else None
+
+def months_to_create(now: datetime, ahead: int) -> list[datetime]:
+    """The current month and the next `ahead` months"""
+    months = [month_start(as_utc(now))]
+    for _ in range(ahead):
+        months.append(next_month(months[-1]))
+    return months
+
+def months_to_archive(existing: list[datetime], now: datetime, retention_months: int,
+                      snapshots_through: datetime = None) -> list[datetime]:
+    """
+    Attached months older than the retention window and already covered by snapshots
+
+    snapshots_through is the latest snapshot period_end; months ending after it
+    are kept so no activity disappears before it has been rolled up.
+    """
+    cutoff = month_start(as_utc(now))
+    for _ in range(retention_months):
+        cutoff = previous_month(cutoff)
+    return sorted(
+        month for month in existing
+        if next_month(month) <= cutoff and snapshots_through is not None and next_month(month) <= as_utc(snapshots_through)
+    )
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :parent"
+    ), {"parent": PARENT}).scalar())
+
+def attached_months(db: Session) -> list[datetime]:
+    """Months with a partition currently attached to transactions"""
+    if not is_partitioned(db):
+        return []
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent"
+    ), {"parent": PARENT}).scalars()
+    return sorted(month for month in map(partition_month, names) if month)
+
+def partition_horizon(db: Session):
+    """
+    Start of the oldest attached month, or None when transactions isn't partitioned
+
+    Everything before it has been archived (or never existed), so balances
+    are the snapshot at the horizon plus transactions from the horizon on.
+    """
+    months = attached_months(db)
+    return months[0] if months else None
+
+def create_partitions(db: Session, now: datetime = None, ahead: int = None) -> list[str]:
+    """Create missing monthly partitions up to `ahead` months out"""
+    if not is_partitioned(db):
+        return []
+    ahead = settings.TRANSACTION_PARTITIONS_AHEAD if ahead is None else ahead
+    existing = set(attached_months(db))
+    created = []
+    for month in months_to_create(now or datetime.now(timezone.utc), ahead):
+        if month in existing:
+            continue
+        name = partition_name(month)
+        # Explicit UTC offsets: bare dates would be read in the session's TimeZone
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00+00') TO ('{next_month(month):%Y-%m-%d} 00:00+00')"
+        ))
+        created.append(name)
+    db.commit()
+    if created:
+        logger.info(f"Created transaction partitions {', '.join(created)}")
+    return created
+
+def archive_partitions(db: Session, now: datetime = None, retention_months: int = None) -> list[str]:
+    """Detach partitions past retention and move them to the archive schema"""
+    if not is_partitioned(db):
+        return []
+    retention_months = settings.TRANSACTION_PARTITION_RETENTION_MONTHS if retention_months is None else retention_months
+    snapshots_through = db.query(func.max(BalanceSnapshot.period_end)).scalar()
+    months = months_to_archive(attached_months(db), now or datetime.now(timezone.utc), retention_months, snapshots_through)
+
+    schema = settings.TRANSACTION_ARCHIVE_SCHEMA
+    archived = []
+    if months:
+        db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+    for month in months:
+        name = partition_name(month)
+        db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        db.execute(text(f"ALTER TABLE {name} SET SCHEMA {schema}"))
+        archived.append(f"{schema}.{name}")
+    db.commit()
+    if archived:
+        logger.info(f"Archived transaction partitions {', '.join(archived)}")
+    return archived
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        created = create_partitions(db)
+        archived = archive_partitions(db)
+        print(f"Created {len(created)} and archived {len(archived)} transaction partitions")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Credit reservations: hold credits up front, then commit or release them
+
+A reservation moves credits from available to held on the ledger row in one
+conditional UPDATE, so a multi-step operation (bulk import, invitation send,
+evidence upload) takes a single short lock instead of one per item, and a
+failure part-way through gives the credits back. Holds that are never
+resolved expire after their TTL; run the sweep periodically:
+
+    python -m src.billing.reservations
+"""
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from src.billing.models import (
+    CreditLedger, CreditReservation, CreditType, ReservationStatus, TransactionType, from_minor, to_minor
+)
+from src.billing.service import BillingService, InsufficientCreditsError
+from src.core.config import settings
+from src.core.database import SessionLocal
+from datetime import datetime, timedelta, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ReservationService:
+    """Reserve, commit and release credit holds"""
+
+    def __init__(self):
+        self.billing_service = BillingService()
+
+    def reserve(self, db: Session, organization_id: str, credit_type: CreditType, amount: float,
+                description: str = None, ttl_seconds: int = None, commit: bool = True) -> CreditReservation:
+        """
+        Hold credits for an operation that hasn't happened yet
+
+        Raises:
+            InsufficientCreditsError: available balance (balance - held) is below amount
+        """
+        minor = to_minor(amount)
+        held = db.execute(
+            update(CreditLedger)
+            .where(
+                CreditLedger.organization_id == organization_id,
+                CreditLedger.credit_type == credit_type,
+                CreditLedger.balance_minor - CreditLedger.held_minor >= minor
+            )
+            .values(held_minor=CreditLedger.held_minor + minor)
+            .returning(CreditLedger.held_minor)
+        ).scalar()
+        if held is None:
+            raise InsufficientCreditsError(credit_type, amount)
+
+        ttl = ttl_seconds or settings.CREDIT_RESERVATION_TTL_SECONDS
+        reservation = CreditReservation(
+            organization_id=organization_id,
+            credit_type=credit_type,
+            amount_minor=minor,
+            status=ReservationStatus.HELD,
+            description=description,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        )
+        db.add(reservation)
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+        return reservation
+
+    def commit(self, db: Session, reservation_id: int, amount: float = None,
+               description: str = None, commit: bool = True) -> CreditReservation:
+        """
+        Spend a held reservation
+
+        amount may be less than was reserved (e.g. some rows of a bulk import
+        failed); the remainder goes back to the available balance.
+        """
+        reservation = self._resolve(db, reservation_id, ReservationStatus.COMMITTED)
+        used = reservation.amount_minor if amount is None else to_minor(amount)
+        if used < 0 or used > reservation.amount_minor:
+            raise ValueError(
+                f"Can only commit between 0 and {from_minor(reservation.amount_minor):g} credits of reservation {reservation_id}"
+            )
+
+        db.execute(
+            update(CreditLedger)
+            .where(
+                CreditLedger.organization_id == reservation.organization_id,
+                CreditLedger.credit_type == reservation.credit_type
+            )
+            .values(
+                balance_minor=CreditLedger.balance_minor - used,
+                held_minor=CreditLedger.held_minor - reservation.amount_minor
+            )
+        )
+        if used:
+            self.billing_service._add_transaction(
+                db, reservation.organization_id, reservation.credit_type, from_minor(used),
+                TransactionType.CONSUMPTION, description or reservation.description
+            )
+        if commit:
+            db.commit()
+        return reservation
+
+    def release(self, db: Session, reservation_id: int, commit: bool = True) -> CreditReservation:
+        """Give a held reservation back without spending it"""
+        reservation = self._resolve(db, reservation_id, ReservationStatus.RELEASED)
+        self._unhold(db, reservation.organization_id, reservation.credit_type, reservation.amount_minor)
+        if commit:
+            db.commit()
+        return reservation
+
+    def expire_reservations(self, db: Session, batch_size: int = None) -> int:
+        """
+        Release holds past their TTL, one batch per transaction
+
+        FOR UPDATE SKIP LOCKED lets several sweepers run at once and never
+        waits on a reservation that is being committed right now.
+
+        Returns:
+            Number of reservations expired
+        """
+        batch_size = batch_size or settings.CREDIT_RESERVATION_SWEEP_BATCH
+        expired = 0
+        while True:
+            batch = db.query(CreditReservation).filter(
+                CreditReservation.status == ReservationStatus.HELD,
+                CreditReservation.expires_at < datetime.now(timezone.utc)
+            ).order_by(CreditReservation.expires_at).limit(batch_size).with_for_update(skip_locked=True).all()
+            if not batch:
+                break
+
+            totals = {}
+            for reservation in batch:
+                reservation.status = ReservationStatus.EXPIRED
+                reservation.resolved_at = datetime.now(timezone.utc)
+                key = (reservation.organization_id, reservation.credit_type)
+                totals[key] = totals.get(key, 0) + reservation.amount_minor
+            # One ledger UPDATE per organization and credit type in the batch
+            for (organization_id, credit_type), minor in totals.items():
+                self._unhold(db, organization_id, credit_type, minor)
+            db.commit()
+
+            expired += len(batch)
+            if len(batch) < batch_size:
+                break
+
+        if expired:
+            logger.info(f"Expired {expired} credit reservations")
+        return expired
+
+    def _resolve(self, db: Session, reservation_id: int, status: ReservationStatus) -> CreditReservation:
+        """Move a HELD reservation to a final status; only one caller can win"""
+        reservation = db.scalars(
+            update(CreditReservation)
+            .where(CreditReservation.id == reservation_id, CreditReservation.status == ReservationStatus.HELD)
+            .values(status=status, resolved_at=datetime.now(timezone.utc))
+            .returning(CreditReservation),
+            execution_options={"populate_existing": True}
+        ).first()
+        if not reservation:
+            raise ValueError(f"Reservation {reservation_id} is not held (already resolved, expired or missing)")
+        return reservation
+
+    def _unhold(self, db: Session, organization_id: str, credit_type: CreditType, minor: int):
+        db.execute(
+            update(CreditLedger)
+            .where(CreditLedger.organization_id == organization_id, CreditLedger.credit_type == credit_type)
+            .values(held_minor=CreditLedger.held_minor - minor)
+        )
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        expired = ReservationService().expire_reservations(db)
+        print(f"Expired {expired} credit reservations")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Monthly balance snapshots for the credit ledger
+
+Transactions are the source of truth; a snapshot records an organization's
+closing balance for one credit type at the end of a calendar month (UTC).
+A balance is the latest snapshot plus the transactions after it, so audits
+and history read one month of activity instead of the whole log.
+
+The rollup is incremental: each run starts from every organization's latest
+snapshot and only aggregates transactions after it, and is safe to re-run.
+Schedule it daily:
+
+    python -m src.billing.rollup
+"""
+from sqlalchemy import and_, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.billing.models import BalanceSnapshot, Transaction
+from src.core.config import settings
+from src.core.database import SessionLocal
+from datetime import datetime, timedelta, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+def as_utc(moment: datetime) -> datetime:
+    """Aware UTC datetime; naive values are taken to be UTC already"""
+    return moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def month_start(moment: datetime) -> datetime:
+    """Start of the month containing moment (the UTC month for aware values)"""
+    if moment.tzinfo:
+        moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def utc_month(db: Session, column):
+    """SQL expression for the start of the UTC calendar month of a timestamptz column"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Without AT TIME ZONE the month would follow the session's TimeZone. Literals,
+        # not bound parameters, so GROUP BY matches the selected expression
+        return func.date_trunc(literal_column("'month'"), func.timezone(literal_column("'UTC'"), column))
+    # SQLite has no time zones; timestamps are stored as UTC wall time
+    return func.datetime(column, literal_column("'start of month'"))
+
+def next_month(start: datetime) -> datetime:
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+def previous_month(start: datetime) -> datetime:
+    return start.replace(year=start.year - 1, month=12) if start.month == 1 else start.replace(month=start.month - 1)
+
+def rollup_cutoff(now: datetime = None) -> datetime:
+    """End (exclusive) of the latest month that is closed and past the grace period"""
+    now = as_utc(now) if now else datetime.now(timezone.utc)
+    return month_start(now - timedelta(hours=settings.LEDGER_ROLLUP_GRACE_HOURS))
+
+def rollup_snapshots(db: Session, now: datetime = None) -> int:
+    """
+    Write snapshots for every closed month not yet rolled up
+
+    Quiet months between two active ones get a snapshot too, so history has
+    no gaps; months after an organization's last activity are left alone
+    because the latest snapshot plus zero deltas already gives the balance.
+
+    Returns:
+        Number of snapshots written
+    """
+    cutoff = rollup_cutoff(now)
+
+    latest = db.query(
+        BalanceSnapshot.organization_id,
+        BalanceSnapshot.credit_type,
+        func.max(BalanceSnapshot.period_end).label("period_end")
+    ).group_by(BalanceSnapshot.organization_id, BalanceSnapshot.credit_type).subquery()
+
+    month = utc_month(db, Transaction.created_at)
+    monthly = db.query(
+        Transaction.organization_id,
+        Transaction.credit_type,
+        month.label("month"),
+        func.sum(Transaction.amount_minor).label("delta_minor"),
+        func.count(Transaction.id).label("transaction_count")
+    ).outerjoin(latest, and_(
+        latest.c.organization_id == Transaction.organization_id,
+        latest.c.credit_type == Transaction.credit_type
+    )).filter(
+        Transaction.created_at < cutoff,
+        or_(latest.c.period_end.is_(None), Transaction.created_at >= latest.c.period_end)
+    ).group_by(
+        Transaction.organization_id, Transaction.credit_type, month
+    ).order_by(
+        Transaction.organization_id, Transaction.credit_type, month
+    ).all()
+    if not monthly:
+        return 0
+
+    # Opening balances: one query for every organization that has new activity
+    active = {row.organization_id for row in monthly}
+    opening = {
+        (snapshot.organization_id, snapshot.credit_type): snapshot
+        for snapshot in db.query(BalanceSnapshot).join(latest, and_(
+            latest.c.organization_id == BalanceSnapshot.organization_id,
+            latest.c.credit_type == BalanceSnapshot.credit_type,
+            latest.c.period_end == BalanceSnapshot.period_end
+        )).filter(BalanceSnapshot.organization_id.in_(active))
+    }
+
+    rows = []
+    running = {}
+    for row in monthly:
+        key = (row.organization_id, row.credit_type)
+        start = as_utc(datetime.fromisoformat(row.month) if isinstance(row.month, str) else row.month)
+        if key not in running:
+            previous = opening.get(key)
+            # Resume from the last snapshot, filling any quiet months since
+            running[key] = (
+                (previous.balance_minor, as_utc(previous.period_end)) if previous else (0, start)
+            )
+        balance, period = running[key]
+        while period < start:
+            rows.append(_snapshot_row(key, period, balance, 0, 0))
+            period = next_month(period)
+        balance += row.delta_minor
+        rows.append(_snapshot_row(key, start, balance, row.delta_minor, row.transaction_count))
+        running[key] = (balance, next_month(start))
+
+    written = 0
+    for offset in range(0, len(rows), 1000):
+        # Another rollup may have written the same month concurrently; its row is identical
+        result = db.execute(
+            insert(BalanceSnapshot).values(rows[offset:offset + 1000]).on_conflict_do_nothing(
+                constraint="uq_balance_snapshots_period"
+            )
+        )
+        written += result.rowcount
+    db.commit()
+
+    logger.info(f"Wrote {written} balance snapshots up to {cutoff:%Y-%m-%d}")
+    return written
+
+def _snapshot_row(key, period_start: datetime, balance_minor: int, delta_minor: int, transaction_count: int) -> dict:
+    organization_id, credit_type = key
+    return {
+        "organization_id": organization_id,
+        "credit_type": credit_type,
+        "period_start": period_start,
+        "period_end": next_month(period_start),
+        "balance_minor": balance_minor,
+        "delta_minor": delta_minor,
+        "transaction_count": transaction_count,
+    }
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        written = rollup_snapshots(db)
+        print(f"Wrote {written} balance snapshots")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
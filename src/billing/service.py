@@ -1,5 +1,22 @@
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from src.billing.models import CreditLedger, Transaction, CreditType, TransactionType
+from src.billing.models import (
+    BalanceSnapshot, CreditLedger, Transaction, CreditType, TransactionType, from_minor, to_minor
+)
+
+CREDIT_NAMES = {
+    CreditType.RESPONDENT_CREDIT: "Respondent Credits",
+    CreditType.EVIDENCE_CREDIT: "Evidence Credits",
+}
+
+class InsufficientCreditsError(ValueError):
+    """Raised when a consumption would take a balance below zero"""
+
+    def __init__(self, credit_type: CreditType, amount: float):
+        self.credit_type = credit_type
+        self.amount = amount
+        super().__init__(f"Insufficient {CREDIT_NAMES.get(credit_type, credit_type.value)}")
 
 class BillingService:
     def get_balance(self, db: Session, organization_id: str, credit_type: CreditType):
@@ -8,39 +25,130 @@ class BillingService:
             CreditLedger.organization_id == organization_id,
             CreditLedger.credit_type == credit_type
         ).first()
-        return ledger.balance if ledger else 0.0
+        return from_minor(ledger.balance_minor) if ledger else 0.0
+
+    def get_ledger_balance(self, db: Session, organization_id: str, credit_type: CreditType) -> float:
+        """
+        Balance derived from the transaction log: latest snapshot plus the deltas since.
+
+        Reads at most one snapshot and the current month's transactions, so it
+        stays cheap however long the organization's history is.
+        """
+        snapshot = self._latest_snapshot(db, organization_id, credit_type)
+        deltas = db.query(func.coalesce(func.sum(Transaction.amount_minor), 0)).filter(
+            Transaction.organization_id == organization_id,
+            Transaction.credit_type == credit_type
+        )
+        if snapshot:
+            deltas = deltas.filter(Transaction.created_at >= snapshot.period_end)
+        return from_minor((snapshot.balance_minor if snapshot else 0) + deltas.scalar())
+
+    def audit_balance(self, db: Session, organization_id: str, credit_type: CreditType) -> dict:
+        """Compare the ledger row with the balance derived from snapshots and transactions."""
+        ledger = self.get_balance(db, organization_id, credit_type)
+        derived = self.get_ledger_balance(db, organization_id, credit_type)
+        return {
+            "organization_id": organization_id,
+            "credit_type": credit_type.value,
+            "ledger_balance": ledger,
+            "derived_balance": derived,
+            "consistent": to_minor(ledger) == to_minor(derived),
+        }
+
+    def balance_history(self, db: Session, organization_id: str, credit_type: CreditType,
+                        limit: int = 12) -> list:
+        """Monthly closing balances, newest first, straight from the snapshots."""
+        snapshots = db.query(BalanceSnapshot).filter(
+            BalanceSnapshot.organization_id == organization_id,
+            BalanceSnapshot.credit_type == credit_type
+        ).order_by(BalanceSnapshot.period_start.desc()).limit(limit).all()
+        return [
+            {
+                "period_start": snapshot.period_start,
+                "period_end": snapshot.period_end,
+                "closing_balance": from_minor(snapshot.balance_minor),
+                "net_change": from_minor(snapshot.delta_minor),
+                "transaction_count": snapshot.transaction_count,
+            }
+            for snapshot in snapshots
+        ]
+
+    def consume_credits(self, db: Session, organization_id: str, credit_type: CreditType,
+                        amount: float, description: str, commit: bool = True) -> float:
+        """
+        Atomically debit credits and record the consumption.
+
+        The available-balance check and the decrement are one conditional
+        UPDATE, so concurrent consumers serialize on the ledger row and can
+        never overspend. Pass commit=False to commit the debit together with
+        the caller's own writes.
+
+        Returns:
+            The new balance
+
+        Raises:
+            InsufficientCreditsError: available balance is below amount (nothing is written)
+        """
+        minor = to_minor(amount)
+        balance = db.execute(
+            update(CreditLedger)
+            .where(
+                CreditLedger.organization_id == organization_id,
+                CreditLedger.credit_type == credit_type,
+                # Credits held by open reservations aren't spendable
+                CreditLedger.balance_minor - CreditLedger.held_minor >= minor
+            )
+            .values(balance_minor=CreditLedger.balance_minor - minor)
+            .returning(CreditLedger.balance_minor)
+        ).scalar()
+        if balance is None:
+            raise InsufficientCreditsError(credit_type, amount)
+
+        self._add_transaction(db, organization_id, credit_type, amount, TransactionType.CONSUMPTION, description)
+        if commit:
+            db.commit()
+        return from_minor(balance)
 
-    def record_transaction(self, db: Session, organization_id: str, credit_type: CreditType, 
+    def add_credits(self, db: Session, organization_id: str, credit_type: CreditType, amount: float,
+                    transaction_type: TransactionType, description: str, commit: bool = True) -> float:
+        """Atomically credit a purchase or refund, creating the ledger row on first use."""
+        stmt = insert(CreditLedger).values(
+            organization_id=organization_id,
+            credit_type=credit_type,
+            balance_minor=to_minor(amount)
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_credit_ledger_org_type",
+            set_={"balance_minor": CreditLedger.balance_minor + stmt.excluded.balance_minor}
+        ).returning(CreditLedger.balance_minor)
+        balance = db.execute(stmt).scalar()
+
+        self._add_transaction(db, organization_id, credit_type, amount, transaction_type, description)
+        if commit:
+            db.commit()
+        return from_minor(balance)
+
+    def record_transaction(self, db: Session, organization_id: str, credit_type: CreditType,
                           amount: float, transaction_type: TransactionType, description: str):
         """Record a transaction and update balance."""
-        # 1. Update Ledger
-        ledger = db.query(CreditLedger).filter(
-            CreditLedger.organization_id == organization_id,
-            CreditLedger.credit_type == credit_type
-        ).first()
-        
-        if not ledger:
-            ledger = CreditLedger(
-                organization_id=organization_id,
-                credit_type=credit_type,
-                balance=0.0
-            )
-            db.add(ledger)
-        
         if transaction_type == TransactionType.CONSUMPTION:
-            ledger.balance -= amount
-        else:
-            ledger.balance += amount
-            
-        # 2. Create Transaction Record
-        transaction = Transaction(
+            return self.consume_credits(db, organization_id, credit_type, amount, description)
+        return self.add_credits(db, organization_id, credit_type, amount, transaction_type, description)
+
+    def _add_transaction(self, db: Session, organization_id: str, credit_type: CreditType,
+                         amount: float, transaction_type: TransactionType, description: str):
+        """Queue the Transaction row; it goes out in the same flush as the caller's commit"""
+        minor = to_minor(amount)
+        db.add(Transaction(
             organization_id=organization_id,
             credit_type=credit_type,
-            amount=amount,
+            amount_minor=-minor if transaction_type == TransactionType.CONSUMPTION else minor,
             transaction_type=transaction_type,
             description=description
-        )
-        db.add(transaction)
-        
-        db.commit()
-        return ledger.balance
+        ))
+
+    def _latest_snapshot(self, db: Session, organization_id: str, credit_type: CreditType):
+        return db.query(BalanceSnapshot).filter(
+            BalanceSnapshot.organization_id == organization_id,
+            BalanceSnapshot.credit_type == credit_type
+        ).order_by(BalanceSnapshot.period_start.desc()).first()
@@ -1,16 +1,137 @@
-from sqlalchemy import create_engine
+from typing import Union
+from uuid import uuid4
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from src.core.config import settings
+from src.core.query_metrics import instrument_engine
+from src.core.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, instrument_pool
+)
+from src.core.replicas import (
+    CONSISTENCY_HEADER, PRIMARY_LSN_SQL, ReplicaSet, RoutingSession, mark_read_only
+)
+
+def _pgbouncer_connect_args(url: str) -> dict:
+    """Disable server-side prepared statements, which break under transaction pooling"""
+    driver = make_url(url).get_driver_name()
+    if driver == "asyncpg":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            # Unnamed statements can still collide across backends, so make names unique
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    if driver == "psycopg":
+        return {"prepare_threshold": None}
+    # psycopg2 never prepares server-side
+    return {}
+
+def engine_options(url: str, poolclass) -> dict:
+    """Pool configuration from Settings, shared by every engine we create"""
+    options = {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    }
+    if settings.DB_PGBOUNCER:
+        options["connect_args"] = _pgbouncer_connect_args(url)
+    return options
+
+def _as_async_url(url: str) -> str:
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+def get_async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL switched to the asyncpg driver."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return _as_async_url(settings.DATABASE_URL)
+
+REPLICA_URLS = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
 
 # Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, InstrumentedQueuePool))
+instrument_pool("primary", engine.pool)
+instrument_engine(engine)
+
+replica_engines = {}
+for i, url in enumerate(REPLICA_URLS):
+    replica_engines[f"replica_{i}"] = create_engine(url, **engine_options(url, InstrumentedQueuePool))
+    instrument_pool(f"replica_{i}", replica_engines[f"replica_{i}"].pool)
+    instrument_engine(replica_engines[f"replica_{i}"])
+
+replicas = ReplicaSet(
+    replica_engines, settings.DB_REPLICA_MAX_LAG_SECONDS, settings.DB_REPLICA_CHECK_INTERVAL
+)
+
+# Create SessionLocal class. Objects stay loaded after commit: writes get
+# server-generated columns back through RETURNING (see EagerDefaults), so
+# there is nothing to re-SELECT
+SessionLocal = sessionmaker(
+    class_=RoutingSession, replicas=replicas, autocommit=False, autoflush=False,
+    expire_on_commit=False, bind=engine
+)
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async engine, only built in async mode so sync deployments and scripts
+# (Alembic, seed_credits.py) don't need asyncpg installed
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_url = get_async_database_url()
+    async_engine = create_async_engine(async_url, **engine_options(async_url, InstrumentedAsyncAdaptedQueuePool))
+    instrument_pool("primary_async", async_engine.sync_engine.pool)
+    instrument_engine(async_engine.sync_engine)
+    
+    async_replica_engines = {}
+    for i, url in enumerate(REPLICA_URLS):
+        url = _as_async_url(url)
+        replica = create_async_engine(url, **engine_options(url, InstrumentedAsyncAdaptedQueuePool))
+        instrument_pool(f"replica_{i}_async", replica.sync_engine.pool)
+        instrument_engine(replica.sync_engine)
+        # RoutingSession picks binds inside the greenlet, so it works on sync_engine
+        async_replica_engines[f"replica_{i}"] = replica.sync_engine
+    
+    # Objects must stay readable after commit: an expired attribute would
+    # lazy load outside the greenlet and fail
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=RoutingSession,
+        replicas=ReplicaSet(
+            async_replica_engines, settings.DB_REPLICA_MAX_LAG_SECONDS, settings.DB_REPLICA_CHECK_INTERVAL
+        ),
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+class EagerDefaults:
+    """Fetch server defaults and onupdate values in the INSERT/UPDATE itself via RETURNING"""
+    __mapper_args__ = {"eager_defaults": True}
+
+@event.listens_for(EagerDefaults, "before_insert", propagate=True)
+def _null_update_only_columns(mapper, connection, target):
+    """
+    Columns with only an onupdate (updated_at) are inserted as NULL; say so,
+    otherwise eager_defaults SELECTs them back after every INSERT
+    """
+    for column in mapper.columns:
+        if column.onupdate is not None and column.default is None and column.server_default is None:
+            key = mapper.get_property_by_column(column).key
+            if key not in target.__dict__:
+                setattr(target, key, None)
 
 # Base class for models
-Base = declarative_base()
+Base = declarative_base(cls=EagerDefaults)
+
+# Either session flavour, depending on DATABASE_ASYNC
+DbSession = Union[Session, AsyncSession]
 
 def get_db():
     """Dependency for getting DB session."""
@@ -19,3 +140,79 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dependency for getting an async DB session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db(request: Request):
+    """Dependency for read-only routes: replica-routed DB session."""
+    db = SessionLocal()
+    mark_read_only(db, request.headers.get(CONSISTENCY_HEADER))
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    """Dependency for read-only routes: replica-routed async DB session."""
+    async with AsyncSessionLocal() as db:
+        mark_read_only(db, request.headers.get(CONSISTENCY_HEADER))
+        yield db
+
+# Session dependencies used by the routers
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+get_read_session = get_async_read_db if settings.DATABASE_ASYNC else get_read_db
+
+def _primary_lsn() -> str:
+    with engine.connect() as conn:
+        return conn.execute(PRIMARY_LSN_SQL).scalar()
+
+async def primary_lsn() -> str:
+    """Current WAL position of the primary, used as a consistency token"""
+    if async_engine is not None:
+        async with async_engine.connect() as conn:
+            return (await conn.execute(PRIMARY_LSN_SQL)).scalar()
+    return await run_in_threadpool(_primary_lsn)
+
+async def run_in_session(db: DbSession, fn, *args, **kwargs):
+    """
+    Run sync ORM code against either session flavour without blocking the event loop
+
+    An AsyncSession runs it through run_sync on the async driver, so no
+    thread is held while Postgres answers. A plain Session falls back to
+    the threadpool, exactly like a sync route.
+
+    run_sync executes `fn` on the event loop thread itself: only database
+    work belongs in it, since anything else it does (parsing or validating
+    an upload, S3 or HTTP calls, a second sync session) stalls every
+    request. Run that through run_in_threadpool before or after this call.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+class AsyncServiceAdapter:
+    """
+    Awaitable facade over a sync service whose methods take db first
+
+    Every method goes through run_in_session, so it must be DB-bound;
+    subclasses override methods with CPU or network work to run that part
+    in the threadpool.
+    """
+    
+    def __init__(self, service):
+        self.sync = service
+    
+    def __getattr__(self, name):
+        if name == "sync":
+            raise AttributeError(name)
+        attr = getattr(self.sync, name)
+        if not callable(attr):
+            return attr
+        
+        async def method(db: DbSession, *args, **kwargs):
+            return await run_in_session(db, attr, *args, **kwargs)
+        
+        return method
@@ -0,0 +1,154 @@
+"""
+Email template registry
+
+Templates live in src/core/templates/email/<locale>/<name>.html and set their
+subject with {% set subject = ... %}. One shared Jinja Environment compiles
+every template for every locale once (warm() at startup), backed by a
+bytecode cache so restarts skip the compile step too. The plain-text
+alternative of each template is derived from its HTML source once, when it
+is first loaded, and compiled like any other template.
+"""
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from jinja2 import (
+    BaseLoader, ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateNotFound, select_autoescape
+)
+from pathlib import Path
+from src.core.config import settings
+import re
+import threading
+
+TEMPLATE_DIR = Path(__file__).parent / "templates" / "email"
+
+@dataclass
+class RenderedEmail:
+    subject: str
+    html: str
+    text: str
+
+class _PlainTextConverter(HTMLParser):
+    """HTML to readable text; Jinja expressions pass through as data"""
+
+    BLOCK_TAGS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "table", "tr"}
+    SKIP_TAGS = {"head", "style", "script", "title"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skipping += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+        elif tag == "li":
+            self.parts.append("\n- ")
+        elif tag == "br":
+            self.parts.append("\n")
+        elif tag == "hr":
+            self.parts.append("\n\n----\n\n")
+        elif tag == "a":
+            self.links.append((dict(attrs).get("href") or "", len(self.parts)))
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skipping -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+        elif tag == "a" and self.links:
+            href, start = self.links.pop()
+            label = "".join(self.parts[start:]).strip()
+            target = href.removeprefix("mailto:")
+            if target and target != label:
+                self.parts[-1] = self.parts[-1].rstrip()
+                self.parts.append(f": {target}")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(re.sub(r"\s+", " ", data))
+
+    def text(self) -> str:
+        lines = [line.strip() for line in "".join(self.parts).splitlines()]
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip() + "\n"
+
+def html_to_text_source(source: str) -> str:
+    """Plain-text template source from an HTML template source"""
+    converter = _PlainTextConverter()
+    converter.feed(source)
+    converter.close()
+    return converter.text()
+
+class _PlainTextLoader(BaseLoader):
+    """Serves <name>.txt as the text conversion of <name>.html"""
+
+    def __init__(self, html_loader: BaseLoader):
+        self.html_loader = html_loader
+
+    def get_source(self, environment, template):
+        if not template.endswith(".txt"):
+            raise TemplateNotFound(template)
+        source, filename, uptodate = self.html_loader.get_source(environment, template[:-4] + ".html")
+        return html_to_text_source(source), None, uptodate
+
+class EmailTemplateRegistry:
+    """Compiled email templates by name and locale"""
+
+    def __init__(self, template_dir: Path = TEMPLATE_DIR, cache_dir: str = None):
+        html_loader = FileSystemLoader(str(template_dir))
+        cache_dir = cache_dir if cache_dir is not None else settings.EMAIL_TEMPLATE_CACHE_DIR
+        self.env = Environment(
+            loader=ChoiceLoader([html_loader, _PlainTextLoader(html_loader)]),
+            autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False, default=False),
+            bytecode_cache=FileSystemBytecodeCache(cache_dir) if cache_dir else FileSystemBytecodeCache(),
+            auto_reload=False,  # Templates ship with the code; never stat them per render
+            cache_size=-1,
+        )
+        self.template_dir = Path(template_dir)
+        self.default_locale = settings.EMAIL_DEFAULT_LOCALE
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def locales(self) -> list[str]:
+        return sorted(path.name for path in self.template_dir.iterdir() if path.is_dir())
+
+    def names(self) -> list[str]:
+        return sorted(path.stem for path in (self.template_dir / self.default_locale).glob("*.html"))
+
+    def warm(self) -> int:
+        """Compile every template, locale and text variant now instead of on first send"""
+        for locale in self.locales():
+            for name in self.names():
+                self._templates(name, locale)
+        return len(self._compiled)
+
+    def render(self, name: str, locale: str = None, **context) -> RenderedEmail:
+        """Render subject, HTML and plain text; unknown locales fall back to the default"""
+        html_template, text_template = self._templates(name, locale or self.default_locale)
+        html = html_template.make_module(context)
+        return RenderedEmail(
+            subject=str(getattr(html, "subject", "")).strip(),
+            html=str(html),
+            text=text_template.render(context),
+        )
+
+    def _templates(self, name: str, locale: str):
+        key = (name, locale)
+        compiled = self._compiled.get(key)
+        if compiled:
+            return compiled
+        if not (self.template_dir / locale / f"{name}.html").exists():
+            if locale == self.default_locale:
+                raise TemplateNotFound(f"{locale}/{name}.html")
+            return self._templates(name, self.default_locale)
+        with self._lock:
+            if key not in self._compiled:
+                self._compiled[key] = (
+                    self.env.get_template(f"{locale}/{name}.html"),
+                    self.env.get_template(f"{locale}/{name}.txt"),
+                )
+            return self._compiled[key]
+
+# Shared by every EmailService; compiled at startup (see src/main.py)
+email_templates = EmailTemplateRegistry()
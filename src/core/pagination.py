@@ -0,0 +1,68 @@
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.orm import Query
+from src.core.config import settings
+from datetime import datetime
+import base64
+import json
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque cursor for the (created_at, id) position of the last item on a page"""
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for anything it didn't produce"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def page_size(limit: int = None) -> int:
+    """Requested page size, defaulted and clamped to PAGE_SIZE_MAX"""
+    if not limit:
+        return settings.PAGE_SIZE_DEFAULT
+    return max(1, min(limit, settings.PAGE_SIZE_MAX))
+
+def count_estimate(query: Query) -> dict:
+    """
+    Row count for a filtered query, capped at PAGE_COUNT_CAP
+
+    Counting stops at the cap so huge organizations don't pay for an exact
+    count; exact is False when the real total is larger.
+    """
+    capped = query.order_by(None).limit(settings.PAGE_COUNT_CAP + 1).subquery()
+    count = query.session.execute(select(func.count()).select_from(capped)).scalar()
+    return {"count": min(count, settings.PAGE_COUNT_CAP), "exact": count <= settings.PAGE_COUNT_CAP}
+
+def paginate(query: Query, model, limit: int = None, cursor: str = None, include_total: bool = False) -> dict:
+    """
+    Keyset page of a query, newest first, ordered by (created_at, id)
+
+    Seeks past the cursor with a row comparison instead of OFFSET, so with a
+    matching (..., created_at, id) index every page costs the same.
+
+    Returns:
+        dict with items, next_cursor (None on the last page) and, when
+        include_total is set, total_estimate
+    """
+    limit = page_size(limit)
+    total = count_estimate(query) if include_total else None
+
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        position = tuple_(literal(created_at, model.created_at.type), literal(last_id, model.id.type))
+        query = query.filter(tuple_(model.created_at, model.id) < position)
+
+    # One extra row tells us whether there is a next page
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+
+    page = {"items": items, "next_cursor": next_cursor}
+    if include_total:
+        page["total_estimate"] = total
+    return page
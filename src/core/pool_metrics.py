@@ -0,0 +1,112 @@
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from bisect import bisect_left
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last one is +Inf
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class PoolMetrics:
+    """Checkout telemetry for one engine's connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self._wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_count = 0
+        self._wait_sum_ms = 0.0
+        self._overflow_events = 0
+        self._timeouts = 0
+
+    def bind(self, pool):
+        """Attach to a pool (again after engine.dispose() recreates it)"""
+        pool.metrics = self
+        self.pool = pool
+
+    def observe_checkout(self, wait_seconds: float, overflowed: bool):
+        wait_ms = wait_seconds * 1000
+        with self._lock:
+            self._wait_buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self._wait_count += 1
+            self._wait_sum_ms += wait_ms
+            if overflowed:
+                self._overflow_events += 1
+
+    def observe_timeout(self):
+        with self._lock:
+            self._timeouts += 1
+        logger.warning(f"Connection pool '{self.name}' timed out waiting for a connection")
+
+    def snapshot(self) -> dict:
+        """Current pool state plus cumulative checkout statistics"""
+        with self._lock:
+            histogram = {}
+            cumulative = 0
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self._wait_buckets):
+                cumulative += count
+                histogram[f"le_{bound}"] = cumulative
+            stats = {
+                "checkouts": self._wait_count,
+                "wait_ms_sum": round(self._wait_sum_ms, 3),
+                "wait_ms_histogram": histogram,
+                "overflow_events": self._overflow_events,
+                "timeouts": self._timeouts,
+            }
+
+        pool = self.pool
+        if pool is not None:
+            stats.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return stats
+
+class _InstrumentedPoolMixin:
+    """Times every checkout and counts overflow connections and timeouts"""
+
+    def _do_get(self):
+        metrics = getattr(self, "metrics", None)
+        if metrics is None:
+            return super()._do_get()
+
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            metrics.observe_timeout()
+            raise
+        metrics.observe_checkout(time.perf_counter() - start, self.overflow() > max(overflow_before, 0))
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        metrics = getattr(self, "metrics", None)
+        if metrics is not None:
+            metrics.bind(pool)
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+_registry: dict[str, PoolMetrics] = {}
+
+def instrument_pool(name: str, pool) -> PoolMetrics:
+    """Register metrics for an engine's pool under a name"""
+    metrics = _registry.setdefault(name, PoolMetrics(name))
+    metrics.bind(pool)
+    return metrics
+
+def pool_metrics_snapshot() -> dict:
+    """Telemetry for every instrumented pool, keyed by name"""
+    return {name: metrics.snapshot() for name, metrics in _registry.items()}
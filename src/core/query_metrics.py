@@ -0,0 +1,92 @@
+from contextvars import ContextVar
+from sqlalchemy import event
+from src.core.config import settings
+import heapq
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class QueryStats:
+    """Statements one request ran: count, total time, slowest, N+1 suspects"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+        self._slowest = []  # min-heap of (ms, sequence, statement)
+        self._parameter_sets = {}  # statement -> distinct parameter fingerprints
+
+    def record(self, statement: str, parameters, elapsed_ms: float):
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            entry = (elapsed_ms, self.count, statement)
+            if len(self._slowest) < settings.QUERY_STATS_SLOWEST:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+            self._parameter_sets.setdefault(statement, set()).add(_fingerprint(parameters))
+
+    def slowest(self) -> list[dict]:
+        """Slowest statements, slowest first"""
+        return [
+            {"ms": round(ms, 3), "statement": statement}
+            for ms, _, statement in sorted(self._slowest, reverse=True)
+        ]
+
+    def n_plus_one_suspects(self) -> list[dict]:
+        """Statements repeated with N_PLUS_ONE_THRESHOLD or more different parameter sets"""
+        return [
+            {"count": len(parameter_sets), "statement": statement}
+            for statement, parameter_sets in self._parameter_sets.items()
+            if len(parameter_sets) >= settings.N_PLUS_ONE_THRESHOLD
+        ]
+
+query_stats: ContextVar = ContextVar("query_stats", default=None)
+
+def _fingerprint(parameters) -> int:
+    try:
+        return hash(repr(parameters))
+    except Exception:
+        return id(parameters)
+
+def redact_parameters(parameters):
+    """Bound parameters with values replaced by their type names"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} parameter sets>"
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(statement, parameters, elapsed_ms)
+
+    if elapsed_ms >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            f"Slow query ({elapsed_ms:.1f} ms): {statement} params={redact_parameters(parameters)}"
+        )
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+def instrument_engine(engine):
+    """Time every statement on a (sync) engine for the slow log and per-request stats"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,154 @@
+from contextvars import ContextVar
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+import itertools
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Response header carrying the primary LSN after a write; clients send it
+# back on reads to be guaranteed to see their own writes
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+REPLICA_PROBE_SQL = text("""
+    SELECT
+        pg_last_wal_replay_lsn()::text,
+        CASE
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+""")
+
+PRIMARY_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+
+def parse_lsn(token: str):
+    """Postgres LSN text ('16/B374D848') to a comparable int, None if malformed"""
+    try:
+        high, low = token.split("/")
+        return (int(high, 16) << 32) | int(low, 16)
+    except (AttributeError, ValueError):
+        return None
+
+class _Replica:
+    """One replica engine plus its last observed replay position and lag"""
+
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.replay_lsn = None
+        self.lag_seconds = None
+        self.healthy = False
+        self.checked_at = 0.0
+
+    def probe(self):
+        try:
+            with self.engine.connect() as conn:
+                lsn, lag = conn.execute(REPLICA_PROBE_SQL).one()
+            self.replay_lsn = parse_lsn(lsn)
+            self.lag_seconds = float(lag)
+            self.healthy = self.replay_lsn is not None
+        except Exception as e:
+            logger.warning(f"Replica {self.name} probe failed: {str(e)}")
+            self.healthy = False
+
+class ReplicaSet:
+    """
+    Read replicas with cached lag probes
+
+    choose() returns a replica engine that is healthy, within the lag budget
+    and (given a consistency token) has replayed past it, or None so the
+    caller falls back to the primary.
+    """
+
+    def __init__(self, engines: dict, max_lag_seconds: float, check_interval: float):
+        self.replicas = [_Replica(name, engine) for name, engine in engines.items()]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._next = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def _refresh(self, replica: _Replica):
+        now = time.monotonic()
+        if now - replica.checked_at < self.check_interval:
+            return
+        # Claim the probe first so concurrent requests keep using the last result
+        replica.checked_at = now
+        replica.probe()
+
+    def choose(self, min_lsn: int = None):
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next)]
+            self._refresh(replica)
+            if not replica.healthy or replica.lag_seconds > self.max_lag_seconds:
+                continue
+            if min_lsn is not None and replica.replay_lsn < min_lsn:
+                continue
+            return replica.engine
+        return None
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica when marked read-only
+
+    Flushes and DML statements always go to the primary (the session's
+    bind). The replica is chosen once per session so a request sees one
+    consistent snapshot.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and self.replicas and not self._flushing \
+                and not isinstance(clause, UpdateBase):
+            if "replica" not in self.info:
+                self.info["replica"] = self.replicas.choose(self.info.get("min_lsn"))
+            if self.info["replica"] is not None:
+                return self.info["replica"]
+        return super().get_bind(mapper, clause=clause, **kw)
+
+def mark_read_only(db, consistency_token: str = None):
+    """Route a session's reads to replicas, honouring a client's consistency token"""
+    min_lsn = None
+    if consistency_token:
+        min_lsn = parse_lsn(consistency_token)
+        if min_lsn is None:
+            # Unreadable token: only the primary can guarantee read-your-writes
+            return
+    db.info["read_only"] = True
+    db.info["min_lsn"] = min_lsn
+
+# ===== WRITE TRACKING =====
+
+class WriteTracker:
+    """Per-request flag set when a session commits a write"""
+
+    def __init__(self):
+        self.committed = False
+
+write_tracker: ContextVar = ContextVar("write_tracker", default=None)
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_dml_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_commit(session):
+    if session.info.pop("wrote", False):
+        tracker = write_tracker.get()
+        if tracker is not None:
+            tracker.committed = True
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_write(session):
+    session.info.pop("wrote", None)
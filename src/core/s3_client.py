@@ -0,0 +1,49 @@
+import threading
+import boto3
+from botocore.config import Config
+from src.core.config import settings
+
+def client_config() -> Config:
+    """botocore settings for the storage client: pool, retries, timeouts, keepalive"""
+    return Config(
+        region_name=settings.AWS_REGION,
+        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+        retries={"mode": "adaptive", "total_max_attempts": settings.S3_MAX_ATTEMPTS},
+        connect_timeout=settings.S3_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.S3_READ_TIMEOUT_SECONDS,
+        tcp_keepalive=settings.S3_TCP_KEEPALIVE,
+    )
+
+def create_s3_client():
+    """
+    New S3 client from settings
+
+    Without both AWS keys set, boto3's default credential chain is used
+    (environment, shared config, instance or task role).
+    """
+    credentials = {}
+    if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
+        credentials = {
+            "aws_access_key_id": settings.AWS_ACCESS_KEY_ID,
+            "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY,
+        }
+    # A private session: boto3's default session isn't safe to build clients from concurrently
+    return boto3.session.Session().client(
+        "s3",
+        **credentials,
+        region_name=settings.AWS_REGION,
+        endpoint_url=settings.S3_ENDPOINT_URL or None,
+        config=client_config(),
+    )
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_s3_client():
+    """Process-wide S3 client, created on first use; clients are thread-safe"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_s3_client()
+    return _client
@@ -1,23 +1,85 @@
-import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 from src.core.config import settings
+from src.core.s3_client import get_s3_client
+from collections import OrderedDict
 import hashlib
+import threading
+import time
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+class PresignedUrlCache:
+    """
+    Bounded LRU of presigned URLs with a TTL
+
+    An entry lives for at most half its URL's lifetime, so a cached URL
+    always has that much validity left when it is handed out.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()  # (bucket, key, expiration) -> (url, cached_until)
+        self._lock = threading.Lock()
+    
+    def get(self, bucket: str, s3_key: str, expiration: int):
+        """Cached URL, or None if missing or stale"""
+        entry_key = (bucket, s3_key, expiration)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return None
+            url, cached_until = entry
+            if time.monotonic() >= cached_until:
+                del self._entries[entry_key]
+                return None
+            self._entries.move_to_end(entry_key)
+            return url
+    
+    def put(self, bucket: str, s3_key: str, expiration: int, url: str):
+        """Cache a URL that was just signed for `expiration` seconds"""
+        ttl = min(self.ttl, expiration / 2)
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        entry_key = (bucket, s3_key, expiration)
+        with self._lock:
+            self._entries[entry_key] = (url, time.monotonic() + ttl)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, bucket: str, s3_key: str):
+        """Drop every cached URL for an object"""
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == bucket and k[1] == s3_key]:
+                del self._entries[entry_key]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+# Shared by every S3Service so a delete through one instance invalidates all
+download_url_cache = PresignedUrlCache(
+    settings.S3_PRESIGNED_URL_CACHE_SIZE,
+    settings.S3_PRESIGNED_URL_CACHE_TTL_SECONDS
+)
+
 class S3Service:
     """Service for managing evidence file storage in S3"""
     
     def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
         self.bucket_name = settings.S3_BUCKET_NAME
+        self.download_urls = download_url_cache
+    
+    @property
+    def s3_client(self):
+        """The shared client, built (and credentials resolved) on first use, not at import"""
+        return get_s3_client()
     
     def generate_presigned_upload_url(
         self, 
@@ -64,7 +126,7 @@ class S3Service:
                 "s3_bucket": self.bucket_name,
                 "expires_in": expiration
             }
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             logger.error(f"Failed to generate presigned upload URL: {str(e)}")
             raise Exception(f"Failed to generate presigned URL: {str(e)}")
     
@@ -76,6 +138,9 @@ class S3Service:
         """
         Generate presigned URL for file download
         
+        URLs are reused from the cache until half their lifetime (at most
+        S3_PRESIGNED_URL_CACHE_TTL_SECONDS) has passed.
+        
         Args:
             s3_key: S3 object key
             expiration: URL expiration time in seconds (default 1 hour)
@@ -83,6 +148,10 @@ class S3Service:
         Returns:
             Presigned download URL
         """
+        url = self.download_urls.get(self.bucket_name, s3_key, expiration)
+        if url:
+            return url
+        
         try:
             url = self.s3_client.generate_presigned_url(
                 'get_object',
@@ -94,8 +163,9 @@ class S3Service:
             )
             
             logger.info(f"Generated presigned download URL for {s3_key}")
+            self.download_urls.put(self.bucket_name, s3_key, expiration, url)
             return url
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             logger.error(f"Failed to generate presigned download URL: {str(e)}")
             raise Exception(f"Failed to generate download URL: {str(e)}")
     
@@ -114,9 +184,10 @@ class S3Service:
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
+            self.download_urls.invalidate(self.bucket_name, s3_key)
             logger.info(f"Deleted file: {s3_key}")
             return True
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             logger.error(f"Failed to delete file {s3_key}: {str(e)}")
             raise Exception(f"Failed to delete file: {str(e)}")
     
@@ -142,6 +213,6 @@ class S3Service:
                 "last_modified": response.get('LastModified'),
                 "etag": response.get('ETag')
             }
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             logger.error(f"Failed to get file metadata for {s3_key}: {str(e)}")
             raise Exception(f"Failed to get file metadata: {str(e)}")
@@ -0,0 +1,182 @@
+"""
+Pooled SMTP delivery
+
+Opening a connection, STARTTLS and AUTH cost several round trips and a TLS
+handshake; sending a message on an open session costs one. SMTPConnectionPool
+keeps up to SMTP_POOL_SIZE authenticated sessions and hands them out to
+senders, so a 500-invitation run does a handful of handshakes instead of 500.
+Sessions are retired after SMTP_MAX_MESSAGES_PER_CONNECTION messages (many
+servers cap this), checked with NOOP when they have sat idle, and replaced
+transparently when the server has dropped them.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from src.core.config import settings
+import logging
+import queue
+import smtplib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Failures that mean the session is gone, not that the message was refused. Not OSError:
+# every SMTPException is one, refusals included
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+# The server answered and refused the message; smtplib has already RSET the session
+REFUSALS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)
+
+class PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except Exception:
+            self.smtp.close()
+
+class SMTPConnectionPool:
+    """A bounded pool of authenticated SMTP sessions, safe to share between threads"""
+
+    def __init__(self, host: str = None, port: int = None, user: str = None, password: str = None,
+                 size: int = None, max_messages: int = None, starttls: bool = None, timeout: float = None,
+                 idle_check: float = None):
+        self.host = host or settings.SMTP_SERVER
+        self.port = port or settings.SMTP_PORT
+        self.user = settings.SMTP_USER if user is None else user
+        self.password = settings.SMTP_PASSWORD if password is None else password
+        self.size = size or settings.SMTP_POOL_SIZE
+        self.max_messages = max_messages or settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        self.starttls = settings.SMTP_STARTTLS if starttls is None else starttls
+        self.timeout = timeout or settings.SMTP_TIMEOUT_SECONDS
+        self.idle_check = settings.SMTP_IDLE_CHECK_SECONDS if idle_check is None else idle_check
+
+        self._idle = queue.LifoQueue()  # Most recently used first: it's the least likely to have timed out
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.connections_opened = 0
+
+    def send(self, msg: Message):
+        """
+        Send one message on a pooled session
+
+        A dropped session is replaced and the message retried once; errors
+        from the server about the message itself (refused recipient, etc.)
+        are raised as-is.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No SMTP connection free after {self.timeout}s")
+        try:
+            for attempt in (1, 2):
+                connection = self._checkout()
+                try:
+                    connection.smtp.send_message(msg)
+                except REFUSALS:
+                    # The session is still usable after a refused message
+                    self._checkin(connection)
+                    raise
+                except CONNECTION_ERRORS:
+                    connection.close()
+                    if attempt == 2:
+                        raise
+                    logger.info("SMTP session dropped; reconnecting")
+                    continue
+                except Exception:
+                    # Session state unknown: don't reuse it, and don't resend
+                    connection.close()
+                    raise
+                connection.sent += 1
+                self._checkin(connection)
+                return
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Quit every idle session"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _checkout(self) -> PooledConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - connection.last_used < self.idle_check or self._alive(connection):
+                return connection
+            connection.close()
+
+    def _checkin(self, connection: PooledConnection):
+        if connection.sent >= self.max_messages:
+            connection.close()
+            return
+        connection.last_used = time.monotonic()
+        self._idle.put(connection)
+
+    def _alive(self, connection: PooledConnection) -> bool:
+        try:
+            return connection.smtp.noop()[0] == 250
+        except CONNECTION_ERRORS + (smtplib.SMTPException, OSError):
+            return False
+
+    def _connect(self) -> PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connections_opened += 1
+        return PooledConnection(smtp)
+
+class SMTPDeliveryEngine:
+    """Sends batches of messages over a connection pool with bounded parallelism"""
+
+    def __init__(self, pool: SMTPConnectionPool = None, parallelism: int = None):
+        self.pool = pool or SMTPConnectionPool()
+        self.parallelism = parallelism or self.pool.size
+
+    def send(self, msg: Message):
+        self.pool.send(msg)
+
+    def send_batch(self, messages: list[Message]) -> list:
+        """
+        Send messages in parallel
+
+        Returns:
+            One entry per message, in order: None if sent, else the exception
+        """
+        def deliver(msg):
+            try:
+                self.pool.send(msg)
+            except Exception as e:
+                logger.error(f"Failed to send email to {msg['To']}: {e}")
+                return e
+            return None
+
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="smtp") as executor:
+            return list(executor.map(deliver, messages))
+
+    def close(self):
+        self.pool.close()
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_delivery_engine() -> SMTPDeliveryEngine:
+    """Process-wide engine, created on first use from settings"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SMTPDeliveryEngine()
+    return _engine
@@ -1,14 +1,81 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from starlette.concurrency import run_in_threadpool
 from src.core.config import settings
+from src.core.database import primary_lsn, replicas
+from src.core.email_templates import email_templates
+from src.notifications.dispatcher import email_dispatcher
+from src.outbox.relay import outbox_relay
+from src.core.replicas import CONSISTENCY_HEADER, WriteTracker, write_tracker
+from src.core.pool_metrics import pool_metrics_snapshot
+from src.core.query_metrics import QueryStats, query_stats
 from src.workflow.router import router as workflow_router
 from src.portals.customer.router import router as customer_router
 from src.portals.respondent.router import router as respondent_router
+import logging
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile every email template up front so the first sends don't pay for it
+    compiled = email_templates.warm()
+    logger.info(f"Compiled {compiled} email templates")
+    if settings.OUTBOX_RELAY_IN_APP:
+        outbox_relay.start()
+    if settings.EMAIL_DISPATCH_IN_APP:
+        email_dispatcher.start()
+    yield
+    # Let running handlers and sends finish; the rest waits in the tables for the next start
+    await run_in_threadpool(outbox_relay.stop)
+    await run_in_threadpool(email_dispatcher.stop)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
+@app.middleware("http")
+async def consistency_token(request: Request, call_next):
+    """Return the primary LSN after a committed write so clients can read their own writes"""
+    tracker = WriteTracker()
+    reset = write_tracker.set(tracker)
+    try:
+        response = await call_next(request)
+    finally:
+        write_tracker.reset(reset)
+    
+    if tracker.committed and replicas:
+        response.headers[CONSISTENCY_HEADER] = await primary_lsn()
+    return response
+
+@app.middleware("http")
+async def sql_instrumentation(request: Request, call_next):
+    """Count the request's statements, warn about N+1 patterns, and expose stats in debug mode"""
+    stats = QueryStats()
+    reset = query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        query_stats.reset(reset)
+    
+    suspects = stats.n_plus_one_suspects()
+    for suspect in suspects:
+        logger.warning(
+            f"Possible N+1 in {request.method} {request.url.path}: "
+            f"{suspect['count']}x {suspect['statement']}"
+        )
+    
+    if settings.DEBUG:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_ms:.3f}"
+        response.headers["X-DB-N-Plus-One"] = str(len(suspects))
+        slowest = stats.slowest()
+        if slowest:
+            response.headers["X-DB-Slowest-Ms"] = str(slowest[0]["ms"])
+    return response
+
 # Include routers
 app.include_router(workflow_router, prefix=f"{settings.API_V1_STR}/workflow", tags=["workflow"])
 app.include_router(customer_router, prefix=f"{settings.API_V1_STR}/customer", tags=["customer-portal"])
@@ -21,3 +88,8 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics/db-pool")
+def db_pool_metrics():
+    """Connection pool telemetry: checked-out count, wait histogram, overflow events"""
+    return pool_metrics_snapshot()
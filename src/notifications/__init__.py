@@ -0,0 +1 @@
+# Notifications module initialization
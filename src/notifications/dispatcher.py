@@ -0,0 +1,251 @@
+"""
+Background email dispatch
+
+Requests only queue emails (NotificationService.enqueue_email); an
+EmailDispatcher renders and sends them from a worker pool over the pooled
+SMTP engine. At most EMAIL_DOMAIN_CONCURRENCY sends per recipient domain run
+at once, so one large customer domain can't hog the workers or trip its
+mail server's rate limits. Failed sends are retried with exponential backoff
+and jitter; permanent refusals, and messages out of attempts, are
+dead-lettered (status DEAD) with their last error.
+
+Claims use FOR UPDATE SKIP LOCKED, so any number of processes can dispatch
+from the same table; the per-domain limit applies per process. Each API
+process runs a dispatcher unless EMAIL_DISPATCH_IN_APP is off, in which case
+run one or more standalone:
+
+    python -m src.notifications.dispatcher
+    python -m src.notifications.dispatcher --requeue-dead   # retry dead letters
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from jinja2 import TemplateNotFound
+from src.notifications.models import EmailDeliveryStatus, OutboundEmail
+from src.core.config import settings
+from src.core.email_service import EmailService
+from src.core.database import SessionLocal
+from datetime import datetime, timedelta, timezone
+import argparse
+import logging
+import random
+import signal
+import smtplib
+import threading
+
+logger = logging.getLogger(__name__)
+
+DUE_STATUSES = (EmailDeliveryStatus.QUEUED, EmailDeliveryStatus.SENDING, EmailDeliveryStatus.RETRYING)
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before the next attempt: doubling from EMAIL_RETRY_BASE_SECONDS, capped, with jitter"""
+    delay = min(settings.EMAIL_RETRY_MAX_SECONDS, settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+def is_permanent_failure(error: Exception) -> bool:
+    """Failures no retry will fix: the recipient or the message was refused, or the template is missing"""
+    if isinstance(error, TemplateNotFound):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _ in error.recipients.values())
+    # A 5xx on DATA rejects this message; 5xx on AUTH or MAIL FROM is our configuration, so keep retrying
+    return isinstance(error, smtplib.SMTPDataError) and 500 <= error.smtp_code < 600
+
+class EmailDispatcher:
+    """Sends queued emails from a thread pool with per-domain concurrency limits"""
+    
+    def __init__(self, workers: int = None, domain_concurrency: int = None, session_factory=SessionLocal, email_service=None):
+        self.workers = workers or settings.EMAIL_DISPATCH_WORKERS
+        self.domain_concurrency = domain_concurrency or settings.EMAIL_DOMAIN_CONCURRENCY
+        self.session_factory = session_factory
+        self._email_service = email_service
+        
+        self._in_flight = Counter()  # Sends running per recipient domain
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._executor = None
+    
+    @property
+    def email_service(self):
+        if self._email_service is None:
+            self._email_service = EmailService()
+        return self._email_service
+    
+    def start(self):
+        """Start dispatching in the background"""
+        if self._thread:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="email-dispatch")
+        self._thread = threading.Thread(target=self._run, name="email-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Email dispatcher started with {self.workers} workers")
+    
+    def stop(self, timeout: float = 30.0):
+        """Stop claiming and let in-flight sends finish; anything still queued waits for the next start"""
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        self._thread = self._executor = None
+        logger.info("Email dispatcher stopped")
+    
+    def wake(self):
+        """Claim newly queued emails now rather than at the next poll"""
+        self._wake.set()
+    
+    def run_pending(self) -> int:
+        """Send everything due now and wait for the results; returns the number of sends attempted"""
+        attempted = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="email-dispatch") as executor:
+            while futures := self._dispatch(executor, self.workers):
+                wait(futures)
+                attempted += len(futures)
+        return attempted
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                claimed = self._dispatch(self._executor, self.workers - self._busy())
+            except Exception:
+                logger.exception("Email dispatch failed")
+                claimed = []
+            if not claimed:
+                # Woken by an enqueue or a finished send, else poll for retries coming due
+                self._wake.wait(settings.EMAIL_DISPATCH_POLL_SECONDS)
+    
+    def _busy(self) -> int:
+        with self._lock:
+            return sum(self._in_flight.values())
+    
+    def _dispatch(self, executor: ThreadPoolExecutor, limit: int) -> list:
+        if limit <= 0:
+            return []
+        return [executor.submit(self._deliver, email) for email in self._claim(limit)]
+    
+    def _claim(self, limit: int) -> list:
+        """Mark up to `limit` due emails SENDING, respecting the per-domain limit"""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            in_flight = Counter(self._in_flight)
+        saturated = [domain for domain, count in in_flight.items() if count >= self.domain_concurrency]
+        
+        db = self.session_factory()
+        try:
+            query = db.query(OutboundEmail).filter(
+                OutboundEmail.status.in_(DUE_STATUSES),
+                OutboundEmail.next_attempt_at <= now
+            )
+            if saturated:
+                query = query.filter(OutboundEmail.recipient_domain.notin_(saturated))
+            # Over-fetch so a burst for one domain at the head of the queue doesn't starve the others
+            candidates = query.order_by(OutboundEmail.next_attempt_at).limit(limit * 4).with_for_update(skip_locked=True).all()
+            
+            claimed = []
+            for email in candidates:
+                if len(claimed) == limit:
+                    break
+                if in_flight[email.recipient_domain] >= self.domain_concurrency:
+                    continue
+                in_flight[email.recipient_domain] += 1
+                email.status = EmailDeliveryStatus.SENDING
+                email.attempts += 1
+                # Lease: if this process dies mid-send, the email is due again after it
+                email.next_attempt_at = now + timedelta(seconds=settings.EMAIL_SEND_LEASE_SECONDS)
+                claimed.append(email)
+            db.commit()
+        finally:
+            db.close()
+        
+        with self._lock:
+            for email in claimed:
+                self._in_flight[email.recipient_domain] += 1
+        return claimed
+    
+    def _deliver(self, email: OutboundEmail):
+        try:
+            try:
+                msg = self.email_service.render_message(email.template, email.to_email, email.context, email.locale)
+                self.email_service.delivery.send(msg)
+            except Exception as e:
+                self._record_failure(email, e)
+            else:
+                self._resolve(email, status=EmailDeliveryStatus.SENT, sent_at=datetime.now(timezone.utc), last_error=None)
+                logger.info(f"Sent {email.template} email {email.id} to {email.to_email}")
+        except Exception:
+            # Status not recorded; the lease expires and the email is retried
+            logger.exception(f"Failed to record delivery of email {email.id}")
+        finally:
+            with self._lock:
+                self._in_flight[email.recipient_domain] -= 1
+                if self._in_flight[email.recipient_domain] <= 0:
+                    del self._in_flight[email.recipient_domain]
+            self._wake.set()
+    
+    def _record_failure(self, email: OutboundEmail, error: Exception):
+        message = f"{type(error).__name__}: {error}"
+        if is_permanent_failure(error) or email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            self._resolve(email, status=EmailDeliveryStatus.DEAD, last_error=message)
+            logger.error(f"Dead-lettered email {email.id} to {email.to_email} after {email.attempts} attempts: {message}")
+            return
+        delay = retry_delay(email.attempts)
+        self._resolve(
+            email,
+            status=EmailDeliveryStatus.RETRYING,
+            last_error=message,
+            next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay)
+        )
+        logger.warning(f"Email {email.id} to {email.to_email} failed (attempt {email.attempts}), retrying in {delay:.0f}s: {message}")
+    
+    def _resolve(self, email: OutboundEmail, **values):
+        db = self.session_factory()
+        try:
+            # Only while our claim stands: a row re-claimed after its lease expired belongs to someone else
+            db.query(OutboundEmail).filter(
+                OutboundEmail.id == email.id,
+                OutboundEmail.status == EmailDeliveryStatus.SENDING,
+                OutboundEmail.attempts == email.attempts
+            ).update(values, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+# Started and stopped by the app lifespan (src/main.py); woken by enqueue_email
+email_dispatcher = EmailDispatcher()
+
+def main():
+    parser = argparse.ArgumentParser(description="Send queued emails")
+    parser.add_argument("--once", action="store_true", help="Send what is due now, then exit")
+    parser.add_argument("--requeue-dead", action="store_true", help="Give dead-lettered emails a fresh set of attempts")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    if args.requeue_dead:
+        from src.notifications.service import NotificationService
+        db = SessionLocal()
+        try:
+            print(f"Requeued {NotificationService().requeue_dead_letters(db)} emails")
+        finally:
+            db.close()
+        return
+    
+    if args.once:
+        print(f"Attempted {email_dispatcher.run_pending()} emails")
+        return
+    
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    email_dispatcher.start()
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        email_dispatcher.stop()
+
+if __name__ == "__main__":
+    main()
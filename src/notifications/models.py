@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Enum, Index, Text, text
+from sqlalchemy.sql import func
+import enum
+from src.core.database import Base
+
+class EmailDeliveryStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    RETRYING = "RETRYING"
+    DEAD = "DEAD"  # Dead-lettered: out of attempts or permanently refused
+
+# Statuses the dispatcher picks up once next_attempt_at has passed (partial index predicate)
+DUE_EMAIL_STATUSES = "status IN ('QUEUED', 'SENDING', 'RETRYING')"
+
+class OutboundEmail(Base):
+    """
+    A queued email, rendered and sent by the dispatcher
+
+    The template name and its variables are stored rather than the rendered
+    message, so retries render with the current templates. next_attempt_at
+    doubles as the lease on SENDING rows: a row whose sender died is picked
+    up again once it passes.
+    """
+    __tablename__ = "outbound_emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    template = Column(String, nullable=False)
+    locale = Column(String)
+    to_email = Column(String, nullable=False)
+    recipient_domain = Column(String, nullable=False)
+    context = Column(JSON, nullable=False)
+    invitation_id = Column(Integer, ForeignKey("invitations.id"), index=True)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), index=True)
+
+    status = Column(Enum(EmailDeliveryStatus), nullable=False, default=EmailDeliveryStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # The dispatcher's claim query
+        Index("ix_outbound_emails_due", "next_attempt_at", postgresql_where=text(DUE_EMAIL_STATUSES)),
+    )
@@ -0,0 +1,163 @@
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from src.notifications.models import EmailDeliveryStatus, OutboundEmail
+from src.notifications.dispatcher import email_dispatcher
+from src.outbox.models import OutboxEvent, OutboxStatus
+from src.outbox.service import EMAIL_REQUESTED
+from src.workflow.models import Invitation
+from datetime import datetime, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+def recipient_domain(email: str) -> str:
+    return email.rsplit("@", 1)[-1].strip().lower()
+
+class NotificationService:
+    """Queue emails for background delivery and report on them"""
+    
+    def enqueue_email(
+        self,
+        db: Session,
+        template: str,
+        to_email: str,
+        context: dict,
+        locale: str = None,
+        invitation_id: int = None,
+        assessment_id: int = None,
+        commit: bool = True
+    ) -> OutboundEmail:
+        """
+        Queue an email; the dispatcher renders and sends it in the background
+        
+        Args:
+            db: Database session
+            template: Email template name (src/core/templates/email/<locale>/<template>.html)
+            to_email: Recipient address
+            context: Template variables (JSON-serializable)
+            locale: Template locale, default EMAIL_DEFAULT_LOCALE
+            invitation_id: Invitation the email belongs to, for delivery status
+            assessment_id: Assessment the email belongs to
+            commit: Commit now; with False the caller's commit queues it
+            
+        Returns:
+            The queued OutboundEmail
+        """
+        email = OutboundEmail(
+            template=template,
+            locale=locale,
+            to_email=to_email,
+            recipient_domain=recipient_domain(to_email),
+            context=context,
+            invitation_id=invitation_id,
+            assessment_id=assessment_id,
+            status=EmailDeliveryStatus.QUEUED,
+            next_attempt_at=datetime.now(timezone.utc)
+        )
+        db.add(email)
+        db.info["emails_queued"] = True
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+        
+        logger.info(f"Queued {template} email {email.id} to {to_email}")
+        
+        return email
+    
+    def enqueue_emails(self, db: Session, emails: list[dict], commit: bool = True) -> int:
+        """
+        Queue many emails with one multi-row INSERT
+        
+        Each dict has template, to_email and context, and optionally locale,
+        invitation_id and assessment_id, as for enqueue_email.
+        """
+        if not emails:
+            return 0
+        now = datetime.now(timezone.utc)
+        db.execute(insert(OutboundEmail), [{
+            "template": email["template"],
+            "locale": email.get("locale"),
+            "to_email": email["to_email"],
+            "recipient_domain": recipient_domain(email["to_email"]),
+            "context": email["context"],
+            "invitation_id": email.get("invitation_id"),
+            "assessment_id": email.get("assessment_id"),
+            "status": EmailDeliveryStatus.QUEUED,
+            "attempts": 0,
+            "next_attempt_at": now,
+        } for email in emails])
+        db.info["emails_queued"] = True
+        if commit:
+            db.commit()
+        
+        logger.info(f"Queued {len(emails)} emails")
+        return len(emails)
+    
+    def get_invitation_deliveries(self, db: Session, invitation_id: int) -> dict:
+        """Delivery status of every email sent for an invitation, newest first"""
+        if not db.query(Invitation.id).filter(Invitation.id == invitation_id).scalar():
+            raise ValueError(f"Invitation {invitation_id} not found")
+        
+        emails = db.query(OutboundEmail).filter(
+            OutboundEmail.invitation_id == invitation_id
+        ).order_by(OutboundEmail.id.desc()).all()
+        
+        status = emails[0].status.value if emails else None
+        if not emails and self._email_requested(db, invitation_id):
+            # Committed with the invitation; the relay hasn't handed it to the queue yet
+            status = EmailDeliveryStatus.QUEUED.value
+        
+        return {
+            "invitation_id": invitation_id,
+            "status": status,
+            "deliveries": [
+                {
+                    "id": email.id,
+                    "template": email.template,
+                    "to_email": email.to_email,
+                    "status": email.status.value,
+                    "attempts": email.attempts,
+                    "last_error": email.last_error,
+                    "next_attempt_at": email.next_attempt_at if email.status == EmailDeliveryStatus.RETRYING else None,
+                    "created_at": email.created_at,
+                    "sent_at": email.sent_at,
+                }
+                for email in emails
+            ],
+        }
+    
+    def _email_requested(self, db: Session, invitation_id: int) -> bool:
+        return db.query(OutboxEvent.id).filter(
+            OutboxEvent.aggregate_type == "invitation",
+            OutboxEvent.aggregate_id == str(invitation_id),
+            OutboxEvent.event_type == EMAIL_REQUESTED,
+            OutboxEvent.status.in_((OutboxStatus.PENDING, OutboxStatus.PROCESSING))
+        ).first() is not None
+    
+    def requeue_dead_letters(self, db: Session, email_ids: list = None) -> int:
+        """Give dead-lettered emails a fresh set of attempts"""
+        query = db.query(OutboundEmail).filter(OutboundEmail.status == EmailDeliveryStatus.DEAD)
+        if email_ids:
+            query = query.filter(OutboundEmail.id.in_(email_ids))
+        requeued = query.update({
+            "status": EmailDeliveryStatus.QUEUED,
+            "attempts": 0,
+            "next_attempt_at": datetime.now(timezone.utc),
+        }, synchronize_session=False)
+        db.commit()
+        
+        if requeued:
+            email_dispatcher.wake()
+        logger.info(f"Requeued {requeued} dead-lettered emails")
+        
+        return requeued
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session):
+    if session.info.pop("emails_queued", False):
+        email_dispatcher.wake()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_emails(session):
+    session.info.pop("emails_queued", None)
@@ -0,0 +1 @@
+# Outbox module initialization
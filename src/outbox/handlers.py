@@ -0,0 +1,81 @@
+"""
+Outbox event handlers, by event type
+
+A handler gets the relay's session and the event. Database writes it makes
+without committing are committed together with the event's DONE mark, so
+they happen exactly once. Calls to other systems can repeat if the relay dies
+after the call and before that commit; receivers get the event ID to
+deduplicate on, and scoring skips assessments already scored.
+"""
+from sqlalchemy.orm import Session
+from src.outbox.models import OutboxEvent
+from src.outbox.service import EMAIL_REQUESTED, SCORING_REQUESTED, WEBHOOK
+from src.notifications.service import NotificationService
+from src.workflow.models import Assessment, AssessmentStatus
+from src.workflow.submission_service import SubmissionService
+from src.core.config import settings
+import hashlib
+import hmac
+import json
+import logging
+import requests
+
+logger = logging.getLogger(__name__)
+
+notification_service = NotificationService()
+submission_service = SubmissionService()
+
+def queue_email(db: Session, event: OutboxEvent):
+    """Hand the email to the dispatcher's queue (same transaction as the DONE mark)"""
+    payload = event.payload
+    notification_service.enqueue_email(
+        db,
+        payload["template"],
+        payload["to_email"],
+        payload["context"],
+        locale=payload.get("locale"),
+        invitation_id=payload.get("invitation_id"),
+        assessment_id=payload.get("assessment_id"),
+        commit=False
+    )
+
+def score_assessment(db: Session, event: OutboxEvent):
+    """Send the assessment to the Intelligence Engine and save its scores"""
+    assessment_id = event.payload["assessment_id"]
+    status = db.query(Assessment.status).filter(Assessment.id == assessment_id).scalar()
+    if status != AssessmentStatus.SUBMITTED:
+        logger.info(f"Assessment {assessment_id} is {status.value if status else 'gone'}; skipping scoring")
+        return
+    submission_service._trigger_scoring(db, assessment_id)
+
+def webhook_signature(body: bytes) -> str:
+    return hmac.new(settings.WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+def post_webhook(db: Session, event: OutboxEvent):
+    """POST the event to every WEBHOOK_URLS receiver; any failure retries the whole event"""
+    body = json.dumps({
+        "id": event.id,
+        "event": event.payload["event"],
+        "created_at": event.created_at.isoformat() if event.created_at else None,
+        "data": event.payload["data"],
+    }, default=str).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "X-FutureForm-Event": event.payload["event"],
+        "X-FutureForm-Event-Id": str(event.id),  # Same on every retry: receivers deduplicate on it
+    }
+    if settings.WEBHOOK_SECRET:
+        headers["X-FutureForm-Signature"] = f"sha256={webhook_signature(body)}"
+    
+    for url in (url.strip() for url in settings.WEBHOOK_URLS.split(",")):
+        if not url:
+            continue
+        response = requests.post(url, data=body, headers=headers, timeout=settings.WEBHOOK_TIMEOUT_SECONDS)
+        if response.status_code >= 300:
+            raise Exception(f"Webhook {url} returned {response.status_code}")
+
+HANDLERS = {
+    EMAIL_REQUESTED: queue_email,
+    SCORING_REQUESTED: score_assessment,
+    WEBHOOK: post_webhook,
+}
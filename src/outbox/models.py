@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Enum, Index, Text, text
+from sqlalchemy.sql import func
+import enum
+from src.core.database import Base
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    DONE = "DONE"
+    FAILED = "FAILED"  # Out of attempts; needs a look before requeueing
+
+# Statuses the relay picks up once available_at has passed (partial index predicate)
+DUE_OUTBOX_STATUSES = "status IN ('PENDING', 'PROCESSING')"
+
+class OutboxEvent(Base):
+    """
+    A side effect recorded in the same transaction as the change that caused it
+
+    The relay (src/outbox/relay.py) runs the handler for event_type and marks
+    the row DONE. available_at doubles as the lease on PROCESSING rows: a row
+    whose relay died is picked up again once it passes.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String, nullable=False)
+    aggregate_type = Column(String)  # What the event is about, e.g. invitation / assessment
+    aggregate_id = Column(String)
+    payload = Column(JSON, nullable=False)
+
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # The relay's claim query
+        Index("ix_outbox_events_due", "available_at", postgresql_where=text(DUE_OUTBOX_STATUSES)),
+        Index("ix_outbox_events_aggregate", "aggregate_type", "aggregate_id"),
+    )
@@ -0,0 +1,225 @@
+"""
+Outbox relay: deliver committed outbox events
+
+Claims due events in batches of up to OUTBOX_BATCH_SIZE with FOR UPDATE SKIP
+LOCKED (marking them PROCESSING under a lease), so several relays can run
+side by side without handling an event twice, then runs their handlers on a
+small thread pool. Failed events are retried with capped exponential backoff;
+after OUTBOX_MAX_ATTEMPTS they are marked FAILED. Each API process runs a
+relay unless OUTBOX_RELAY_IN_APP is off; otherwise run it standalone:
+
+    python -m src.outbox.relay
+    python -m src.outbox.relay --purge     # delete DONE events past OUTBOX_RETENTION_DAYS (cron)
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+from src.outbox.models import OutboxEvent, OutboxStatus
+from src.outbox.service import outbox_committed
+from src.outbox.handlers import HANDLERS
+from src.core.config import settings
+from src.core.database import SessionLocal
+from datetime import datetime, timedelta, timezone
+import argparse
+import logging
+import random
+import signal
+import threading
+
+logger = logging.getLogger(__name__)
+
+DUE_STATUSES = (OutboxStatus.PENDING, OutboxStatus.PROCESSING)
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before the next attempt: doubling from OUTBOX_RETRY_BASE_SECONDS, capped, with jitter"""
+    delay = min(settings.OUTBOX_RETRY_MAX_SECONDS, settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+class OutboxRelay:
+    """Claims due outbox events and runs their handlers on a thread pool"""
+    
+    def __init__(self, handlers: dict = None, workers: int = None, batch_size: int = None,
+                 session_factory=SessionLocal, wake_event: threading.Event = None):
+        self.handlers = HANDLERS if handlers is None else handlers
+        self.workers = workers or settings.OUTBOX_RELAY_WORKERS
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.session_factory = session_factory
+        
+        self._claimed = 0  # Claimed and not yet resolved
+        self._lock = threading.Lock()
+        self._wake = wake_event or threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._executor = None
+    
+    def start(self):
+        """Start relaying in the background"""
+        if self._thread:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbox-relay")
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+        logger.info(f"Outbox relay started with {self.workers} workers")
+    
+    def stop(self, timeout: float = 30.0):
+        """Stop claiming and let running handlers finish; claimed events left over are retried after their lease"""
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._thread = self._executor = None
+        logger.info("Outbox relay stopped")
+    
+    def wake(self):
+        self._wake.set()
+    
+    def run_pending(self) -> int:
+        """Process every event due now and wait for the results; returns the number processed"""
+        processed = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbox-relay") as executor:
+            while futures := self._dispatch(executor):
+                wait(futures)
+                processed += len(futures)
+        return processed
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                claimed = self._dispatch(self._executor)
+            except Exception:
+                logger.exception("Outbox relay failed")
+                claimed = []
+            if not claimed:
+                self._wake.wait(settings.OUTBOX_POLL_SECONDS)
+    
+    def _backlog(self) -> int:
+        with self._lock:
+            return self._claimed
+    
+    def _dispatch(self, executor: ThreadPoolExecutor) -> list:
+        # Only lease what a free worker starts now: an event queued behind slow
+        # handlers could outlive its lease and be claimed and run a second time
+        limit = min(self.batch_size, self.workers - self._backlog())
+        if limit <= 0:
+            return []
+        return [executor.submit(self._process, event) for event in self._claim(limit)]
+    
+    def _claim(self, limit: int) -> list:
+        """Lease up to `limit` due events, oldest first"""
+        now = datetime.now(timezone.utc)
+        db = self.session_factory()
+        try:
+            events = db.query(OutboxEvent).filter(
+                OutboxEvent.status.in_(DUE_STATUSES),
+                OutboxEvent.available_at <= now
+            ).order_by(OutboxEvent.id).limit(limit).with_for_update(skip_locked=True).all()
+            
+            for event in events:
+                event.status = OutboxStatus.PROCESSING
+                event.attempts += 1
+                # Lease: if this relay dies, the event is due again after it
+                event.available_at = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            db.commit()
+        finally:
+            db.close()
+        
+        with self._lock:
+            self._claimed += len(events)
+        return events
+    
+    def _process(self, event: OutboxEvent):
+        db = self.session_factory()
+        try:
+            handler = self.handlers.get(event.event_type)
+            if handler is None:
+                raise LookupError(f"No outbox handler for {event.event_type}")
+            handler(db, event)
+            # Committed with the handler's own writes, so those happen exactly once
+            if self._resolve(db, event, status=OutboxStatus.DONE, processed_at=datetime.now(timezone.utc), last_error=None):
+                db.commit()
+            else:
+                db.rollback()
+                logger.warning(f"Outbox event {event.id} was re-claimed after its lease expired; discarding this run")
+        except Exception as e:
+            db.rollback()
+            try:
+                self._record_failure(db, event, e)
+            except Exception:
+                logger.exception(f"Failed to record outbox event {event.id} failure; retried after its lease")
+        finally:
+            db.close()
+            with self._lock:
+                self._claimed -= 1
+            self._wake.set()
+    
+    def _record_failure(self, db, event: OutboxEvent, error: Exception):
+        message = f"{type(error).__name__}: {error}"
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            self._resolve(db, event, status=OutboxStatus.FAILED, last_error=message)
+            db.commit()
+            logger.error(f"Outbox event {event.id} ({event.event_type}) failed after {event.attempts} attempts: {message}")
+            return
+        delay = retry_delay(event.attempts)
+        self._resolve(
+            db, event,
+            status=OutboxStatus.PENDING,
+            last_error=message,
+            available_at=datetime.now(timezone.utc) + timedelta(seconds=delay)
+        )
+        db.commit()
+        logger.warning(f"Outbox event {event.id} ({event.event_type}) failed (attempt {event.attempts}), retrying in {delay:.0f}s: {message}")
+    
+    def _resolve(self, db, event: OutboxEvent, **values) -> bool:
+        # Only while our lease stands: a re-claimed event belongs to another run
+        return db.query(OutboxEvent).filter(
+            OutboxEvent.id == event.id,
+            OutboxEvent.status == OutboxStatus.PROCESSING,
+            OutboxEvent.attempts == event.attempts
+        ).update(values, synchronize_session=False) == 1
+
+def purge_processed(db, retention_days: int = None) -> int:
+    """Delete DONE events older than the retention window"""
+    retention_days = settings.OUTBOX_RETENTION_DAYS if retention_days is None else retention_days
+    deleted = db.query(OutboxEvent).filter(
+        OutboxEvent.status == OutboxStatus.DONE,
+        OutboxEvent.processed_at < datetime.now(timezone.utc) - timedelta(days=retention_days)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+# Started and stopped by the app lifespan (src/main.py); woken by commits that add events
+outbox_relay = OutboxRelay(wake_event=outbox_committed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver outbox events")
+    parser.add_argument("--once", action="store_true", help="Process what is due now, then exit")
+    parser.add_argument("--purge", action="store_true", help="Delete processed events past OUTBOX_RETENTION_DAYS")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    if args.purge:
+        db = SessionLocal()
+        try:
+            print(f"Purged {purge_processed(db)} processed outbox events")
+        finally:
+            db.close()
+        return
+    
+    if args.once:
+        print(f"Processed {outbox_relay.run_pending()} outbox events")
+        return
+    
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    outbox_relay.start()
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        outbox_relay.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Transactional outbox: record side effects with the change that causes them
+
+Services call add_event() before their commit instead of calling the
+Intelligence Engine, SMTP or webhook receivers inline. The event row commits
+or rolls back with the business change, so a crash can neither lose the side
+effect nor (on a retried request) run it for a change that never committed.
+The relay delivers committed events in the background.
+"""
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from src.outbox.models import OutboxEvent, OutboxStatus
+from src.core.config import settings
+from datetime import datetime, timezone
+import threading
+
+# Event types and the relay handler each one maps to (src/outbox/handlers.py)
+EMAIL_REQUESTED = "email.requested"
+SCORING_REQUESTED = "assessment.scoring_requested"
+WEBHOOK = "webhook"
+
+# Set after a commit that wrote outbox events, so the relay doesn't wait for its next poll
+outbox_committed = threading.Event()
+
+def add_event(db: Session, event_type: str, payload: dict, aggregate_type: str = None, aggregate_id=None) -> OutboxEvent:
+    """
+    Add an event to the session; it is written by the caller's commit
+    
+    Args:
+        db: The session holding the business change
+        event_type: Handler to run (EMAIL_REQUESTED, SCORING_REQUESTED, WEBHOOK)
+        payload: Handler arguments (JSON-serializable)
+        aggregate_type: What the event is about, e.g. "invitation"
+        aggregate_id: ID of that record
+        
+    Returns:
+        The pending OutboxEvent
+    """
+    outbox_event = OutboxEvent(
+        event_type=event_type,
+        aggregate_type=aggregate_type,
+        aggregate_id=None if aggregate_id is None else str(aggregate_id),
+        payload=payload,
+        status=OutboxStatus.PENDING,
+        available_at=datetime.now(timezone.utc)
+    )
+    db.add(outbox_event)
+    db.info["outbox_events"] = True
+    return outbox_event
+
+def add_webhook_event(db: Session, name: str, data: dict, aggregate_type: str = None, aggregate_id=None):
+    """Add a webhook notification for WEBHOOK_URLS; nothing is recorded when none are configured"""
+    if not settings.WEBHOOK_URLS.strip():
+        return None
+    return add_event(db, WEBHOOK, {"event": name, "data": data}, aggregate_type, aggregate_id)
+
+def add_webhook_events(db: Session, name: str, events: list[tuple]) -> int:
+    """
+    Add many webhook notifications with one multi-row INSERT; does not commit
+    
+    events holds (aggregate_type, aggregate_id, data) tuples.
+    """
+    if not events or not settings.WEBHOOK_URLS.strip():
+        return 0
+    now = datetime.now(timezone.utc)
+    db.execute(insert(OutboxEvent), [{
+        "event_type": WEBHOOK,
+        "aggregate_type": aggregate_type,
+        "aggregate_id": str(aggregate_id),
+        "payload": {"event": name, "data": data},
+        "status": OutboxStatus.PENDING,
+        "attempts": 0,
+        "available_at": now,
+    } for aggregate_type, aggregate_id, data in events])
+    db.info["outbox_events"] = True
+    return len(events)
+
+@event.listens_for(Session, "after_commit")
+def _wake_relay(session):
+    if session.info.pop("outbox_events", False):
+        outbox_committed.set()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_events(session):
+    session.info.pop("outbox_events", None)
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import List, Optional
 from pydantic import BaseModel
-from src.core.database import get_db
-from src.portals.customer.service import CustomerPortalService
+from src.core.config import settings
+from src.core.database import DbSession, get_read_session, get_session
+from src.portals.customer.service import AsyncCustomerPortalService
 
 router = APIRouter()
-service = CustomerPortalService()
+service = AsyncCustomerPortalService()
 
 class AssessmentResponse(BaseModel):
     id: int
@@ -17,6 +17,15 @@ class AssessmentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CountEstimate(BaseModel):
+    count: int
+    exact: bool
+
+class AssessmentPage(BaseModel):
+    items: List[AssessmentResponse]
+    next_cursor: Optional[str] = None
+    total_estimate: Optional[CountEstimate] = None
+
 class AssessmentCreate(BaseModel):
     organization_id: str
     sector: str
@@ -25,27 +34,46 @@ class RespondentCreate(BaseModel):
     email: str
     role: str
 
-@router.get("/assessments", response_model=List[AssessmentResponse])
-def list_assessments(organization_id: str, db: Session = Depends(get_db)):
-    return service.list_assessments(db, organization_id)
+@router.get("/assessments", response_model=AssessmentPage)
+async def list_assessments(organization_id: str, limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+                           cursor: Optional[str] = None, include_total: bool = False,
+                           db: DbSession = Depends(get_read_session)):
+    try:
+        return await service.list_assessments(db, organization_id, limit, cursor, include_total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/assessments", response_model=AssessmentResponse)
-def create_assessment(assessment: AssessmentCreate, db: Session = Depends(get_db)):
-    return service.create_assessment(db, assessment.organization_id, assessment.sector)
+async def create_assessment(assessment: AssessmentCreate, db: DbSession = Depends(get_session)):
+    return await service.create_assessment(db, assessment.organization_id, assessment.sector)
 
 @router.get("/assessments/{assessment_id}", response_model=AssessmentResponse)
-def get_assessment(assessment_id: int, organization_id: str, db: Session = Depends(get_db)):
-    assessment = service.get_assessment_details(db, assessment_id, organization_id)
+async def get_assessment(assessment_id: int, organization_id: str, db: DbSession = Depends(get_read_session)):
+    assessment = await service.get_assessment_details(db, assessment_id, organization_id)
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     return assessment
 
 @router.post("/assessments/{assessment_id}/respondents")
-def add_respondent(assessment_id: int, organization_id: str, respondent: RespondentCreate, db: Session = Depends(get_db)):
+async def add_respondent(assessment_id: int, organization_id: str, respondent: RespondentCreate, db: DbSession = Depends(get_session)):
     try:
-        result = service.add_respondent(db, assessment_id, organization_id, respondent.email, respondent.role)
+        result = await service.add_respondent(db, assessment_id, organization_id, respondent.email, respondent.role)
         if not result:
             raise HTTPException(status_code=404, detail="Assessment not found")
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/assessments/{assessment_id}/respondents/import")
+async def import_respondents(assessment_id: int, organization_id: str, request: Request, db: DbSession = Depends(get_session)):
+    """Bulk-add respondents from a CSV (text/csv) or JSON array (application/json) body"""
+    body = await request.body()
+    try:
+        result = await service.import_respondents(
+            db, assessment_id, organization_id, body, request.headers.get("content-type", "text/csv")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not result:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return result
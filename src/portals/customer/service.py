@@ -1,17 +1,25 @@
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from src.core.database import AsyncServiceAdapter, DbSession, run_in_session
+from src.core.pagination import paginate
 from src.workflow.models import Assessment, AssessmentStatus
 from src.workflow.service import WorkflowService
+from src.workflow.respondent_import import prepare_respondent_import, dedupe_respondent_rows, insert_respondents
 from src.billing.service import BillingService
-from src.billing.models import CreditType, TransactionType
+from src.billing.reservations import ReservationService
+from src.billing.models import CreditType
 
 class CustomerPortalService:
     def __init__(self):
         self.workflow_service = WorkflowService()
         self.billing_service = BillingService()
+        self.reservation_service = ReservationService()
 
-    def list_assessments(self, db: Session, organization_id: str):
-        """List all assessments for an organization."""
-        return db.query(Assessment).filter(Assessment.organization_id == organization_id).all()
+    def list_assessments(self, db: Session, organization_id: str, limit: int = None,
+                         cursor: str = None, include_total: bool = False):
+        """List assessments for an organization, one keyset page at a time."""
+        query = db.query(Assessment).filter(Assessment.organization_id == organization_id)
+        return paginate(query, Assessment, limit, cursor, include_total)
 
     def get_assessment_details(self, db: Session, assessment_id: int, organization_id: str):
         """Get details of a specific assessment."""
@@ -32,16 +40,67 @@ class CustomerPortalService:
         if not assessment:
             return None
         
-        # Check credits (Example: 1 RC per respondent)
-        balance = self.billing_service.get_balance(db, organization_id, CreditType.RESPONDENT_CREDIT)
-        if balance < 1:
-            raise ValueError("Insufficient Respondent Credits")
-
-        # Deduct credit
-        self.billing_service.record_transaction(
-            db, organization_id, CreditType.RESPONDENT_CREDIT, 1.0, 
-            TransactionType.CONSUMPTION, f"Added respondent {email} to assessment {assessment_id}"
+        # 1 RC per respondent; the debit commits together with the respondent
+        self.billing_service.consume_credits(
+            db, organization_id, CreditType.RESPONDENT_CREDIT, 1.0,
+            f"Added respondent {email} to assessment {assessment_id}", commit=False
         )
 
         # Add respondent
         return self.workflow_service.add_respondent(db, assessment_id, email, role)
+
+    def import_respondents(self, db: Session, assessment_id: int, organization_id: str, body: bytes, content_type: str):
+        """Bulk-add respondents from a CSV or JSON upload, charging credits once for the batch."""
+        cleaned, errors = prepare_respondent_import(body, content_type)
+        return self.import_respondent_rows(db, assessment_id, organization_id, cleaned, errors)
+
+    def import_respondent_rows(self, db: Session, assessment_id: int, organization_id: str, cleaned: list[dict], errors: list[dict]):
+        """Insert rows from prepare_respondent_import that aren't duplicates, charging credits once for the batch."""
+        assessment = self.get_assessment_details(db, assessment_id, organization_id)
+        if not assessment:
+            return None
+
+        valid, errors = dedupe_respondent_rows(db, assessment_id, cleaned, errors)
+
+        # Hold 1 RC per valid row up front; the insert and the charge then
+        # commit together, and a failed insert gives the hold back
+        reservation = None
+        if valid:
+            reservation = self.reservation_service.reserve(
+                db, organization_id, CreditType.RESPONDENT_CREDIT, float(len(valid)),
+                f"Importing {len(valid)} respondents to assessment {assessment_id}"
+            )
+
+        try:
+            imported = insert_respondents(db, valid)
+            if reservation:
+                self.reservation_service.commit(
+                    db, reservation.id, float(imported),
+                    f"Imported {imported} respondents to assessment {assessment_id}"
+                )
+            else:
+                db.commit()
+        except Exception:
+            db.rollback()
+            if reservation:
+                self.reservation_service.release(db, reservation.id)
+            raise
+
+        return {
+            "assessment_id": assessment_id,
+            "imported": imported,
+            "failed": len(errors),
+            "credits_charged": imported,
+            "errors": errors,
+        }
+
+class AsyncCustomerPortalService(AsyncServiceAdapter):
+    """CustomerPortalService for async routes"""
+
+    def __init__(self):
+        super().__init__(CustomerPortalService())
+
+    async def import_respondents(self, db: DbSession, assessment_id: int, organization_id: str, body: bytes, content_type: str):
+        """Parse and validate the upload in the threadpool; only the inserts go through the session."""
+        cleaned, errors = await run_in_threadpool(prepare_respondent_import, body, content_type)
+        return await run_in_session(db, self.sync.import_respondent_rows, assessment_id, organization_id, cleaned, errors)
@@ -1,32 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Any
-from src.core.database import get_db
-from src.portals.respondent.service import RespondentPortalService
+from src.billing.service import InsufficientCreditsError
+from src.core.config import settings
+from src.core.database import DbSession, get_read_session, get_session
+from src.portals.respondent.service import AsyncRespondentPortalService
 
 router = APIRouter()
-service = RespondentPortalService()
+service = AsyncRespondentPortalService()
 
 class ResponseSubmit(BaseModel):
     question_id: str
     answer_value: Dict[str, Any]
     evidence_files: List[str] = []
 
+class ResponseBatchSubmit(BaseModel):
+    items: List[ResponseSubmit] = Field(..., min_length=1, max_length=settings.RESPONSE_BATCH_MAX)
+
 class UploadRequest(BaseModel):
     filename: str
 
 @router.get("/context/{respondent_id}")
-def get_context(respondent_id: int, db: Session = Depends(get_db)):
-    context = service.get_respondent_context(db, respondent_id)
+async def get_context(respondent_id: int, db: DbSession = Depends(get_read_session)):
+    context = await service.get_respondent_context(db, respondent_id)
     if not context:
         raise HTTPException(status_code=404, detail="Respondent not found")
     return context
 
 @router.post("/responses/{respondent_id}")
-def submit_response(respondent_id: int, response: ResponseSubmit, db: Session = Depends(get_db)):
-    return service.submit_response(db, respondent_id, response.question_id, response.answer_value, response.evidence_files)
+async def submit_response(respondent_id: int, response: ResponseSubmit, db: DbSession = Depends(get_session)):
+    try:
+        return await service.submit_response(db, respondent_id, response.question_id, response.answer_value, response.evidence_files)
+    except InsufficientCreditsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/responses/{respondent_id}/batch")
+async def submit_responses(respondent_id: int, batch: ResponseBatchSubmit, db: DbSession = Depends(get_session)):
+    try:
+        return await service.submit_responses(db, respondent_id, [item.model_dump() for item in batch.items])
+    except InsufficientCreditsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @router.post("/upload/{respondent_id}")
-def get_upload_url(respondent_id: int, request: UploadRequest):
-    return service.get_upload_url(respondent_id, request.filename)
+async def get_upload_url(respondent_id: int, request: UploadRequest):
+    return await run_in_threadpool(service.sync.get_upload_url, respondent_id, request.filename)
@@ -1,5 +1,11 @@
 from sqlalchemy.orm import Session
-from src.workflow.models import Response, Respondent
+from starlette.concurrency import run_in_threadpool
+from src.api_core.billing.credit_ledger import credit_ledger
+from src.billing.models import CreditType
+from src.core.config import settings
+from src.core.database import AsyncServiceAdapter, DbSession, run_in_session
+from src.workflow.models import Assessment, Respondent
+from src.workflow.response_store import upsert_response, save_response_batch, attach_evidence_keys
 from src.core.storage import StorageService
 import uuid
 
@@ -13,27 +19,81 @@ class RespondentPortalService:
 
     def submit_response(self, db: Session, respondent_id: int, question_id: str, answer_value: dict, evidence_files: list):
         """Submit a response to a question."""
-        # Check if response exists
-        response = db.query(Response).filter(
-            Response.respondent_id == respondent_id,
-            Response.question_id == question_id
-        ).first()
-
-        if not response:
-            response = Response(
-                respondent_id=respondent_id,
-                question_id=question_id
-            )
-            db.add(response)
-        
-        response.answer_value = answer_value
-        response.evidence_files = evidence_files
+        response, charge = self._save_response(db, respondent_id, question_id, answer_value, evidence_files)
+        self._meter_evidence(charge)
         db.commit()
-        db.refresh(response)
         return response
 
+    def submit_responses(self, db: Session, respondent_id: int, items: list[dict]) -> dict:
+        """Save a page of answers in one transaction, with per-item results."""
+        batch, charge = self._save_responses(db, respondent_id, items)
+        self._meter_evidence(charge)
+        db.commit()
+        return batch
+
+    def _save_response(self, db: Session, respondent_id: int, question_id: str, answer_value: dict, evidence_files: list):
+        """Upsert one answer and attach its evidence; returns it and the evidence charge, uncommitted."""
+        # Answers saved here never carry context, so keep any set elsewhere
+        response = upsert_response(db, respondent_id, question_id, answer_value, update_columns=("answer_value",))
+        charge = self._evidence_charge(db, respondent_id, attach_evidence_keys(db, {response.id: evidence_files}))
+        return response, charge
+
+    def _save_responses(self, db: Session, respondent_id: int, items: list[dict]):
+        """Upsert a page of answers and attach their evidence; returns the batch and the evidence charge, uncommitted."""
+        batch = save_response_batch(db, respondent_id, items, update_columns=("answer_value",))
+        evidence = {
+            result["response_id"]: items[result["index"]].get("evidence_files") or []
+            for result in batch["results"] if result["status"] == "saved"
+        }
+        return batch, self._evidence_charge(db, respondent_id, attach_evidence_keys(db, evidence))
+
     def get_upload_url(self, respondent_id: int, filename: str):
         """Generate a presigned URL for uploading evidence."""
         key = f"evidence/{respondent_id}/{uuid.uuid4()}_{filename}"
         url = self.storage_service.generate_presigned_url(key)
         return {"upload_url": url, "key": key}
+
+    def _evidence_charge(self, db: Session, respondent_id: int, attached: int):
+        """(organization_id, files) to charge for newly attached evidence, or None"""
+        if not settings.METER_EVIDENCE_UPLOADS or not attached:
+            return None
+        organization_id = db.query(Assessment.organization_id).join(
+            Respondent, Respondent.assessment_id == Assessment.id
+        ).filter(Respondent.id == respondent_id).scalar()
+        return organization_id, attached
+
+    def _meter_evidence(self, charge):
+        """Charge one Evidence Credit per new file through the buffered meter, not a ledger write each"""
+        if not charge:
+            return
+        organization_id, attached = charge
+        # Raises InsufficientCreditsError before the caller commits, so an unpaid upload isn't saved
+        credit_ledger.debit_credits(
+            organization_id, float(attached), CreditType.EVIDENCE_CREDIT, f"Evidence upload ({attached} files)"
+        )
+
+class AsyncRespondentPortalService(AsyncServiceAdapter):
+    """
+    RespondentPortalService for async routes
+
+    The meter uses its own sync sessions and can flush inline, so it runs in
+    the threadpool between saving the answers and committing them, never
+    inside run_sync on the event loop.
+    """
+
+    def __init__(self):
+        super().__init__(RespondentPortalService())
+
+    async def submit_response(self, db: DbSession, respondent_id: int, question_id: str, answer_value: dict, evidence_files: list):
+        response, charge = await run_in_session(
+            db, self.sync._save_response, respondent_id, question_id, answer_value, evidence_files
+        )
+        await run_in_threadpool(self.sync._meter_evidence, charge)
+        await run_in_session(db, Session.commit)
+        return response
+
+    async def submit_responses(self, db: DbSession, respondent_id: int, items: list[dict]) -> dict:
+        batch, charge = await run_in_session(db, self.sync._save_responses, respondent_id, items)
+        await run_in_threadpool(self.sync._meter_evidence, charge)
+        await run_in_session(db, Session.commit)
+        return batch
@@ -1,7 +1,12 @@
 from sqlalchemy.orm import Session
-from src.workflow.models import Invitation, Assessment, InvitationStatus
+from src.workflow.models import Invitation, Assessment, InvitationStatus, Project
+from src.workflow.partner_onboarding import insert_partner_assessments, insert_partner_invitations, validate_partner_rows
 from src.core.email_service import EmailService
-from datetime import datetime, timedelta
+from src.notifications.service import NotificationService
+from src.outbox.models import OutboxEvent
+from src.outbox.service import EMAIL_REQUESTED, add_event, add_webhook_event, add_webhook_events
+from src.core.database import AsyncServiceAdapter
+from datetime import datetime, timedelta, timezone
 import secrets
 import logging
 
@@ -12,6 +17,7 @@ class InvitationService:
     
     def __init__(self):
         self.email_service = EmailService()
+        self.notifications = NotificationService()
     
     def create_invitation(
         self,
@@ -23,7 +29,7 @@ class InvitationService:
         deadline_days: int = 14
     ) -> Invitation:
         """
-        Create and send partner invitation
+        Create partner invitation and queue its email
         
         Args:
             db: Database session
@@ -36,6 +42,113 @@ class InvitationService:
         Returns:
             Created Invitation object
         """
+        project_name = self._project_name(db, assessment_id)
+        invitation = self._create_invitation_record(
+            db, assessment_id, partner_email, partner_org_name, role, deadline_days, commit=False
+        )
+        
+        # The email and webhook commit with the invitation and go out from the outbox
+        self._request_invitation_email(db, invitation, project_name)
+        add_webhook_event(db, "invitation.created", {
+            "invitation_id": invitation.id,
+            "assessment_id": assessment_id,
+            "partner_email": partner_email,
+            "partner_org_name": partner_org_name,
+            "role": role,
+            "expires_at": invitation.expires_at.isoformat(),
+        }, "invitation", invitation.id)
+        db.commit()
+        
+        return invitation
+    
+    def onboard_partners(
+        self,
+        db: Session,
+        project_id: int,
+        partners: list[dict],
+        sector: str = None,
+        role: str = "partner_admin",
+        deadline_days: int = 14
+    ) -> dict:
+        """
+        Create an assessment and invitation per partner and queue the invitation emails
+        
+        Everything is written with multi-row INSERTs in one transaction, so the
+        statement count doesn't grow with the batch. Invalid partners are
+        reported instead of failing the batch.
+        
+        Args:
+            db: Database session
+            project_id: Project the assessments belong to
+            partners: Dicts with partner_email, partner_org_name and optionally sector
+            sector: Sector for partners that don't set one (default: the project's)
+            role: Invitation role for every partner
+            deadline_days: Days until the invitations expire (also the assessment deadline)
+            
+        Returns:
+            Per-partner results and the error report
+        """
+        project = db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise ValueError(f"Project {project_id} not found")
+        
+        valid, errors = validate_partner_rows(db, project, partners, sector)
+        # Aware UTC, like the email and outbox rows written alongside
+        expires_at = datetime.now(timezone.utc) + timedelta(days=deadline_days)
+        assessment_ids = insert_partner_assessments(db, project, valid, expires_at)
+        invitations = insert_partner_invitations(db, valid, assessment_ids, role, expires_at)
+        
+        # Queued straight into the email queue: it is written by this same
+        # transaction, so the outbox hop would add nothing but latency
+        deadline = expires_at.strftime("%B %d, %Y")
+        self.notifications.enqueue_emails(db, [{
+            "template": "partner_invitation",
+            "to_email": invitation["partner_email"],
+            "context": self.email_service.partner_invitation_context(
+                partner_org_name=invitation["partner_org_name"],
+                project_name=project.name,
+                invitation_token=invitation["token"],
+                deadline=deadline
+            ),
+            "invitation_id": invitation["id"],
+            "assessment_id": invitation["assessment_id"],
+        } for invitation in invitations], commit=False)
+        add_webhook_events(db, "invitation.created", [("invitation", invitation["id"], {
+            "invitation_id": invitation["id"],
+            "assessment_id": invitation["assessment_id"],
+            "partner_email": invitation["partner_email"],
+            "partner_org_name": invitation["partner_org_name"],
+            "role": role,
+            "expires_at": expires_at.isoformat(),
+        }) for invitation in invitations])
+        db.commit()
+        
+        logger.info(f"Onboarded {len(invitations)} partners to project {project_id} ({len(errors)} rejected)")
+        return {
+            "project_id": project_id,
+            "created": len(invitations),
+            "failed": len(errors),
+            "results": [{
+                "row": partner["row"],
+                "partner_email": invitation["partner_email"],
+                "partner_org_name": invitation["partner_org_name"],
+                "assessment_id": invitation["assessment_id"],
+                "invitation_id": invitation["id"],
+            } for partner, invitation in zip(valid, invitations)],
+            "errors": errors,
+        }
+    
+    def _create_invitation_record(
+        self,
+        db: Session,
+        assessment_id: int,
+        partner_email: str,
+        partner_org_name: str,
+        role: str,
+        deadline_days: int,
+        commit: bool = True
+    ) -> Invitation:
+        """Persist a pending invitation with a fresh secure token"""
         # Generate secure token
         token = secrets.token_urlsafe(32)
         
@@ -51,9 +164,15 @@ class InvitationService:
         )
         
         db.add(invitation)
-        db.commit()
-        db.refresh(invitation)
+        if commit:
+            db.commit()
+        else:
+            db.flush()
         
+        return invitation
+    
+    def _project_name(self, db: Session, assessment_id: int) -> str:
+        """Project name shown in invitation emails"""
         # Get assessment details for email
         assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
         
@@ -65,23 +184,22 @@ class InvitationService:
         if assessment.project:
             project_name = assessment.project.name
         
-        # Send invitation email
-        try:
-            self.email_service.send_partner_invitation(
-                to_email=partner_email,
-                partner_org_name=partner_org_name,
+        return project_name
+    
+    def _request_invitation_email(self, db: Session, invitation: Invitation, project_name: str) -> OutboxEvent:
+        """Record the invitation email in the outbox (written by the caller's commit)"""
+        return add_event(db, EMAIL_REQUESTED, {
+            "template": "partner_invitation",
+            "to_email": invitation.partner_email,
+            "context": self.email_service.partner_invitation_context(
+                partner_org_name=invitation.partner_org_name,
                 project_name=project_name,
-                assessment_id=assessment_id,
-                invitation_token=token,
+                invitation_token=invitation.token,
                 deadline=invitation.expires_at.strftime("%B %d, %Y")
-            )
-            logger.info(f"Invitation sent to {partner_email} for assessment {assessment_id}")
-        except Exception as e:
-            logger.error(f"Failed to send invitation email: {str(e)}")
-            # Don't fail the invitation creation if email fails
-            # Could implement retry logic here
-        
-        return invitation
+            ),
+            "invitation_id": invitation.id,
+            "assessment_id": invitation.assessment_id,
+        }, "invitation", invitation.id)
     
     def accept_invitation(self, db: Session, token: str) -> Invitation:
         """
@@ -112,7 +230,6 @@ class InvitationService:
         invitation.accepted_at = datetime.utcnow()
         
         db.commit()
-        db.refresh(invitation)
         
         logger.info(f"Invitation {invitation.id} accepted by {invitation.partner_email}")
         
@@ -141,12 +258,15 @@ class InvitationService:
         invitation.status = InvitationStatus.DECLINED
         
         db.commit()
-        db.refresh(invitation)
         
         logger.info(f"Invitation {invitation.id} declined by {invitation.partner_email}")
         
         return invitation
     
+    def get_invitation_deliveries(self, db: Session, invitation_id: int) -> dict:
+        """Delivery status of the invitation's emails"""
+        return self.notifications.get_invitation_deliveries(db, invitation_id)
+    
     def get_invitation_by_token(self, db: Session, token: str) -> Invitation:
         """Get invitation by token"""
         invitation = db.query(Invitation).filter(Invitation.token == token).first()
@@ -157,7 +277,18 @@ class InvitationService:
         return invitation
     
     def resend_invitation(self, db: Session, invitation_id: int) -> Invitation:
-        """Resend invitation email"""
+        """Queue the invitation email again"""
+        invitation = self._get_resendable_invitation(db, invitation_id)
+        
+        self._request_invitation_email(db, invitation, self._project_name(db, invitation.assessment_id))
+        db.commit()
+        
+        logger.info(f"Resent invitation {invitation_id} to {invitation.partner_email}")
+        
+        return invitation
+    
+    def _get_resendable_invitation(self, db: Session, invitation_id: int) -> Invitation:
+        """Get a pending invitation by ID"""
         invitation = db.query(Invitation).filter(Invitation.id == invitation_id).first()
         
         if not invitation:
@@ -166,22 +297,10 @@ class InvitationService:
         if invitation.status != InvitationStatus.PENDING:
             raise ValueError("Can only resend pending invitations")
         
-        # Get assessment details
-        assessment = invitation.assessment
-        project_name = f"Assessment #{assessment.id}"
-        if assessment.project:
-            project_name = assessment.project.name
-        
-        # Resend email
-        self.email_service.send_partner_invitation(
-            to_email=invitation.partner_email,
-            partner_org_name=invitation.partner_org_name,
-            project_name=project_name,
-            assessment_id=assessment.id,
-            invitation_token=invitation.token,
-            deadline=invitation.expires_at.strftime("%B %d, %Y")
-        )
-        
-        logger.info(f"Resent invitation {invitation_id} to {invitation.partner_email}")
-        
         return invitation
+
+class AsyncInvitationService(AsyncServiceAdapter):
+    """InvitationService for async routes; emails go through the outbox, never inline"""
+    
+    def __init__(self):
+        super().__init__(InvitationService())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Enum, Float, Text, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Enum, Float, Text, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -28,6 +28,9 @@ class EvidenceStatus(str, enum.Enum):
     VERIFIED = "VERIFIED"
     REJECTED = "REJECTED"
 
+# Statuses still moving through the workflow (partial index predicate)
+ACTIVE_ASSESSMENT_STATUSES = "status IN ('DRAFT', 'IN_PROGRESS', 'SUBMITTED', 'SCORING', 'ANALYST_REVIEW')"
+
 class Project(Base):
     """Project can contain multiple assessments for comparison"""
     __tablename__ = "projects"
@@ -45,6 +48,11 @@ class Project(Base):
     
     # Relationships
     assessments = relationship("Assessment", back_populates="project")
+    
+    __table_args__ = (
+        # Keyset pagination of list_projects
+        Index("ix_projects_org_created_id", "organization_id", "created_at", "id"),
+    )
 
 class Assessment(Base):
     __tablename__ = "assessments"
@@ -66,13 +74,24 @@ class Assessment(Base):
     respondents = relationship("Respondent", back_populates="assessment")
     invitations = relationship("Invitation", back_populates="assessment")
     scores = relationship("AssessmentScore", back_populates="assessment", uselist=False)
+    
+    __table_args__ = (
+        # Keyset pagination of list_assessments, by organization, by project and unfiltered
+        Index("ix_assessments_org_created_id", "organization_id", "created_at", "id"),
+        Index("ix_assessments_project_created_id", "project_id", "created_at", "id"),
+        Index("ix_assessments_created_id", "created_at", "id"),
+        # Status-filtered listings, and dashboards that only show in-flight work
+        Index("ix_assessments_org_status_created", "organization_id", "status", "created_at"),
+        Index("ix_assessments_org_active", "organization_id", "created_at", "id",
+              postgresql_where=text(ACTIVE_ASSESSMENT_STATUSES)),
+    )
 
 class Invitation(Base):
     """Partner invitation tracking with secure tokens"""
     __tablename__ = "invitations"
     
     id = Column(Integer, primary_key=True, index=True)
-    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False)
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False, index=True)
     partner_email = Column(String, nullable=False, index=True)
     partner_org_name = Column(String)
     role = Column(String, default="partner_admin")  # partner_admin, respondent
@@ -85,12 +104,17 @@ class Invitation(Base):
     
     # Relationships
     assessment = relationship("Assessment", back_populates="invitations")
+    
+    __table_args__ = (
+        Index("ix_invitations_assessment_pending", "assessment_id",
+              postgresql_where=text("status = 'PENDING'")),
+    )
 
 class Respondent(Base):
     __tablename__ = "respondents"
 
     id = Column(Integer, primary_key=True, index=True)
-    assessment_id = Column(Integer, ForeignKey("assessments.id"))
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), index=True)
     email = Column(String, index=True)
     name = Column(String)
     role = Column(String)  # e.g., "CTO", "Compliance Officer", "Finance Manager"
@@ -118,13 +142,18 @@ class Response(Base):
     # Relationships
     respondent = relationship("Respondent", back_populates="responses")
     evidence_files = relationship("Evidence", back_populates="response")
+    
+    __table_args__ = (
+        # One answer per question per respondent; also serves respondent_id lookups
+        UniqueConstraint("respondent_id", "question_id", name="uq_responses_respondent_question"),
+    )
 
 class Evidence(Base):
     """Evidence file tracking with S3 storage"""
     __tablename__ = "evidence"
     
     id = Column(Integer, primary_key=True, index=True)
-    response_id = Column(Integer, ForeignKey("responses.id"), nullable=False)
+    response_id = Column(Integer, ForeignKey("responses.id"), nullable=False, index=True)
     file_name = Column(String, nullable=False)
     file_type = Column(String)  # pdf, csv, json, xlsx, jpg, png
     file_size = Column(Integer)  # bytes
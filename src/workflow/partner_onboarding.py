@@ -0,0 +1,90 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from email_validator import validate_email, EmailNotValidError
+from src.workflow.models import Assessment, AssessmentStatus, Invitation, InvitationStatus, Project
+import secrets
+
+def _clean_partner(partner: dict, default_sector: str) -> dict:
+    """Validated values for one partner; raises ValueError with the reason"""
+    try:
+        email = validate_email(str(partner.get("partner_email") or "").strip(), check_deliverability=False).normalized
+    except EmailNotValidError as e:
+        raise ValueError(f"Invalid email: {e}")
+
+    org_name = str(partner.get("partner_org_name") or "").strip()
+    if not org_name:
+        raise ValueError("partner_org_name is required")
+
+    sector = str(partner.get("sector") or "").strip() or default_sector
+    if not sector:
+        raise ValueError("sector is required (per partner, for the batch, or on the project)")
+
+    return {"partner_email": email, "partner_org_name": org_name, "sector": sector}
+
+def validate_partner_rows(db: Session, project: Project, partners: list[dict], sector: str = None) -> tuple[list[dict], list[dict]]:
+    """
+    Split onboarding rows into valid partners and a per-row error report
+
+    Emails already invited to an assessment in the project, or repeated within
+    the batch, are rejected. Row numbers are 1-based positions in the batch.
+    """
+    invited = {
+        email.casefold()
+        for (email,) in db.query(Invitation.partner_email).join(Assessment).filter(Assessment.project_id == project.id)
+    }
+    default_sector = sector or project.sector
+
+    valid, errors = [], []
+    for number, partner in enumerate(partners, start=1):
+        try:
+            values = _clean_partner(partner, default_sector)
+            key = values["partner_email"].casefold()
+            if key in invited:
+                raise ValueError("Partner already invited to this project")
+        except ValueError as e:
+            errors.append({"row": number, "partner_email": partner.get("partner_email"), "error": str(e)})
+            continue
+        invited.add(key)
+        valid.append({"row": number, **values})
+    return valid, errors
+
+def insert_partner_assessments(db: Session, project: Project, partners: list[dict], deadline) -> list[int]:
+    """
+    Bulk-insert one DRAFT assessment per partner; does not commit
+
+    Returns the new IDs in partner order (multi-row INSERT ... RETURNING).
+    """
+    if not partners:
+        return []
+    rows = [{
+        "project_id": project.id,
+        "organization_id": project.organization_id,
+        "partner_org_name": partner["partner_org_name"],
+        "sector": partner["sector"],
+        "status": AssessmentStatus.DRAFT,
+        "deadline": deadline,
+    } for partner in partners]
+    result = db.execute(insert(Assessment).returning(Assessment.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars())
+
+def insert_partner_invitations(db: Session, partners: list[dict], assessment_ids: list[int], role: str, expires_at) -> list[dict]:
+    """
+    Bulk-insert a PENDING invitation with a fresh token per partner; does not commit
+
+    Returns the inserted rows with their IDs, in partner order.
+    """
+    if not partners:
+        return []
+    rows = [{
+        "assessment_id": assessment_id,
+        "partner_email": partner["partner_email"],
+        "partner_org_name": partner["partner_org_name"],
+        "role": role,
+        "token": secrets.token_urlsafe(32),
+        "status": InvitationStatus.PENDING,
+        "expires_at": expires_at,
+    } for partner, assessment_id in zip(partners, assessment_ids)]
+    result = db.execute(insert(Invitation).returning(Invitation.id, sort_by_parameter_order=True), rows)
+    for row, invitation_id in zip(rows, result.scalars()):
+        row["id"] = invitation_id
+    return rows
@@ -0,0 +1,136 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from email_validator import validate_email, EmailNotValidError
+from src.core.config import settings
+from src.workflow.models import Respondent
+import codecs
+import csv
+import json
+
+SENIORITY_LEVELS = {"junior", "mid", "senior", "executive"}
+ROLE_MAX_LENGTH = 100
+
+def parse_respondent_rows(body: bytes, content_type: str) -> list[dict]:
+    """
+    Rows of a respondent import: a CSV with a header row, or a JSON array of objects
+
+    CSV columns are email, role and optionally name, seniority and
+    assigned_questions (question IDs separated by ";"). Raises ValueError for
+    an unreadable or oversized upload.
+    """
+    if "json" in (content_type or ""):
+        try:
+            rows = json.loads(body)
+        except ValueError:
+            raise ValueError("Invalid JSON: expected an array of respondent objects")
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Invalid JSON: expected an array of respondent objects")
+    else:
+        # Decode lazily so the csv reader walks the upload line by line
+        lines = codecs.iterdecode(body.splitlines(keepends=True), "utf-8-sig")
+        reader = csv.DictReader(lines)
+        try:
+            if not reader.fieldnames or not {"email", "role"} <= set(reader.fieldnames):
+                raise ValueError("Invalid CSV: header row must include email and role")
+            rows = []
+            for row in reader:
+                questions = row.get("assigned_questions")
+                if questions:
+                    row["assigned_questions"] = [q.strip() for q in questions.split(";") if q.strip()]
+                rows.append(row)
+                if len(rows) > settings.RESPONDENT_IMPORT_MAX_ROWS:
+                    break
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ValueError(f"Invalid CSV: {e}")
+
+    if len(rows) > settings.RESPONDENT_IMPORT_MAX_ROWS:
+        raise ValueError(f"Import is limited to {settings.RESPONDENT_IMPORT_MAX_ROWS} rows")
+    return rows
+
+def _clean_row(row: dict) -> dict:
+    """Validated Respondent column values for one row; raises ValueError with the reason"""
+    try:
+        email = validate_email(str(row.get("email") or "").strip(), check_deliverability=False).normalized
+    except EmailNotValidError as e:
+        raise ValueError(f"Invalid email: {e}")
+
+    role = str(row.get("role") or "").strip()
+    if not role:
+        raise ValueError("role is required")
+    if len(role) > ROLE_MAX_LENGTH:
+        raise ValueError(f"role is longer than {ROLE_MAX_LENGTH} characters")
+    allowed_roles = [r.strip() for r in settings.RESPONDENT_ROLES.split(",") if r.strip()]
+    if allowed_roles and role not in allowed_roles:
+        raise ValueError(f"Unknown role {role}")
+
+    seniority = str(row.get("seniority") or "").strip().lower() or None
+    if seniority and seniority not in SENIORITY_LEVELS:
+        raise ValueError(f"Unknown seniority {seniority}")
+
+    assigned_questions = row.get("assigned_questions") or []
+    if not isinstance(assigned_questions, list):
+        raise ValueError("assigned_questions must be a list of question IDs")
+
+    return {
+        "email": email,
+        "name": str(row.get("name") or "").strip() or None,
+        "role": role,
+        "seniority": seniority,
+        "assigned_questions": assigned_questions,
+    }
+
+def clean_respondent_rows(rows: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Validate import rows without the database (CPU only, safe for a worker thread)
+
+    Returns the cleaned rows, each with its 1-based "row" number, and the
+    error report for the rows that failed.
+    """
+    cleaned, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            values = _clean_row(row)
+        except ValueError as e:
+            errors.append({"row": number, "email": row.get("email"), "error": str(e)})
+            continue
+        cleaned.append({"row": number, **values})
+    return cleaned, errors
+
+def dedupe_respondent_rows(db: Session, assessment_id: int, cleaned: list[dict], errors: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Drop cleaned rows whose email is already on the assessment or repeated in the upload
+
+    Returns insertable Respondent rows and the full error report in row order.
+    """
+    existing = {
+        email.casefold()
+        for (email,) in db.query(Respondent.email).filter(Respondent.assessment_id == assessment_id)
+        if email
+    }
+
+    valid, errors = [], list(errors)
+    for values in cleaned:
+        values = dict(values)
+        number = values.pop("row")
+        key = values["email"].casefold()
+        if key in existing:
+            errors.append({"row": number, "email": values["email"], "error": "Duplicate email for this assessment"})
+            continue
+        existing.add(key)
+        valid.append({"assessment_id": assessment_id, **values})
+    errors.sort(key=lambda error: error["row"])
+    return valid, errors
+
+def prepare_respondent_import(body: bytes, content_type: str) -> tuple[list[dict], list[dict]]:
+    """Parse and clean an upload: everything before the database, for run_in_threadpool"""
+    return clean_respondent_rows(parse_respondent_rows(body, content_type))
+
+def insert_respondents(db: Session, rows: list[dict]) -> int:
+    """
+    Bulk-insert validated respondent rows; does not commit
+
+    A single executemany, which SQLAlchemy batches into multi-row INSERTs.
+    """
+    if rows:
+        db.execute(insert(Respondent), rows)
+    return len(rows)
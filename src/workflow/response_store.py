@@ -0,0 +1,140 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.workflow.models import Respondent, Response, Evidence
+import os
+
+# Columns an autosave may overwrite on an existing answer
+DEFAULT_UPDATE_COLUMNS = ("answer_value", "additional_context")
+
+def upsert_responses(
+    db: Session,
+    rows: list[dict],
+    update_columns: tuple = DEFAULT_UPDATE_COLUMNS
+) -> list[Response]:
+    """
+    Insert or update answers in one statement
+
+    INSERT ... ON CONFLICT (respondent_id, question_id) DO UPDATE ... RETURNING,
+    so a save is a single round trip and concurrent saves of the same question
+    can't create duplicate rows. Does not commit.
+
+    Args:
+        db: Database session
+        rows: dicts with respondent_id, question_id and the update_columns
+        update_columns: Columns taken from the new row when the answer exists
+
+    Returns:
+        The saved Response rows, in no particular order
+    """
+    stmt = insert(Response).values(rows)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    set_["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_responses_respondent_question",
+        set_=set_
+    ).returning(Response)
+
+    return db.scalars(stmt, execution_options={"populate_existing": True}).all()
+
+def upsert_response(
+    db: Session,
+    respondent_id: int,
+    question_id: str,
+    answer_value: dict,
+    additional_context: str = None,
+    update_columns: tuple = DEFAULT_UPDATE_COLUMNS
+) -> Response:
+    """Single-answer upsert_responses"""
+    row = {
+        "respondent_id": respondent_id,
+        "question_id": question_id,
+        "answer_value": answer_value,
+        "additional_context": additional_context,
+    }
+    return upsert_responses(db, [row], update_columns)[0]
+
+def save_response_batch(
+    db: Session,
+    respondent_id: int,
+    items: list[dict],
+    update_columns: tuple = DEFAULT_UPDATE_COLUMNS
+) -> dict:
+    """
+    Validate and upsert many answers for one respondent in one statement
+
+    Items are dicts with question_id, answer_value and optionally
+    additional_context. Invalid items are reported and skipped rather than
+    failing the batch; when a question appears more than once the last item
+    wins. Does not commit.
+
+    Returns:
+        dict with respondent_id, saved, failed and per-item results in input order
+    """
+    respondent = db.query(Respondent).filter(Respondent.id == respondent_id).first()
+    if not respondent:
+        raise ValueError(f"Respondent {respondent_id} not found")
+
+    assigned = set(respondent.assigned_questions or [])
+    last_index = {item["question_id"]: index for index, item in enumerate(items)}
+    results = []
+    rows = {}
+    for index, item in enumerate(items):
+        question_id = item["question_id"]
+        result = {"index": index, "question_id": question_id, "status": "error", "response_id": None, "error": None}
+        if not question_id or not question_id.strip():
+            result["error"] = "question_id is required"
+        elif assigned and question_id not in assigned:
+            result["error"] = f"Question {question_id} is not assigned to this respondent"
+        elif last_index[question_id] != index:
+            result["error"] = "Superseded by a later item for the same question"
+        else:
+            # ON CONFLICT can't touch the same row twice, so one row per question
+            rows[question_id] = {
+                "respondent_id": respondent_id,
+                "question_id": question_id,
+                "answer_value": item["answer_value"],
+                "additional_context": item.get("additional_context"),
+            }
+        results.append(result)
+
+    saved = {}
+    if rows:
+        saved = {
+            response.question_id: response
+            for response in upsert_responses(db, list(rows.values()), update_columns)
+        }
+    for result in results:
+        if result["error"] is None:
+            result["status"] = "saved"
+            result["response_id"] = saved[result["question_id"]].id
+
+    return {
+        "respondent_id": respondent_id,
+        "saved": len(saved),
+        "failed": len(results) - len(saved),
+        "results": results,
+    }
+
+def attach_evidence_keys(db: Session, keys_by_response: dict[int, list[str]], uploaded_by: str = None) -> int:
+    """
+    Record already-uploaded S3 objects as evidence, skipping keys already recorded
+
+    Returns:
+        Number of evidence rows added
+    """
+    rows = [
+        {
+            "response_id": response_id,
+            # Portal upload keys are evidence/{respondent_id}/{uuid}_{filename}
+            "file_name": os.path.basename(key).split("_", 1)[-1],
+            "s3_key": key,
+            "uploaded_by": uploaded_by,
+        }
+        for response_id, keys in keys_by_response.items()
+        for key in keys
+    ]
+    if not rows:
+        return 0
+    result = db.execute(insert(Evidence).values(rows).on_conflict_do_nothing(index_elements=["s3_key"]))
+    return result.rowcount
@@ -1,21 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel, EmailStr
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, EmailStr, Field
 from typing import List, Optional
 from datetime import datetime
-from src.core.database import get_db
-from src.workflow.service import WorkflowService
-from src.workflow.invitation_service import InvitationService
-from src.workflow.submission_service import SubmissionService
-from src.core.s3_service import S3Service
+from src.core.config import settings
+from src.core.database import DbSession, get_read_session, get_session
+from src.workflow.service import AsyncWorkflowService
+from src.workflow.invitation_service import AsyncInvitationService
+from src.workflow.submission_service import AsyncSubmissionService
 from src.core.s3_service import S3Service
 from src.workflow.models import AssessmentStatus
 from src.core.security import get_current_user, TokenData
 
 router = APIRouter()
-workflow_service = WorkflowService()
-invitation_service = InvitationService()
-submission_service = SubmissionService()
+workflow_service = AsyncWorkflowService()
+invitation_service = AsyncInvitationService()
+submission_service = AsyncSubmissionService()
 s3_service = S3Service()
 
 # ===== PYDANTIC MODELS =====
@@ -48,6 +48,15 @@ class ResponseCreate(BaseModel):
     answer_value: dict
     additional_context: Optional[str] = None
 
+class ResponseItem(BaseModel):
+    question_id: str
+    answer_value: dict
+    additional_context: Optional[str] = None
+
+class ResponseBatchCreate(BaseModel):
+    respondent_id: int
+    items: List[ResponseItem] = Field(..., min_length=1, max_length=settings.RESPONSE_BATCH_MAX)
+
 class InvitationCreate(BaseModel):
     assessment_id: int
     partner_email: EmailStr
@@ -55,6 +64,18 @@ class InvitationCreate(BaseModel):
     role: str = "partner_admin"
     deadline_days: int = 14
 
+class PartnerInvite(BaseModel):
+    # Checked per partner so one bad row is reported, not a 422 for the batch
+    partner_email: Optional[str] = None
+    partner_org_name: Optional[str] = None
+    sector: Optional[str] = None
+
+class PartnerOnboarding(BaseModel):
+    partners: List[PartnerInvite] = Field(..., min_length=1, max_length=settings.PARTNER_ONBOARDING_MAX_ROWS)
+    sector: Optional[str] = None
+    role: str = "partner_admin"
+    deadline_days: int = 14
+
 class EvidenceUploadRequest(BaseModel):
     assessment_id: int
     evidence_type: str
@@ -73,10 +94,10 @@ class EvidenceCreate(BaseModel):
 # ===== PROJECT ENDPOINTS =====
 
 @router.post("/projects", status_code=status.HTTP_201_CREATED)
-def create_project(project: ProjectCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(get_current_user)):
+async def create_project(project: ProjectCreate, db: DbSession = Depends(get_session), current_user: TokenData = Depends(get_current_user)):
     """Create a new project"""
     try:
-        return workflow_service.create_project(
+        return await workflow_service.create_project(
             db=db,
             name=project.name,
             organization_id=project.organization_id,
@@ -89,25 +110,35 @@ def create_project(project: ProjectCreate, db: Session = Depends(get_db), curren
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/projects/{project_id}")
-def get_project(project_id: int, db: Session = Depends(get_db), current_user: TokenData = Depends(get_current_user)):
+async def get_project(project_id: int, db: DbSession = Depends(get_read_session), current_user: TokenData = Depends(get_current_user)):
     """Get project by ID"""
     try:
-        return workflow_service.get_project(db, project_id)
+        return await workflow_service.get_project(db, project_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.get("/projects")
-def list_projects(organization_id: str, db: Session = Depends(get_db), current_user: TokenData = Depends(get_current_user)):
-    """List all projects for an organization"""
-    return workflow_service.list_projects(db, organization_id)
+async def list_projects(
+    organization_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: DbSession = Depends(get_read_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """List projects for an organization (keyset paginated, pass next_cursor back as cursor)"""
+    try:
+        return await workflow_service.list_projects(db, organization_id, limit, cursor, include_total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # ===== ASSESSMENT ENDPOINTS =====
 
 @router.post("/assessments", status_code=status.HTTP_201_CREATED)
-def create_assessment(assessment: AssessmentCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(get_current_user)):
+async def create_assessment(assessment: AssessmentCreate, db: DbSession = Depends(get_session), current_user: TokenData = Depends(get_current_user)):
     """Create a new assessment"""
     try:
-        return workflow_service.create_assessment(
+        return await workflow_service.create_assessment(
             db=db,
             organization_id=assessment.organization_id,
             sector=assessment.sector,
@@ -119,7 +150,7 @@ def create_assessment(assessment: AssessmentCreate, db: Session = Depends(get_db
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/assessments/{assessment_id}")
-def get_assessment(assessment_id: int, db: Session = Depends(get_db)):
+async def get_assessment(assessment_id: int, db: DbSession = Depends(get_read_session)):
     # Note: This is used by both User Dashboard (Auth) and Partner Dashboard (Public/Token)
     # For MVP, leaving public or we need dual auth support. 
     # To keep it simple for Partner Dashboard which doesn't have JWT, we'll leave it open or check for token in query param if we wanted to be strict.
@@ -128,33 +159,57 @@ def get_assessment(assessment_id: int, db: Session = Depends(get_db)):
     pass
     """Get assessment by ID with all details"""
     try:
-        return workflow_service.get_assessment(db, assessment_id)
+        return await workflow_service.get_assessment(db, assessment_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.get("/assessments")
-def list_assessments(
+async def list_assessments(
     organization_id: Optional[str] = None,
     project_id: Optional[int] = None,
     status: Optional[AssessmentStatus] = None,
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: DbSession = Depends(get_read_session),
     current_user: TokenData = Depends(get_current_user)
 ):
-    """List assessments with optional filters"""
-    return workflow_service.list_assessments(
-        db=db,
-        organization_id=organization_id,
-        project_id=project_id,
-        status=status
-    )
+    """List assessments with optional filters (keyset paginated, pass next_cursor back as cursor)"""
+    try:
+        return await workflow_service.list_assessments(
+            db=db,
+            organization_id=organization_id,
+            project_id=project_id,
+            status=status,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # ===== INVITATION ENDPOINTS =====
 
+@router.post("/projects/{project_id}/partners", status_code=status.HTTP_201_CREATED)
+async def onboard_partners(project_id: int, onboarding: PartnerOnboarding, db: DbSession = Depends(get_session), current_user: TokenData = Depends(get_current_user)):
+    """Create an assessment and invitation for each partner in one batch and queue the emails"""
+    try:
+        return await invitation_service.onboard_partners(
+            db=db,
+            project_id=project_id,
+            partners=[partner.model_dump() for partner in onboarding.partners],
+            sector=onboarding.sector,
+            role=onboarding.role,
+            deadline_days=onboarding.deadline_days
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.post("/invitations", status_code=status.HTTP_201_CREATED)
-def create_invitation(invitation: InvitationCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(get_current_user)):
-    """Create and send partner invitation"""
+async def create_invitation(invitation: InvitationCreate, db: DbSession = Depends(get_session), current_user: TokenData = Depends(get_current_user)):
+    """Create partner invitation; its email is queued (see /invitations/{id}/deliveries)"""
     try:
-        return invitation_service.create_invitation(
+        return await invitation_service.create_invitation(
             db=db,
             assessment_id=invitation.assessment_id,
             partner_email=invitation.partner_email,
@@ -166,36 +221,44 @@ def create_invitation(invitation: InvitationCreate, db: Session = Depends(get_db
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/invitations/{token}/accept")
-def accept_invitation(token: str, db: Session = Depends(get_db)):
+async def accept_invitation(token: str, db: DbSession = Depends(get_session)):
     """Accept partner invitation"""
     try:
-        return invitation_service.accept_invitation(db, token)
+        return await invitation_service.accept_invitation(db, token)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/invitations/{token}/decline")
-def decline_invitation(token: str, reason: Optional[str] = None, db: Session = Depends(get_db)):
+async def decline_invitation(token: str, reason: Optional[str] = None, db: DbSession = Depends(get_session)):
     """Decline partner invitation"""
     try:
-        return invitation_service.decline_invitation(db, token, reason)
+        return await invitation_service.decline_invitation(db, token, reason)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/invitations/{token}")
-def get_invitation(token: str, db: Session = Depends(get_db)):
+async def get_invitation(token: str, db: DbSession = Depends(get_read_session)):
     """Get invitation details by token"""
     try:
-        return invitation_service.get_invitation_by_token(db, token)
+        return await invitation_service.get_invitation_by_token(db, token)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/invitations/{invitation_id}/deliveries")
+async def get_invitation_deliveries(invitation_id: int, db: DbSession = Depends(get_session), current_user: TokenData = Depends(get_current_user)):
+    """Delivery status of the invitation's emails: queued, sending, sent, retrying or dead-lettered"""
+    try:
+        return await invitation_service.get_invitation_deliveries(db, invitation_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 # ===== RESPONDENT ENDPOINTS =====
 
 @router.post("/respondents", status_code=status.HTTP_201_CREATED)
-def add_respondent(respondent: RespondentCreate, assessment_id: int, db: Session = Depends(get_db)):
+async def add_respondent(respondent: RespondentCreate, assessment_id: int, db: DbSession = Depends(get_session)):
     """Add a respondent to an assessment"""
     try:
-        return workflow_service.add_respondent(
+        return await workflow_service.add_respondent(
             db=db,
             assessment_id=assessment_id,
             email=respondent.email,
@@ -207,21 +270,35 @@ def add_respondent(respondent: RespondentCreate, assessment_id: int, db: Session
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/respondents/import", status_code=status.HTTP_201_CREATED)
+async def import_respondents(assessment_id: int, request: Request, db: DbSession = Depends(get_session)):
+    """Bulk-add respondents from a CSV (text/csv) or JSON array (application/json) body"""
+    body = await request.body()
+    try:
+        return await workflow_service.import_respondents(
+            db=db,
+            assessment_id=assessment_id,
+            body=body,
+            content_type=request.headers.get("content-type", "text/csv")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/respondents/{respondent_id}")
-def get_respondent(respondent_id: int, db: Session = Depends(get_db)):
+async def get_respondent(respondent_id: int, db: DbSession = Depends(get_read_session)):
     """Get respondent by ID"""
     try:
-        return workflow_service.get_respondent(db, respondent_id)
+        return await workflow_service.get_respondent(db, respondent_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 # ===== RESPONSE ENDPOINTS =====
 
 @router.post("/responses", status_code=status.HTTP_201_CREATED)
-def create_response(response: ResponseCreate, db: Session = Depends(get_db)):
+async def create_response(response: ResponseCreate, db: DbSession = Depends(get_session)):
     """Create or update a response"""
     try:
-        return workflow_service.create_response(
+        return await workflow_service.create_response(
             db=db,
             respondent_id=response.respondent_id,
             question_id=response.question_id,
@@ -231,21 +308,35 @@ def create_response(response: ResponseCreate, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/responses/batch")
+async def create_responses_batch(batch: ResponseBatchCreate, db: DbSession = Depends(get_session)):
+    """Create or update many responses for one respondent in a single upsert"""
+    try:
+        return await workflow_service.save_responses(
+            db=db,
+            respondent_id=batch.respondent_id,
+            items=[item.model_dump() for item in batch.items]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.post("/responses/{response_id}/submit")
-def submit_response(response_id: int, db: Session = Depends(get_db)):
+async def submit_response(response_id: int, db: DbSession = Depends(get_session)):
     """Mark response as submitted"""
     try:
-        return workflow_service.submit_response(db, response_id)
+        return await workflow_service.submit_response(db, response_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 # ===== EVIDENCE ENDPOINTS =====
 
 @router.post("/evidence/upload-url")
-def get_evidence_upload_url(request: EvidenceUploadRequest):
+async def get_evidence_upload_url(request: EvidenceUploadRequest):
     """Generate presigned URL for evidence upload"""
     try:
-        return s3_service.generate_presigned_upload_url(
+        # Signing can fetch credentials over the network, so keep it off the event loop
+        return await run_in_threadpool(
+            s3_service.generate_presigned_upload_url,
             assessment_id=request.assessment_id,
             evidence_type=request.evidence_type,
             file_name=request.file_name,
@@ -255,10 +346,10 @@ def get_evidence_upload_url(request: EvidenceUploadRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/evidence", status_code=status.HTTP_201_CREATED)
-def create_evidence(evidence: EvidenceCreate, db: Session = Depends(get_db)):
+async def create_evidence(evidence: EvidenceCreate, db: DbSession = Depends(get_session)):
     """Create evidence record after file upload"""
     try:
-        return workflow_service.create_evidence_record(
+        return await workflow_service.create_evidence_record(
             db=db,
             response_id=evidence.response_id,
             file_name=evidence.file_name,
@@ -272,12 +363,12 @@ def create_evidence(evidence: EvidenceCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/evidence/{evidence_id}")
-def get_evidence(evidence_id: int, db: Session = Depends(get_db)):
+async def get_evidence(evidence_id: int, db: DbSession = Depends(get_read_session)):
     """Get evidence by ID"""
     try:
-        evidence = workflow_service.get_evidence(db, evidence_id)
+        evidence = await workflow_service.get_evidence(db, evidence_id)
         # Generate download URL
-        download_url = s3_service.generate_presigned_download_url(evidence.s3_key)
+        download_url = await run_in_threadpool(s3_service.generate_presigned_download_url, evidence.s3_key)
         return {
             **evidence.__dict__,
             "download_url": download_url
@@ -288,19 +379,19 @@ def get_evidence(evidence_id: int, db: Session = Depends(get_db)):
 # ===== SUBMISSION ENDPOINTS =====
 
 @router.post("/assessments/{assessment_id}/submit")
-def submit_assessment(assessment_id: int, db: Session = Depends(get_db)):
+async def submit_assessment(assessment_id: int, db: DbSession = Depends(get_session)):
     """Submit assessment for AI scoring"""
     try:
-        return submission_service.submit_assessment(db, assessment_id)
+        return await submission_service.submit_assessment(db, assessment_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/assessments/{assessment_id}/scores")
-def get_assessment_scores(assessment_id: int, db: Session = Depends(get_db)):
+async def get_assessment_scores(assessment_id: int, db: DbSession = Depends(get_read_session)):
     """Get AI-generated scores for an assessment"""
     try:
-        return submission_service.get_assessment_scores(db, assessment_id)
+        return await submission_service.get_assessment_scores(db, assessment_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
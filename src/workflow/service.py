@@ -1,3 +1,4 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from src.workflow.models import (
     Assessment, AssessmentStatus, Respondent, Response, Evidence,
@@ -6,6 +7,11 @@ from src.workflow.models import (
 from src.workflow.invitation_service import InvitationService
 from src.workflow.submission_service import SubmissionService
 from src.core.s3_service import S3Service
+from starlette.concurrency import run_in_threadpool
+from src.core.database import AsyncServiceAdapter, DbSession, run_in_session
+from src.core.pagination import paginate
+from src.workflow.response_store import upsert_response, save_response_batch
+from src.workflow.respondent_import import prepare_respondent_import, dedupe_respondent_rows, insert_respondents
 from datetime import datetime
 import logging
 
@@ -42,7 +48,6 @@ class WorkflowService:
         )
         db.add(project)
         db.commit()
-        db.refresh(project)
         
         logger.info(f"Created project {project.id}: {name}")
         return project
@@ -54,11 +59,17 @@ class WorkflowService:
             raise ValueError(f"Project {project_id} not found")
         return project
     
-    def list_projects(self, db: Session, organization_id: str) -> list[Project]:
-        """List all projects for an organization"""
-        return db.query(Project).filter(
-            Project.organization_id == organization_id
-        ).order_by(Project.created_at.desc()).all()
+    def list_projects(
+        self,
+        db: Session,
+        organization_id: str,
+        limit: int = None,
+        cursor: str = None,
+        include_total: bool = False
+    ) -> dict:
+        """List projects for an organization, newest first, one keyset page at a time"""
+        query = db.query(Project).filter(Project.organization_id == organization_id)
+        return paginate(query, Project, limit, cursor, include_total)
     
     # ===== ASSESSMENT MANAGEMENT =====
     
@@ -82,7 +93,6 @@ class WorkflowService:
         )
         db.add(assessment)
         db.commit()
-        db.refresh(assessment)
         
         logger.info(f"Created assessment {assessment.id}")
         return assessment
@@ -103,9 +113,12 @@ class WorkflowService:
         db: Session,
         organization_id: str = None,
         project_id: int = None,
-        status: AssessmentStatus = None
-    ) -> list[Assessment]:
-        """List assessments with optional filters"""
+        status: AssessmentStatus = None,
+        limit: int = None,
+        cursor: str = None,
+        include_total: bool = False
+    ) -> dict:
+        """List assessments with optional filters, newest first, one keyset page at a time"""
         query = db.query(Assessment)
         
         if organization_id:
@@ -115,7 +128,7 @@ class WorkflowService:
         if status:
             query = query.filter(Assessment.status == status)
         
-        return query.order_by(Assessment.created_at.desc()).all()
+        return paginate(query, Assessment, limit, cursor, include_total)
     
     def update_assessment_status(
         self,
@@ -124,10 +137,13 @@ class WorkflowService:
         status: AssessmentStatus
     ) -> Assessment:
         """Update assessment status"""
-        assessment = self.get_assessment(db, assessment_id)
-        assessment.status = status
+        assessment = db.scalars(
+            update(Assessment).where(Assessment.id == assessment_id).values(status=status).returning(Assessment),
+            execution_options={"populate_existing": True}
+        ).first()
+        if not assessment:
+            raise ValueError(f"Assessment {assessment_id} not found")
         db.commit()
-        db.refresh(assessment)
         
         logger.info(f"Updated assessment {assessment_id} status to {status.value}")
         return assessment
@@ -155,11 +171,30 @@ class WorkflowService:
         )
         db.add(respondent)
         db.commit()
-        db.refresh(respondent)
         
         logger.info(f"Added respondent {email} to assessment {assessment_id}")
         return respondent
     
+    def import_respondents(self, db: Session, assessment_id: int, body: bytes, content_type: str) -> dict:
+        """
+        Bulk-add respondents from a CSV or JSON upload
+        
+        Valid rows are inserted in one transaction; invalid ones are returned
+        in the error report instead of failing the import.
+        """
+        cleaned, errors = prepare_respondent_import(body, content_type)
+        return self.import_respondent_rows(db, assessment_id, cleaned, errors)
+    
+    def import_respondent_rows(self, db: Session, assessment_id: int, cleaned: list[dict], errors: list[dict]) -> dict:
+        """Insert rows from prepare_respondent_import that aren't duplicates"""
+        self.get_assessment(db, assessment_id)
+        valid, errors = dedupe_respondent_rows(db, assessment_id, cleaned, errors)
+        imported = insert_respondents(db, valid)
+        db.commit()
+        
+        logger.info(f"Imported {imported} respondents to assessment {assessment_id} ({len(errors)} rejected)")
+        return {"assessment_id": assessment_id, "imported": imported, "failed": len(errors), "errors": errors}
+    
     def get_respondent(self, db: Session, respondent_id: int) -> Respondent:
         """Get respondent by ID"""
         respondent = db.query(Respondent).filter(Respondent.id == respondent_id).first()
@@ -178,44 +213,29 @@ class WorkflowService:
         additional_context: str = None
     ) -> Response:
         """Create or update a response"""
-        # Check if response already exists
-        existing_response = db.query(Response).filter(
-            Response.respondent_id == respondent_id,
-            Response.question_id == question_id
-        ).first()
-        
-        if existing_response:
-            # Update existing response
-            existing_response.answer_value = answer_value
-            existing_response.additional_context = additional_context
-            existing_response.updated_at = datetime.utcnow()
-            db.commit()
-            db.refresh(existing_response)
-            return existing_response
-        else:
-            # Create new response
-            response = Response(
-                respondent_id=respondent_id,
-                question_id=question_id,
-                answer_value=answer_value,
-                additional_context=additional_context
-            )
-            db.add(response)
-            db.commit()
-            db.refresh(response)
-            
-            logger.info(f"Created response for question {question_id}")
-            return response
+        response = upsert_response(db, respondent_id, question_id, answer_value, additional_context)
+        db.commit()
+
+        logger.info(f"Saved response for question {question_id}")
+        return response
+    
+    def save_responses(self, db: Session, respondent_id: int, items: list[dict]) -> dict:
+        """Create or update many responses for one respondent in one transaction"""
+        batch = save_response_batch(db, respondent_id, items)
+        db.commit()
+
+        logger.info(f"Saved {batch['saved']} responses for respondent {respondent_id} ({batch['failed']} failed)")
+        return batch
     
     def submit_response(self, db: Session, response_id: int) -> Response:
         """Mark response as submitted"""
-        response = db.query(Response).filter(Response.id == response_id).first()
+        response = db.scalars(
+            update(Response).where(Response.id == response_id).values(submitted_at=datetime.utcnow()).returning(Response),
+            execution_options={"populate_existing": True}
+        ).first()
         if not response:
             raise ValueError(f"Response {response_id} not found")
-        
-        response.submitted_at = datetime.utcnow()
         db.commit()
-        db.refresh(response)
         
         return response
     
@@ -244,7 +264,6 @@ class WorkflowService:
         )
         db.add(evidence)
         db.commit()
-        db.refresh(evidence)
         
         logger.info(f"Created evidence record for {file_name}")
         return evidence
@@ -255,3 +274,14 @@ class WorkflowService:
         if not evidence:
             raise ValueError(f"Evidence {evidence_id} not found")
         return evidence
+
+class AsyncWorkflowService(AsyncServiceAdapter):
+    """WorkflowService for async routes"""
+    
+    def __init__(self):
+        super().__init__(WorkflowService())
+    
+    async def import_respondents(self, db: DbSession, assessment_id: int, body: bytes, content_type: str) -> dict:
+        """Parse and validate the upload in the threadpool; only the inserts go through the session"""
+        cleaned, errors = await run_in_threadpool(prepare_respondent_import, body, content_type)
+        return await run_in_session(db, self.sync.import_respondent_rows, assessment_id, cleaned, errors)
@@ -1,8 +1,9 @@
 import requests
-from sqlalchemy.orm import Session
-from src.workflow.models import Assessment, AssessmentStatus, AssessmentScore, Response, Evidence
+from sqlalchemy.orm import Session, selectinload
+from src.workflow.models import Assessment, AssessmentStatus, AssessmentScore, Invitation, Respondent, Response, Evidence
 from src.core.config import settings
-from src.core.email_service import EmailService
+from src.outbox.service import EMAIL_REQUESTED, SCORING_REQUESTED, add_event, add_webhook_event
+from src.core.database import AsyncServiceAdapter
 from datetime import datetime
 import logging
 
@@ -13,7 +14,6 @@ class SubmissionService:
     
     def __init__(self):
         self.intelligence_engine_url = settings.INTELLIGENCE_ENGINE_URL
-        self.email_service = EmailService()
     
     def submit_assessment(self, db: Session, assessment_id: int) -> Assessment:
         """
@@ -26,6 +26,27 @@ class SubmissionService:
         Returns:
             Updated Assessment object
         """
+        assessment = self._mark_submitted(db, assessment_id)
+        
+        # Scoring, the confirmation email and the webhook commit with the status
+        # change and run from the outbox, so none is lost or sent twice
+        add_event(db, SCORING_REQUESTED, {"assessment_id": assessment_id}, "assessment", assessment_id)
+        to_email = self._confirmation_recipient(db, assessment)
+        if to_email:
+            self._request_confirmation(db, to_email, assessment.partner_org_name, assessment_id)
+        add_webhook_event(db, "assessment.submitted", {
+            "assessment_id": assessment_id,
+            "organization_id": assessment.organization_id,
+            "submitted_at": assessment.submitted_at.isoformat(),
+        }, "assessment", assessment_id)
+        db.commit()
+        
+        logger.info(f"Assessment {assessment_id} submitted for scoring")
+        
+        return assessment
+    
+    def _mark_submitted(self, db: Session, assessment_id: int) -> Assessment:
+        """Validate and move assessment to SUBMITTED (committed by the caller)"""
         assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
         
         if not assessment:
@@ -37,35 +58,30 @@ class SubmissionService:
         # Update status
         assessment.status = AssessmentStatus.SUBMITTED
         assessment.submitted_at = datetime.utcnow()
-        db.commit()
-        
-        logger.info(f"Assessment {assessment_id} submitted for scoring")
-        
-        # Trigger scoring (in production, this would be async via Celery)
-        try:
-            self._trigger_scoring(db, assessment_id)
-        except Exception as e:
-            logger.error(f"Scoring failed for assessment {assessment_id}: {str(e)}")
-            # Don't revert submission status - analyst can manually trigger
-        
-        # Send confirmation email
-        try:
-            if assessment.partner_org_name:
-                # Get partner email from invitations
-                invitation = assessment.invitations[0] if assessment.invitations else None
-                if invitation:
-                    self.email_service.send_assessment_submitted_notification(
-                        to_email=invitation.partner_email,
-                        partner_org_name=assessment.partner_org_name,
-                        assessment_id=assessment_id
-                    )
-        except Exception as e:
-            logger.error(f"Failed to send submission confirmation: {str(e)}")
         
         return assessment
     
+    def _confirmation_recipient(self, db: Session, assessment: Assessment):
+        """Partner email for the submission confirmation, if there is one"""
+        if not assessment.partner_org_name:
+            return None
+        
+        # First invitation's email, without loading the assessment's invitations
+        return db.query(Invitation.partner_email).filter(
+            Invitation.assessment_id == assessment.id
+        ).order_by(Invitation.id).limit(1).scalar()
+    
+    def _request_confirmation(self, db: Session, to_email: str, partner_org_name: str, assessment_id: int):
+        """Record the submission confirmation in the outbox"""
+        add_event(db, EMAIL_REQUESTED, {
+            "template": "assessment_submitted",
+            "to_email": to_email,
+            "context": {"partner_org_name": partner_org_name, "assessment_id": assessment_id},
+            "assessment_id": assessment_id,
+        }, "assessment", assessment_id)
+    
     def _trigger_scoring(self, db: Session, assessment_id: int):
-        """Trigger Intelligence Engine scoring"""
+        """Trigger Intelligence Engine scoring; the scores are saved but not committed"""
         
         # Prepare assessment data
         assessment_data = self._prepare_assessment_data(db, assessment_id)
@@ -103,7 +119,16 @@ class SubmissionService:
         
         This collects all responses and evidence files
         """
-        assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+        # Load the whole respondent -> response -> evidence tree in four
+        # queries however many respondents and responses there are
+        assessment = db.query(Assessment).options(
+            selectinload(Assessment.respondents)
+            .selectinload(Respondent.responses)
+            .selectinload(Response.evidence_files)
+        ).filter(Assessment.id == assessment_id).first()
+        
+        if not assessment:
+            raise ValueError(f"Assessment {assessment_id} not found")
         
         # Collect all responses with evidence
         responses_data = []
@@ -134,7 +159,7 @@ class SubmissionService:
         }
     
     def _save_scores(self, db: Session, assessment_id: int, score_data: dict):
-        """Save AI-generated scores to database"""
+        """Save AI-generated scores (committed by the caller, with the outbox event's DONE mark)"""
         
         # Check if scores already exist
         existing_score = db.query(AssessmentScore).filter(
@@ -164,11 +189,9 @@ class SubmissionService:
             db.add(score_record)
         
         # Update assessment status
-        assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+        assessment = db.get(Assessment, assessment_id)
         assessment.status = AssessmentStatus.ANALYST_REVIEW
         
-        db.commit()
-        
         logger.info(f"Scores saved for assessment {assessment_id}")
     
     def get_assessment_scores(self, db: Session, assessment_id: int) -> AssessmentScore:
@@ -181,3 +204,14 @@ class SubmissionService:
             raise ValueError(f"No scores found for assessment {assessment_id}")
         
         return scores
+
+class AsyncSubmissionService(AsyncServiceAdapter):
+    """
+    SubmissionService for async routes
+    
+    Submitting only writes the status change and its outbox events; the
+    Intelligence Engine call runs in the outbox relay.
+    """
+    
+    def __init__(self):
+        super().__init__(SubmissionService())
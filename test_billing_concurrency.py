@@ -0,0 +1,89 @@
+"""
+Concurrency stress test for BillingService.consume_credits
+
+Runs against the database in DATABASE_URL (migrated with alembic upgrade head).
+Many threads, each with its own session, race to consume credits from one
+organization; the ledger must end at exactly zero with one CONSUMPTION
+transaction per successful debit and no overspend.
+"""
+import sys
+import os
+import threading
+sys.path.append(os.getcwd())
+from src.core.database import SessionLocal
+from src.billing.models import CreditLedger, Transaction, CreditType, TransactionType
+from src.billing.service import BillingService, InsufficientCreditsError
+
+ORGANIZATION_ID = "org_billing_concurrency_test"
+STARTING_CREDITS = 200
+THREADS = 16
+ATTEMPTS_PER_THREAD = 25  # 400 attempts for 200 credits
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(Transaction).filter(Transaction.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.query(CreditLedger).filter(CreditLedger.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def consume_worker(start: threading.Barrier, results: list):
+    billing = BillingService()
+    succeeded = refused = 0
+    start.wait()
+    for _ in range(ATTEMPTS_PER_THREAD):
+        db = SessionLocal()
+        try:
+            billing.consume_credits(db, ORGANIZATION_ID, CreditType.RESPONDENT_CREDIT, 1.0, "stress test")
+            succeeded += 1
+        except InsufficientCreditsError:
+            refused += 1
+        finally:
+            db.close()
+    results.append((succeeded, refused))
+
+def test_concurrent_consumption_never_overspends():
+    cleanup()
+    try:
+        db = SessionLocal()
+        BillingService().add_credits(
+            db, ORGANIZATION_ID, CreditType.RESPONDENT_CREDIT, float(STARTING_CREDITS),
+            TransactionType.PURCHASE, "stress test seed"
+        )
+        db.close()
+
+        results = []
+        start = threading.Barrier(THREADS)
+        threads = [threading.Thread(target=consume_worker, args=(start, results)) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        succeeded = sum(s for s, _ in results)
+        refused = sum(r for _, r in results)
+
+        db = SessionLocal()
+        try:
+            balance = BillingService().get_balance(db, ORGANIZATION_ID, CreditType.RESPONDENT_CREDIT)
+            consumptions = db.query(Transaction).filter(
+                Transaction.organization_id == ORGANIZATION_ID,
+                Transaction.transaction_type == TransactionType.CONSUMPTION
+            ).count()
+        finally:
+            db.close()
+
+        assert succeeded + refused == THREADS * ATTEMPTS_PER_THREAD
+        assert succeeded == STARTING_CREDITS, f"{succeeded} debits succeeded for {STARTING_CREDITS} credits"
+        assert balance == 0.0, f"balance ended at {balance}"
+        assert consumptions == succeeded
+    finally:
+        cleanup()
+
+def main():
+    test_concurrent_consumption_never_overspends()
+    print("Success! No overspend under concurrent consumption.")
+
+if __name__ == "__main__":
+    main()
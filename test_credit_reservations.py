@@ -0,0 +1,115 @@
+"""
+Credit reservation lifecycle checks
+
+Runs against the database in DATABASE_URL (migrated with alembic upgrade head)
+and removes its rows afterwards.
+"""
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.getcwd())
+from src.core.database import SessionLocal
+from src.billing.models import (
+    CreditLedger, CreditReservation, Transaction, CreditType, ReservationStatus, TransactionType, from_minor
+)
+from src.billing.service import BillingService, InsufficientCreditsError
+from src.billing.reservations import ReservationService
+
+ORGANIZATION_ID = "org_reservation_test"
+RC = CreditType.RESPONDENT_CREDIT
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        for model in (CreditReservation, Transaction, CreditLedger):
+            db.query(model).filter(model.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def ledger():
+    db = SessionLocal()
+    try:
+        row = db.query(CreditLedger).filter(
+            CreditLedger.organization_id == ORGANIZATION_ID, CreditLedger.credit_type == RC
+        ).one()
+        return from_minor(row.balance_minor), from_minor(row.held_minor)
+    finally:
+        db.close()
+
+def seed(amount):
+    db = SessionLocal()
+    BillingService().add_credits(db, ORGANIZATION_ID, RC, amount, TransactionType.PURCHASE, "seed")
+    db.close()
+
+def test_reserve_commit_release():
+    reservations = ReservationService()
+    cleanup()
+    try:
+        seed(10.0)
+        db = SessionLocal()
+
+        held = reservations.reserve(db, ORGANIZATION_ID, RC, 6.0, "bulk import")
+        assert ledger() == (10.0, 6.0)
+
+        # Held credits can't be reserved or consumed again
+        for attempt in (
+            lambda: reservations.reserve(db, ORGANIZATION_ID, RC, 5.0),
+            lambda: BillingService().consume_credits(db, ORGANIZATION_ID, RC, 5.0, "direct"),
+        ):
+            try:
+                attempt()
+                raise AssertionError("spent held credits")
+            except InsufficientCreditsError:
+                db.rollback()
+
+        # Partial commit: 4 used, 2 returned
+        reservations.commit(db, held.id, 4.0)
+        assert ledger() == (6.0, 0.0)
+        try:
+            reservations.commit(db, held.id)
+            raise AssertionError("committed twice")
+        except ValueError:
+            db.rollback()
+
+        released = reservations.reserve(db, ORGANIZATION_ID, RC, 3.0)
+        reservations.release(db, released.id)
+        assert ledger() == (6.0, 0.0)
+        db.close()
+    finally:
+        cleanup()
+
+def test_expired_reservations_are_swept_in_batches():
+    reservations = ReservationService()
+    cleanup()
+    try:
+        seed(10.0)
+        db = SessionLocal()
+        for _ in range(5):
+            reservations.reserve(db, ORGANIZATION_ID, RC, 1.0, ttl_seconds=60)
+        live = reservations.reserve(db, ORGANIZATION_ID, RC, 2.0)
+        db.query(CreditReservation).filter(
+            CreditReservation.organization_id == ORGANIZATION_ID, CreditReservation.id != live.id
+        ).update({"expires_at": datetime.now(timezone.utc) - timedelta(minutes=1)}, synchronize_session=False)
+        db.commit()
+        assert ledger() == (10.0, 7.0)
+
+        assert reservations.expire_reservations(db, batch_size=2) == 5
+        assert ledger() == (10.0, 2.0)
+        statuses = {
+            status for (status,) in db.query(CreditReservation.status).filter(
+                CreditReservation.organization_id == ORGANIZATION_ID, CreditReservation.id != live.id
+            )
+        }
+        assert statuses == {ReservationStatus.EXPIRED}
+        db.close()
+    finally:
+        cleanup()
+
+def main():
+    test_reserve_commit_release()
+    test_expired_reservations_are_swept_in_batches()
+    print("Success! Reservations hold, commit, release and expire correctly.")
+
+if __name__ == "__main__":
+    main()
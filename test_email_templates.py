@@ -0,0 +1,51 @@
+"""
+Email template registry checks (no SMTP needed)
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.getcwd())
+from src.core.email_templates import EmailTemplateRegistry, html_to_text_source
+
+INVITATION = {
+    "partner_org_name": "Acme <Holdings>",
+    "project_name": "Due Diligence",
+    "deadline": "2026-11-30",
+    "accept_url": "http://localhost:3000/partner/accept/abc123",
+}
+
+def test_render_produces_subject_html_and_text():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        registry = EmailTemplateRegistry(cache_dir=cache_dir)
+        assert registry.warm() == len(registry.locales()) * len(registry.names())
+        # Compiled templates went to the bytecode cache
+        assert os.listdir(cache_dir)
+
+        email = registry.render("partner_invitation", **INVITATION)
+        assert email.subject == "Trust Assessment Invitation - Due Diligence"
+        assert "Acme &lt;Holdings&gt;" in email.html  # HTML is autoescaped
+        assert "Hello Acme <Holdings>," in email.text  # plain text is not
+        assert "Accept & Start Assessment: http://localhost:3000/partner/accept/abc123" in email.text
+        assert "<" not in email.text.replace("<Holdings>", "")
+
+def test_locale_variants_and_fallback():
+    registry = EmailTemplateRegistry(cache_dir="")
+    french = registry.render("assessment_submitted", "fr", partner_org_name="Acme", assessment_id=7)
+    assert french.subject == "Évaluation n°7 soumise avec succès"
+    assert "Merci, Acme !" in french.text
+
+    fallback = registry.render("assessment_submitted", "de", partner_org_name="Acme", assessment_id=7)
+    assert fallback.subject == "Assessment #7 Submitted Successfully"
+
+def test_text_conversion_keeps_jinja_and_structure():
+    source = '<p>Hi {{ name }}</p><ul><li>One</li><li>Two</li></ul><a href="{{ url }}">Open</a>'
+    assert html_to_text_source(source) == "Hi {{ name }}\n\n- One\n- Two\n\nOpen: {{ url }}\n"
+
+def main():
+    test_render_produces_subject_html_and_text()
+    test_locale_variants_and_fallback()
+    test_text_conversion_keeps_jinja_and_structure()
+    print("Success! Email templates render from the registry.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Month-end invoicing checks
+
+Runs against the database in DATABASE_URL (migrated with alembic upgrade head)
+and removes its rows afterwards.
+"""
+import sys
+import os
+import tempfile
+from datetime import datetime
+sys.path.append(os.getcwd())
+from src.core.database import SessionLocal
+from src.billing.models import Transaction, CreditType, TransactionType, to_minor
+from src.api_core.billing.invoicing import InvoicingService
+
+ORGANIZATIONS = ["org_invoice_test_a", "org_invoice_test_b", "org_invoice_test_c"]
+SEPTEMBER = datetime(2026, 9, 1)
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(Transaction).filter(Transaction.organization_id.in_(ORGANIZATIONS)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def seed():
+    db = SessionLocal()
+    rows = []
+    for index, organization_id in enumerate(ORGANIZATIONS):
+        for day in range(1, 31):
+            rows.append((organization_id, CreditType.RESPONDENT_CREDIT, TransactionType.CONSUMPTION, 1.5, datetime(2026, 9, day, 12)))
+        rows.append((organization_id, CreditType.RESPONDENT_CREDIT, TransactionType.PURCHASE, 100.0 * (index + 1), datetime(2026, 9, 1)))
+        rows.append((organization_id, CreditType.EVIDENCE_CREDIT, TransactionType.REFUND, 2.25, datetime(2026, 9, 30, 23, 59)))
+        # Outside the month on both sides
+        rows.append((organization_id, CreditType.RESPONDENT_CREDIT, TransactionType.PURCHASE, 999.0, datetime(2026, 8, 31, 23, 59)))
+        rows.append((organization_id, CreditType.RESPONDENT_CREDIT, TransactionType.PURCHASE, 999.0, datetime(2026, 10, 1)))
+    for organization_id, credit_type, transaction_type, amount, created_at in rows:
+        minor = to_minor(amount)
+        db.add(Transaction(
+            organization_id=organization_id, credit_type=credit_type, transaction_type=transaction_type,
+            amount_minor=-minor if transaction_type == TransactionType.CONSUMPTION else minor,
+            description="invoice test", created_at=created_at
+        ))
+    db.commit()
+    db.close()
+
+def test_generate_invoice_aggregates_the_month():
+    cleanup()
+    try:
+        seed()
+        db = SessionLocal()
+        invoice = InvoicingService().generate_invoice(db, "org_invoice_test_b", datetime(2026, 9, 17))
+        db.close()
+
+        assert invoice["invoice_number"] == "INV-202609-org_invoice_test_b"
+        lines = {line["credit_type"]: line for line in invoice["lines"]}
+        respondent = lines[CreditType.RESPONDENT_CREDIT.value]
+        assert (respondent["purchased"], respondent["consumed"], respondent["net"]) == (200.0, 45.0, 155.0)
+        assert respondent["transaction_count"] == 31
+        assert lines[CreditType.EVIDENCE_CREDIT.value]["refunded"] == 2.25
+        assert "Respondent Credits" in invoice["document"]
+    finally:
+        cleanup()
+
+def test_month_end_renders_every_organization():
+    cleanup()
+    try:
+        seed()
+        db = SessionLocal()
+        with tempfile.TemporaryDirectory() as output_dir:
+            result = InvoicingService().run_month_end(db, SEPTEMBER, output_dir=output_dir, workers=2)
+            files = sorted(os.listdir(result["output_dir"]))
+        db.close()
+
+        invoices = [f"INV-202609-{organization_id}.txt" for organization_id in ORGANIZATIONS]
+        assert set(invoices) <= set(files)
+        assert result["invoices"] == len(files)
+    finally:
+        cleanup()
+
+def main():
+    test_generate_invoice_aggregates_the_month()
+    test_month_end_renders_every_organization()
+    print("Success! Invoices aggregate and render per organization.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Transactional outbox checks: events commit with the change, the relay runs them once
+
+Runs against the database in DATABASE_URL (migrated with alembic upgrade head),
+seeds throwaway rows and removes them afterwards. A local HTTP server stands
+in for the Intelligence Engine and a webhook receiver.
+"""
+import sys
+import os
+import hashlib
+import hmac
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+sys.path.append(os.getcwd())
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.core.config import settings
+from src.core.database import SessionLocal
+from src.notifications.models import OutboundEmail
+from src.outbox import handlers
+from src.outbox.models import OutboxEvent, OutboxStatus
+from src.outbox.relay import OutboxRelay
+from src.outbox.service import EMAIL_REQUESTED, SCORING_REQUESTED, WEBHOOK, add_event
+from src.workflow.models import Assessment, AssessmentScore, AssessmentStatus, Invitation, InvitationStatus
+from src.workflow.submission_service import SubmissionService
+
+ORGANIZATION_ID = "org_outbox_test"
+SECRET = "outbox-test-secret"
+
+def as_utc(value: datetime) -> datetime:
+    """SQLite hands timestamptz columns back naive; they were written in UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+class Receiver(BaseHTTPRequestHandler):
+    """Scores at /api/v1/score; records webhooks at /hooks, failing the first `fail_hooks` of them"""
+    hooks = []
+    fail_hooks = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/api/v1/score":
+            self._reply(200, {"overall_score": 72.5, "confidence": 0.9, "layer_scores": {}, "veto_results": {}, "narrative": "ok"})
+        elif Receiver.fail_hooks:
+            Receiver.fail_hooks -= 1
+            self._reply(503, {})
+        else:
+            Receiver.hooks.append((dict(self.headers), body))
+            self._reply(200, {})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def start_receiver():
+    Receiver.hooks, Receiver.fail_hooks = [], 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def seed_assessment():
+    db = SessionLocal()
+    try:
+        assessment = Assessment(organization_id=ORGANIZATION_ID, sector="financial", partner_org_name="Acme",
+                                status=AssessmentStatus.IN_PROGRESS)
+        db.add(assessment)
+        db.flush()
+        db.add(Invitation(assessment_id=assessment.id, partner_email="cfo@acme.example", partner_org_name="Acme",
+                          role="partner_admin", token=f"outbox-{assessment.id}", status=InvitationStatus.ACCEPTED,
+                          expires_at=datetime.now(timezone.utc)))
+        db.commit()
+        return assessment.id
+    finally:
+        db.close()
+
+def events_for(assessment_id):
+    db = SessionLocal()
+    try:
+        return {event.event_type: event for event in db.query(OutboxEvent).filter(
+            OutboxEvent.aggregate_type == "assessment", OutboxEvent.aggregate_id == str(assessment_id)
+        )}
+    finally:
+        db.close()
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        assessment_ids = [row.id for row in db.query(Assessment.id).filter(Assessment.organization_id == ORGANIZATION_ID)]
+        db.query(OutboxEvent).filter(OutboxEvent.aggregate_type == "assessment",
+                                     OutboxEvent.aggregate_id.in_([str(i) for i in assessment_ids])).delete(synchronize_session=False)
+        db.query(OutboxEvent).filter(OutboxEvent.aggregate_type == "outbox_test").delete(synchronize_session=False)
+        db.query(OutboundEmail).filter(OutboundEmail.assessment_id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.query(AssessmentScore).filter(AssessmentScore.assessment_id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.query(Invitation).filter(Invitation.assessment_id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.query(Assessment).filter(Assessment.id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def submit(assessment_id):
+    db = SessionLocal()
+    try:
+        return SubmissionService().submit_assessment(db, assessment_id)
+    finally:
+        db.close()
+
+def test_submission_commits_its_side_effects_as_events():
+    cleanup()
+    original = settings.WEBHOOK_URLS
+    settings.WEBHOOK_URLS = "http://127.0.0.1:9/hooks"
+    try:
+        assessment_id = seed_assessment()
+        assessment = submit(assessment_id)
+        assert assessment.status == AssessmentStatus.SUBMITTED
+
+        events = events_for(assessment_id)
+        assert set(events) == {SCORING_REQUESTED, EMAIL_REQUESTED, WEBHOOK}
+        assert all(event.status == OutboxStatus.PENDING for event in events.values())
+        assert events[EMAIL_REQUESTED].payload["to_email"] == "cfo@acme.example"
+        assert events[WEBHOOK].payload["event"] == "assessment.submitted"
+
+        # A rejected retry of the request writes nothing
+        try:
+            submit(assessment_id)
+            assert False, "second submit should be rejected"
+        except ValueError:
+            pass
+        assert len(events_for(assessment_id)) == 3
+    finally:
+        settings.WEBHOOK_URLS = original
+        cleanup()
+
+def test_relay_runs_each_event_once():
+    cleanup()
+    server, url = start_receiver()
+    original = (settings.WEBHOOK_URLS, settings.WEBHOOK_SECRET, handlers.submission_service.intelligence_engine_url)
+    settings.WEBHOOK_URLS, settings.WEBHOOK_SECRET = f"{url}/hooks", SECRET
+    handlers.submission_service.intelligence_engine_url = url
+    try:
+        assessment_id = seed_assessment()
+        submit(assessment_id)
+
+        assert OutboxRelay().run_pending() == 3
+        assert all(event.status == OutboxStatus.DONE for event in events_for(assessment_id).values())
+
+        db = SessionLocal()
+        try:
+            assert db.get(Assessment, assessment_id).status == AssessmentStatus.ANALYST_REVIEW
+            assert db.query(AssessmentScore).filter(AssessmentScore.assessment_id == assessment_id).one().overall_score == 72.5
+            assert db.query(OutboundEmail).filter(OutboundEmail.assessment_id == assessment_id).count() == 1
+        finally:
+            db.close()
+
+        headers, body = Receiver.hooks[0]
+        event = json.loads(body)
+        assert event["event"] == "assessment.submitted" and event["data"]["assessment_id"] == assessment_id
+        assert headers["X-FutureForm-Event-Id"] == str(events_for(assessment_id)[WEBHOOK].id)
+        expected = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+        assert headers["X-FutureForm-Signature"] == f"sha256={expected}"
+
+        # Nothing left to do: no second email, score or webhook
+        assert OutboxRelay().run_pending() == 0
+        assert len(Receiver.hooks) == 1
+    finally:
+        settings.WEBHOOK_URLS, settings.WEBHOOK_SECRET, handlers.submission_service.intelligence_engine_url = original
+        server.shutdown()
+        cleanup()
+
+def test_failed_events_back_off_then_fail():
+    cleanup()
+    server, url = start_receiver()
+    original = settings.WEBHOOK_URLS
+    settings.WEBHOOK_URLS = f"{url}/hooks"
+    Receiver.fail_hooks = 1
+    try:
+        db = SessionLocal()
+        try:
+            webhook = add_event(db, WEBHOOK, {"event": "assessment.submitted", "data": {}}, "outbox_test")
+            broken = add_event(db, "test.fail", {}, "outbox_test")
+            db.commit()
+        finally:
+            db.close()
+
+        def boom(db, event):
+            raise RuntimeError("handler exploded")
+        relay = OutboxRelay(handlers={WEBHOOK: handlers.post_webhook, "test.fail": boom})
+        started = datetime.now(timezone.utc)
+        relay.run_pending()
+
+        db = SessionLocal()
+        try:
+            # Receiver returned 503: retried later
+            retrying = db.get(OutboxEvent, webhook.id)
+            assert retrying.status == OutboxStatus.PENDING and retrying.attempts == 1
+            assert as_utc(retrying.available_at) > started
+            assert "503" in retrying.last_error
+            # Out of attempts: FAILED
+            db.query(OutboxEvent).filter(OutboxEvent.id.in_([webhook.id, broken.id])).update(
+                {"attempts": settings.OUTBOX_MAX_ATTEMPTS - 1, "available_at": datetime.now(timezone.utc)}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        relay.run_pending()
+        db = SessionLocal()
+        try:
+            assert db.get(OutboxEvent, webhook.id).status == OutboxStatus.DONE  # The receiver recovered
+            failed = db.get(OutboxEvent, broken.id)
+            assert failed.status == OutboxStatus.FAILED
+            assert "handler exploded" in failed.last_error
+        finally:
+            db.close()
+    finally:
+        settings.WEBHOOK_URLS = original
+        server.shutdown()
+        cleanup()
+
+def test_relay_leases_only_what_its_workers_can_start():
+    cleanup()
+    release = threading.Event()
+    db = SessionLocal()
+    try:
+        for _ in range(6):
+            add_event(db, "test.slow", {}, "outbox_test")
+        db.commit()
+    finally:
+        db.close()
+
+    relay = OutboxRelay(handlers={"test.slow": lambda db, event: release.wait(10)}, workers=2, batch_size=100)
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        futures = relay._dispatch(executor)
+        # Both workers busy: nothing more is leased until one frees up
+        assert len(futures) == 2
+        assert relay._dispatch(executor) == []
+        db = SessionLocal()
+        try:
+            statuses = [status for (status,) in db.query(OutboxEvent.status).filter(OutboxEvent.aggregate_type == "outbox_test")]
+            assert statuses.count(OutboxStatus.PROCESSING) == 2
+        finally:
+            db.close()
+        release.set()
+        wait(futures)
+        assert relay.run_pending() == 4
+    finally:
+        release.set()
+        executor.shutdown()
+        cleanup()
+
+def main():
+    test_submission_commits_its_side_effects_as_events()
+    test_relay_runs_each_event_once()
+    test_failed_events_back_off_then_fail()
+    test_relay_leases_only_what_its_workers_can_start()
+    print("Success! Side effects commit with their changes and run once.")
+
+if __name__ == "__main__":
+    main()
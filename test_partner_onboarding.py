@@ -0,0 +1,146 @@
+"""
+Bulk partner onboarding checks
+
+Runs against the database in DATABASE_URL (migrated with alembic upgrade head),
+seeds throwaway rows and removes them afterwards.
+"""
+import sys
+import os
+sys.path.append(os.getcwd())
+from sqlalchemy import event
+from src.core.config import settings
+from src.core.database import SessionLocal, engine
+from src.notifications.models import EmailDeliveryStatus, OutboundEmail
+from src.outbox.models import OutboxEvent
+from src.workflow.invitation_service import InvitationService
+from src.workflow.models import Assessment, AssessmentStatus, Invitation, InvitationStatus, Project
+
+ORGANIZATION_ID = "org_partner_onboarding_test"
+
+def seed_project(sector="procurement"):
+    db = SessionLocal()
+    try:
+        project = Project(name="Supplier Due Diligence", organization_id=ORGANIZATION_ID, sector=sector)
+        db.add(project)
+        db.commit()
+        return project.id
+    finally:
+        db.close()
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        assessment_ids = db.query(Assessment.id).filter(Assessment.organization_id == ORGANIZATION_ID)
+        invitation_ids = [str(i) for (i,) in db.query(Invitation.id).filter(Invitation.assessment_id.in_(assessment_ids))]
+        db.query(OutboxEvent).filter(OutboxEvent.aggregate_type == "invitation",
+                                     OutboxEvent.aggregate_id.in_(invitation_ids)).delete(synchronize_session=False)
+        db.query(OutboundEmail).filter(OutboundEmail.assessment_id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.query(Invitation).filter(Invitation.assessment_id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.query(Assessment).filter(Assessment.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.query(Project).filter(Project.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def onboard(project_id, partners, **options):
+    """Onboard in a fresh session, returning the result and the number of statements it took"""
+    counter = {"count": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        return InvitationService().onboard_partners(db, project_id, partners, **options), counter["count"]
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        db.close()
+
+def partners(count, domain="example.com"):
+    return [{"partner_email": f"supplier{i}@{domain}", "partner_org_name": f"Supplier {i}"} for i in range(count)]
+
+def test_onboarding_reports_per_partner():
+    cleanup()
+    original = settings.WEBHOOK_URLS
+    settings.WEBHOOK_URLS = "http://127.0.0.1:9/hooks"
+    try:
+        project_id = seed_project()
+        onboard(project_id, [{"partner_email": "existing@acme.example", "partner_org_name": "Acme"}])
+
+        result, _ = onboard(project_id, [
+            {"partner_email": "cfo@gridtech.example", "partner_org_name": "GridTech"},
+            {"partner_email": "not-an-email", "partner_org_name": "Broken"},
+            {"partner_email": "ops@solar.example", "partner_org_name": " "},
+            {"partner_email": "CFO@gridtech.example", "partner_org_name": "GridTech again"},
+            {"partner_email": "existing@acme.example", "partner_org_name": "Acme"},
+            {"partner_email": "ceo@wind.example", "partner_org_name": "Wind Co", "sector": "energy"},
+        ], deadline_days=30)
+
+        assert result["created"] == 2 and result["failed"] == 4
+        assert [r["row"] for r in result["results"]] == [1, 6]
+        assert [(e["row"], e["error"].split(":")[0]) for e in result["errors"]] == [
+            (2, "Invalid email"),
+            (3, "partner_org_name is required"),
+            (4, "Partner already invited to this project"),
+            (5, "Partner already invited to this project"),
+        ]
+
+        db = SessionLocal()
+        try:
+            wind = result["results"][1]
+            assessment = db.get(Assessment, wind["assessment_id"])
+            assert (assessment.project_id, assessment.sector, assessment.status) == (project_id, "energy", AssessmentStatus.DRAFT)
+            assert db.get(Assessment, result["results"][0]["assessment_id"]).sector == "procurement"
+            invitation = db.get(Invitation, wind["invitation_id"])
+            assert (invitation.partner_email, invitation.status) == ("ceo@wind.example", InvitationStatus.PENDING)
+
+            email = db.query(OutboundEmail).filter(OutboundEmail.invitation_id == invitation.id).one()
+            assert email.status == EmailDeliveryStatus.QUEUED and email.recipient_domain == "wind.example"
+            assert email.context["accept_url"].endswith(invitation.token)
+            assert email.context["project_name"] == "Supplier Due Diligence"
+
+            hook = db.query(OutboxEvent).filter(OutboxEvent.aggregate_type == "invitation",
+                                                OutboxEvent.aggregate_id == str(invitation.id)).one()
+            assert hook.payload["data"]["expires_at"].endswith("+00:00")
+        finally:
+            db.close()
+    finally:
+        settings.WEBHOOK_URLS = original
+        cleanup()
+
+def test_statement_count_is_flat():
+    cleanup()
+    try:
+        small, small_count = onboard(seed_project(), partners(10))
+        large, large_count = onboard(seed_project(), partners(500))
+        assert small["created"] == 10 and large["created"] == 500
+
+        db = SessionLocal()
+        try:
+            tokens = {token for (token,) in db.query(Invitation.token).join(Assessment).filter(Assessment.organization_id == ORGANIZATION_ID)}
+            assert len(tokens) == 510
+        finally:
+            db.close()
+        # Ordered INSERT ... RETURNING is batched where SQLAlchemy has an implicit
+        # sentinel for SERIAL keys (Postgres); sqlite falls back to a row at a time
+        if engine.dialect.name == "postgresql":
+            assert large_count == small_count, (small_count, large_count)
+    finally:
+        cleanup()
+
+def test_unknown_project():
+    try:
+        onboard(0, partners(1))
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "Project 0 not found" in str(e)
+
+def main():
+    test_onboarding_reports_per_partner()
+    test_statement_count_is_flat()
+    test_unknown_project()
+    print("Success! Partners are onboarded in one batch.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Query-count checks for service methods
+
+Runs against the database in DATABASE_URL (migrated with alembic upgrade head),
+seeds throwaway rows and removes them afterwards.
+"""
+import sys
+import os
+import uuid
+sys.path.append(os.getcwd())
+from contextlib import contextmanager
+from sqlalchemy import event
+from src.core.database import SessionLocal, engine
+from src.workflow.models import (
+    Assessment, AssessmentStatus, Respondent, Response, Evidence, Project, Invitation
+)
+from src.workflow.service import WorkflowService
+from src.workflow.invitation_service import InvitationService
+from src.workflow.submission_service import SubmissionService
+from src.billing.models import CreditLedger, Transaction, CreditType, TransactionType
+from src.billing.service import BillingService
+
+ORGANIZATION_ID = "org_query_count_test"
+
+@contextmanager
+def count_queries():
+    """Count statements sent to the primary engine inside the block"""
+    counter = {"count": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def seed_assessment(respondent_count, responses_per_respondent):
+    """Assessment with respondents, responses and one evidence file per response"""
+    db = SessionLocal()
+    try:
+        assessment = Assessment(organization_id=ORGANIZATION_ID, sector="financial")
+        for r in range(respondent_count):
+            respondent = Respondent(email=f"respondent{r}@example.com", role="CTO")
+            for q in range(responses_per_respondent):
+                response = Response(question_id=f"Q{q}", answer_value={"text": "yes"})
+                response.evidence_files.append(Evidence(
+                    file_name="evidence.pdf",
+                    s3_key=f"test/{uuid.uuid4()}.pdf"
+                ))
+                respondent.responses.append(response)
+            assessment.respondents.append(respondent)
+        db.add(assessment)
+        db.commit()
+        return assessment.id
+    finally:
+        db.close()
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        assessment_ids = db.query(Assessment.id).filter(Assessment.organization_id == ORGANIZATION_ID)
+        respondent_ids = db.query(Respondent.id).filter(Respondent.assessment_id.in_(assessment_ids))
+        response_ids = db.query(Response.id).filter(Response.respondent_id.in_(respondent_ids))
+        db.query(Evidence).filter(Evidence.response_id.in_(response_ids)).delete(synchronize_session=False)
+        db.query(Response).filter(Response.id.in_(response_ids)).delete(synchronize_session=False)
+        db.query(Respondent).filter(Respondent.id.in_(respondent_ids)).delete(synchronize_session=False)
+        db.query(Invitation).filter(Invitation.assessment_id.in_(assessment_ids)).delete(synchronize_session=False)
+        db.query(Assessment).filter(Assessment.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.query(Project).filter(Project.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.query(Transaction).filter(Transaction.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.query(CreditLedger).filter(CreditLedger.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def prepare_query_count(assessment_id):
+    db = SessionLocal()
+    try:
+        with count_queries() as counter:
+            data = SubmissionService()._prepare_assessment_data(db, assessment_id)
+        return counter["count"], data
+    finally:
+        db.close()
+
+def test_prepare_assessment_data_query_count_is_flat():
+    try:
+        small_id = seed_assessment(respondent_count=2, responses_per_respondent=3)
+        large_id = seed_assessment(respondent_count=20, responses_per_respondent=20)
+
+        small_count, small_data = prepare_query_count(small_id)
+        large_count, large_data = prepare_query_count(large_id)
+
+        assert len(small_data["responses"]) == 6
+        assert len(large_data["responses"]) == 400
+        assert all(len(response["evidence"]) == 1 for response in large_data["responses"])
+        assert large_count == small_count
+        assert large_count <= 4
+    finally:
+        cleanup()
+
+def assert_write_queries(write, read_back, expected):
+    """
+    Run write(db) and read_back(result) in a fresh session and check the
+    statement count: read_back touches server-generated columns after commit,
+    which must not cost another SELECT
+    """
+    db = SessionLocal()
+    try:
+        with count_queries() as counter:
+            result = write(db)
+            read_back(result)
+        assert counter["count"] == expected, f"expected {expected} statements, got {counter['count']}"
+        return result
+    finally:
+        db.close()
+
+def test_workflow_writes_return_server_columns():
+    workflow = WorkflowService()
+    try:
+        project = assert_write_queries(
+            lambda db: workflow.create_project(db, "Query count", ORGANIZATION_ID),
+            lambda project: (project.id, project.created_at), 1
+        )
+        assessment = assert_write_queries(
+            lambda db: workflow.create_assessment(db, ORGANIZATION_ID, "financial", project_id=project.id),
+            lambda assessment: (assessment.id, assessment.created_at, assessment.status), 1
+        )
+        assert_write_queries(
+            lambda db: workflow.update_assessment_status(db, assessment.id, AssessmentStatus.IN_PROGRESS),
+            lambda updated: (updated.status, updated.updated_at, updated.organization_id), 1
+        )
+        respondent = assert_write_queries(
+            lambda db: workflow.add_respondent(db, assessment.id, "qc@example.com", "CTO"),
+            lambda respondent: (respondent.id, respondent.created_at), 1
+        )
+        response = assert_write_queries(
+            lambda db: workflow.create_response(db, respondent.id, "Q1", {"text": "yes"}),
+            lambda response: (response.id, response.updated_at), 1
+        )
+        assert_write_queries(
+            lambda db: workflow.create_response(db, respondent.id, "Q1", {"text": "no"}),
+            lambda updated: (updated.id, updated.updated_at), 1
+        )
+        assert_write_queries(
+            lambda db: workflow.submit_response(db, response.id),
+            lambda submitted: (submitted.submitted_at, submitted.answer_value), 1
+        )
+        assert_write_queries(
+            lambda db: workflow.create_evidence_record(
+                db, response.id, "evidence.pdf", "pdf", 10, f"test/{uuid.uuid4()}.pdf", "bucket", "qc@example.com"
+            ),
+            lambda evidence: (evidence.id, evidence.uploaded_at, evidence.virus_scan_status), 1
+        )
+    finally:
+        cleanup()
+
+def test_invitation_writes_return_server_columns():
+    invitations = InvitationService()
+    try:
+        assessment_id = seed_assessment(respondent_count=0, responses_per_respondent=0)
+        invitation = assert_write_queries(
+            lambda db: invitations._create_invitation_record(
+                db, assessment_id, "partner@example.com", "Partner", "partner_admin", 14
+            ),
+            lambda invitation: (invitation.id, invitation.invited_at, invitation.token), 1
+        )
+        # SELECT by token, then UPDATE
+        assert_write_queries(
+            lambda db: invitations.accept_invitation(db, invitation.token),
+            lambda accepted: (accepted.status, accepted.accepted_at, accepted.invited_at), 2
+        )
+    finally:
+        cleanup()
+
+def test_record_transaction_query_count():
+    billing = BillingService()
+    try:
+        db = SessionLocal()
+        db.add(CreditLedger(organization_id=ORGANIZATION_ID, credit_type=CreditType.RESPONDENT_CREDIT, balance_minor=500))
+        db.commit()
+        db.close()
+        # Conditional UPDATE ... RETURNING balance, INSERT transaction
+        balance = assert_write_queries(
+            lambda db: billing.record_transaction(
+                db, ORGANIZATION_ID, CreditType.RESPONDENT_CREDIT, 1.0, TransactionType.CONSUMPTION, "query count"
+            ),
+            lambda balance: None, 2
+        )
+        assert balance == 4.0
+    finally:
+        cleanup()
+
+def main():
+    test_prepare_assessment_data_query_count_is_flat()
+    test_workflow_writes_return_server_columns()
+    test_invitation_writes_return_server_columns()
+    test_record_transaction_query_count()
+    print("Success! Query counts are flat.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Shared S3 client checks (offline: presigning and client setup make no requests)
+"""
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.getcwd())
+# Picked up by the default credential chain when AWS_* settings are empty; the client
+# resolves credentials on first use, so this works however early the app was imported
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test-env-key")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test-env-secret")
+from src.core.config import settings
+from src.core.s3_client import create_s3_client, get_s3_client
+from src.core.s3_service import PresignedUrlCache, S3Service, download_url_cache
+from src.core.storage import StorageService
+from src.portals.customer.service import CustomerPortalService
+from src.workflow.service import WorkflowService
+
+def test_storage_paths_share_one_client():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = set(map(id, executor.map(lambda _: get_s3_client(), range(32))))
+    client = get_s3_client()
+
+    assert clients == {id(client)}
+    assert S3Service().s3_client is client
+    assert StorageService().s3_client is client
+    assert WorkflowService().s3_service.s3_client is client
+    assert CustomerPortalService().workflow_service.s3_service.s3_client is client
+
+def test_client_is_tuned_from_settings():
+    config = get_s3_client().meta.config
+
+    assert config.max_pool_connections == settings.S3_MAX_POOL_CONNECTIONS
+    assert config.retries == {"mode": "adaptive", "total_max_attempts": settings.S3_MAX_ATTEMPTS}
+    assert config.connect_timeout == settings.S3_CONNECT_TIMEOUT_SECONDS
+    assert config.read_timeout == settings.S3_READ_TIMEOUT_SECONDS
+    assert config.tcp_keepalive == settings.S3_TCP_KEEPALIVE
+
+def test_empty_keys_use_the_default_credential_chain():
+    saved = settings.AWS_ACCESS_KEY_ID, settings.AWS_SECRET_ACCESS_KEY
+    try:
+        settings.AWS_ACCESS_KEY_ID, settings.AWS_SECRET_ACCESS_KEY = "", ""
+        credentials = create_s3_client()._request_signer._credentials
+        assert credentials.access_key == os.environ["AWS_ACCESS_KEY_ID"]
+
+        settings.AWS_ACCESS_KEY_ID, settings.AWS_SECRET_ACCESS_KEY = "settings-key", "settings-secret"
+        credentials = create_s3_client()._request_signer._credentials
+        assert (credentials.access_key, credentials.secret_key) == ("settings-key", "settings-secret")
+    finally:
+        settings.AWS_ACCESS_KEY_ID, settings.AWS_SECRET_ACCESS_KEY = saved
+
+def test_presigned_urls_use_the_shared_client():
+    upload = S3Service().generate_presigned_upload_url(1, "financial", "report.pdf", "application/pdf")
+    url = StorageService().generate_presigned_url("respondents/1/report.pdf")
+
+    assert upload["s3_key"] in upload["upload_url"]
+    assert upload["s3_bucket"] == settings.S3_BUCKET_NAME
+    assert "respondents/1/report.pdf" in url
+
+def test_download_urls_are_cached_across_services():
+    download_url_cache.clear()
+    url = S3Service().generate_presigned_download_url("assessments/1/financial/report.pdf")
+
+    assert S3Service().generate_presigned_download_url("assessments/1/financial/report.pdf") == url
+    assert download_url_cache.get(settings.S3_BUCKET_NAME, "assessments/1/financial/report.pdf", 3600) == url
+    # A different lifetime is a different URL
+    assert download_url_cache.get(settings.S3_BUCKET_NAME, "assessments/1/financial/report.pdf", 60) is None
+    download_url_cache.clear()
+
+def test_cache_expiry_eviction_and_invalidation():
+    cache = PresignedUrlCache(max_entries=2, ttl_seconds=900)
+    cache.put("bucket", "a", 3600, "url-a")
+    cache.put("bucket", "b", 3600, "url-b")
+    cache.get("bucket", "a", 3600)
+    cache.put("bucket", "c", 3600, "url-c")
+
+    # b was least recently used
+    assert cache.get("bucket", "b", 3600) is None
+    assert cache.get("bucket", "a", 3600) == "url-a"
+
+    cache.invalidate("bucket", "a")
+    assert cache.get("bucket", "a", 3600) is None
+    assert cache.get("bucket", "c", 3600) == "url-c"
+
+    # Entries last at most half the URL's lifetime
+    cache.put("bucket", "short", 0.1, "url-short")
+    assert cache.get("bucket", "short", 0.1) == "url-short"
+    time.sleep(0.06)
+    assert cache.get("bucket", "short", 0.1) is None
+
+def main():
+    test_storage_paths_share_one_client()
+    test_client_is_tuned_from_settings()
+    test_empty_keys_use_the_default_credential_chain()
+    test_presigned_urls_use_the_shared_client()
+    test_download_urls_are_cached_across_services()
+    test_cache_expiry_eviction_and_invalidation()
+    print("Success! Storage code paths share one tuned S3 client and cache download URLs.")
+
+if __name__ == "__main__":
+    main()
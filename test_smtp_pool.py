@@ -0,0 +1,116 @@
+"""
+Pooled SMTP delivery checks against a local aiosmtpd sink
+"""
+import sys
+import os
+import smtplib
+import socket
+from email.message import EmailMessage
+sys.path.append(os.getcwd())
+from aiosmtpd.controller import Controller
+from src.core.smtp_pool import SMTPConnectionPool, SMTPDeliveryEngine
+
+class Sink:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.rcpt_attempts = 0
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.rcpt_attempts += 1
+        if address.startswith("refused"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.rcpt_tos[0])
+        self.sessions.add(id(session))
+        return "250 OK"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def message(index: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@futureform.africa"
+    msg["To"] = f"partner{index}@example.com"
+    msg["Subject"] = f"Invitation {index}"
+    msg.set_content("Hello")
+    return msg
+
+def make_pool(port: int, **overrides) -> SMTPConnectionPool:
+    options = {"size": 2, "max_messages": 10, "starttls": False, "user": "", "timeout": 5}
+    options.update(overrides)
+    return SMTPConnectionPool("127.0.0.1", port, **options)
+
+def test_sessions_are_reused_and_retired():
+    sink, port = Sink(), free_port()
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        engine = SMTPDeliveryEngine(make_pool(port), parallelism=2)
+        results = engine.send_batch([message(i) for i in range(25)])
+        engine.close()
+
+        assert results == [None] * 25
+        assert sorted(sink.messages) == sorted(f"partner{i}@example.com" for i in range(25))
+        # 25 messages at 10 per session over 2 parallel senders: a few sessions, not 25
+        assert 3 <= engine.pool.connections_opened <= 5
+        assert len(sink.sessions) == engine.pool.connections_opened
+    finally:
+        controller.stop()
+
+def test_dropped_session_is_replaced():
+    sink, port = Sink(), free_port()
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    pool = make_pool(port, idle_check=3600)  # Skip the NOOP check so the send itself hits the dead session
+    try:
+        pool.send(message(1))
+        # Server restart drops every open session
+        controller.stop()
+        controller = Controller(sink, hostname="127.0.0.1", port=port)
+        controller.start()
+        pool.send(message(2))
+
+        assert sink.messages == ["partner1@example.com", "partner2@example.com"]
+        assert pool.connections_opened == 2
+    finally:
+        pool.close()
+        controller.stop()
+
+def test_refused_recipient_keeps_the_session():
+    sink, port = Sink(), free_port()
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    pool = make_pool(port)
+    try:
+        refused = message(1)
+        refused.replace_header("To", "refused@example.com")
+        try:
+            pool.send(refused)
+            raise AssertionError("Refused recipient was not raised")
+        except smtplib.SMTPRecipientsRefused as e:
+            assert e.recipients["refused@example.com"][0] == 550
+        pool.send(message(2))
+
+        # Not retried, and the same session carried on
+        assert sink.rcpt_attempts == 2
+        assert sink.messages == ["partner2@example.com"]
+        assert pool.connections_opened == 1
+        assert pool._idle.qsize() == 1
+    finally:
+        pool.close()
+        controller.stop()
+
+def main():
+    test_sessions_are_reused_and_retired()
+    test_dropped_session_is_replaced()
+    test_refused_recipient_keeps_the_session()
+    print("Success! SMTP sessions are pooled, retired and replaced.")
+
+if __name__ == "__main__":
+    main()
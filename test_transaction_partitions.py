@@ -0,0 +1,66 @@
+"""
+Transaction partition planning checks
+
+The partition DDL itself only runs on Postgres; these cover the month
+arithmetic that decides what gets created and archived, and that the
+maintenance functions are no-ops elsewhere.
+"""
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.getcwd())
+from src.core.database import SessionLocal
+from src.billing.partitions import (
+    archive_partitions, create_partitions, months_to_archive, months_to_create,
+    partition_horizon, partition_month, partition_name
+)
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+def test_partition_names_round_trip():
+    month = utc(2026, 3, 1)
+    assert partition_name(month) == "transactions_y2026m03"
+    assert partition_month(partition_name(month)) == month
+    assert partition_month("transactions_default") is None
+
+def test_months_to_create_crosses_the_year():
+    assert months_to_create(datetime(2026, 11, 17, 9, 30), 3) == [
+        utc(2026, 11, 1), utc(2026, 12, 1), utc(2027, 1, 1), utc(2027, 2, 1)
+    ]
+    # Months are UTC months: 01:00 on 1 December at UTC+2 is still November
+    assert months_to_create(datetime(2026, 12, 1, 1, 0, tzinfo=timezone(timedelta(hours=2))), 0) == [utc(2026, 11, 1)]
+
+def test_months_to_archive_respects_retention_and_snapshots():
+    existing = [utc(2025, month, 1) for month in range(1, 13)] + [utc(2026, 1, 1)]
+    now = utc(2026, 10, 17)
+    # 12 months of retention keeps October 2025 onwards
+    assert months_to_archive(existing, now, 12, snapshots_through=utc(2026, 10, 1)) == [
+        utc(2025, month, 1) for month in range(1, 10)
+    ]
+    # Nothing past the last rollup is archived; naive snapshot times are UTC
+    assert months_to_archive(existing, now, 12, snapshots_through=datetime(2025, 4, 1)) == [
+        utc(2025, 1, 1), utc(2025, 2, 1), utc(2025, 3, 1)
+    ]
+    assert months_to_archive(existing, now, 12, snapshots_through=None) == []
+
+def test_maintenance_is_a_no_op_without_partitioning():
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            return
+        assert create_partitions(db) == []
+        assert archive_partitions(db) == []
+        assert partition_horizon(db) is None
+    finally:
+        db.close()
+
+def main():
+    test_partition_names_round_trip()
+    test_months_to_create_crosses_the_year()
+    test_months_to_archive_respects_retention_and_snapshots()
+    test_maintenance_is_a_no_op_without_partitioning()
+    print("Success! Partition planning is correct.")
+
+if __name__ == "__main__":
+    main()
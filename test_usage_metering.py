@@ -0,0 +1,90 @@
+"""
+Usage metering checks for the buffered api_core CreditLedger
+
+Runs against the database in DATABASE_URL (migrated with alembic upgrade head)
+and removes its rows afterwards.
+"""
+import sys
+import os
+sys.path.append(os.getcwd())
+from src.core.database import SessionLocal
+from src.billing.models import CreditLedger as LedgerRow, Transaction, CreditType, TransactionType
+from src.billing.service import BillingService, InsufficientCreditsError
+from src.api_core.billing.credit_ledger import CreditLedger
+
+ORGANIZATION_ID = "org_metering_test"
+EC = CreditType.EVIDENCE_CREDIT
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        for model in (Transaction, LedgerRow):
+            db.query(model).filter(model.organization_id == ORGANIZATION_ID).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def seed(amount):
+    db = SessionLocal()
+    BillingService().add_credits(db, ORGANIZATION_ID, EC, amount, TransactionType.PURCHASE, "seed")
+    db.close()
+
+def consumption_count():
+    db = SessionLocal()
+    try:
+        return db.query(Transaction).filter(
+            Transaction.organization_id == ORGANIZATION_ID,
+            Transaction.transaction_type == TransactionType.CONSUMPTION
+        ).count()
+    finally:
+        db.close()
+
+def test_debits_are_buffered_and_flushed_in_batches():
+    cleanup()
+    meter = CreditLedger(flush_size=10, flush_interval=3600, strict_below=5.0)
+    try:
+        seed(100.0)
+        for _ in range(9):
+            meter.debit_credits(ORGANIZATION_ID, 1.0, EC, "evidence upload")
+        # Nothing written yet, but the cached view already counts the buffered debits
+        assert consumption_count() == 0
+        assert meter.check_balance(ORGANIZATION_ID, EC) == 91.0
+
+        meter.debit_credits(ORGANIZATION_ID, 1.0, EC, "evidence upload")  # Tenth event fills the batch
+        assert consumption_count() == 10
+        db = SessionLocal()
+        assert BillingService().get_balance(db, ORGANIZATION_ID, EC) == 90.0
+        db.close()
+    finally:
+        meter.close()
+        cleanup()
+
+def test_low_balance_falls_back_to_strict_debits():
+    cleanup()
+    meter = CreditLedger(flush_size=1000, flush_interval=3600, strict_below=5.0)
+    try:
+        seed(8.0)
+        meter.debit_credits(ORGANIZATION_ID, 2.0, EC)  # 6 left: buffered
+        assert consumption_count() == 0
+        meter.debit_credits(ORGANIZATION_ID, 2.0, EC)  # Would leave 4: flushes and debits synchronously
+        assert consumption_count() == 2
+        assert meter.check_balance(ORGANIZATION_ID, EC) == 4.0
+
+        meter.debit_credits(ORGANIZATION_ID, 4.0, EC)
+        try:
+            meter.debit_credits(ORGANIZATION_ID, 1.0, EC)
+            raise AssertionError("overspent")
+        except InsufficientCreditsError:
+            pass
+        assert meter.check_balance(ORGANIZATION_ID, EC) == 0.0
+    finally:
+        meter.close()
+        cleanup()
+
+def main():
+    test_debits_are_buffered_and_flushed_in_batches()
+    test_low_balance_falls_back_to_strict_debits()
+    print("Success! Metered debits batch and fall back to strict debits on low balance.")
+
+if __name__ == "__main__":
+    main()